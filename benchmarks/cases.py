@@ -0,0 +1,719 @@
+"""The cases of the benchmark suite, besides timing the phases of the programs.
+
+Every case measures one thing about the interpreter of a checkout: the speed
+of a feature, the memory some structure takes, how deep recursion goes.
+A case is a function taking the root of the checkout and the number of runs,
+and returning {measure: summary(...)}. Every measure is lower-is-better, in
+seconds, bytes, percent or failures (0 or 1 per run), so two result files
+compare the same way whatever the case.
+
+The measuring runs in a fresh process with the interpreter of the checkout.
+A case fails with CalledProcessError on a checkout that predates what it
+measures, the suite then skips it.
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from harness import PROGRAMS_DIR
+from harness import crusher_dir
+from harness import program_path
+from harness import run_child
+from harness import summary
+from harness import time_program
+
+ENGINES = ["tree", "vm", "closure", "python", "stack"]
+
+# the programs run by the cases that compare how an option changes run times
+OPTION_PROGRAMS = ["fibonacci.crush", "calls.crush", "nested_loops.crush"]
+
+# functions, loops, strings, comments and numbers, repeated by generate_source
+SNIPPET = """// computes a running total
+fn total_{index}(limit, step) {{
+    let sum = 0;
+    let i = 0;
+    while (i <= limit and sum != -1) {{
+        sum = sum + i * {index}.5 / step;
+        i = i + 1;
+    }}
+    if (!(sum >= 100)) {{ print "small {index}"; }} else {{ print "large"; }}
+    return sum;
+}}
+print total_{index}({index}, 2);
+"""
+
+
+def generate_source(megabytes):
+    size = int(megabytes * 1024 * 1024)
+    snippets = []
+    length = 0
+    index = 0
+
+    while length < size:
+        snippet = SNIPPET.format(index=index)
+        snippets.append(snippet)
+        length += len(snippet)
+        index += 1
+
+    return "".join(snippets)
+
+
+def write_temporary_source(source, suffix=".crush"):
+    """Writes the source to a new temporary file and returns its path"""
+
+    descriptor, path = tempfile.mkstemp(suffix=suffix)
+
+    with os.fdopen(descriptor, "w") as file:
+        file.write(source)
+
+    return path
+
+
+def run_interpreter(project_dir, arguments, source_path):
+    """What the interpreter of `project_dir` prints running the source file"""
+
+    completed = subprocess.run(
+        [
+            sys.executable,
+            os.path.join(crusher_dir(project_dir), "crusher_interpreter.py"),
+            *arguments,
+            source_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    return completed.stdout.strip()
+
+
+def runs_to_completion(project_dir, source_path, arguments, expected):
+    """0 when the interpreter of `project_dir` prints just `expected` running
+    the source file, 1 when it doesn't, as the failures measure. None when it
+    can't even run a trivial program with these arguments: the checkout
+    predates one of them, an engine for instance."""
+
+    trivial_path = write_temporary_source("print 1;")
+
+    try:
+        if run_interpreter(project_dir, arguments, trivial_path) != "1":
+            return None
+    finally:
+        os.remove(trivial_path)
+
+    return 0 if run_interpreter(project_dir, arguments, source_path) == expected else 1
+
+
+def memoization(project_dir, repeat):
+    """The programs run with pure functions memoized, as they are by default.
+    fibonacci.crush repeats its calls, calls.crush never does, it shows what
+    the caches cost when they never hit."""
+
+    return {
+        f"{program} memoized": summary(
+            time_program(program_path(program), (), repeat, project_dir)
+        )
+        for program in ["fibonacci.crush", "calls.crush"]
+    }
+
+
+# runs in the child process: argv is [crusher_lang directory, source file]
+HOOK_TIMER = """
+import os
+import sys
+import time
+
+sys.path.insert(0, sys.argv[1])
+from crusher_interpreter import ExecutionHook
+from crusher_interpreter import Interpreter
+
+interpreter = Interpreter(["crusher", "--no-memo", sys.argv[2]])
+interpreter.add_hook(ExecutionHook())
+stdout = sys.stdout
+sys.stdout = open(os.devnull, "w")
+
+start = time.perf_counter()
+interpreter.interpret()
+elapsed = time.perf_counter() - start
+
+sys.stdout = stdout
+print(elapsed)
+"""
+
+
+def hooks(project_dir, repeat):
+    """The programs run on the tree engine with one ExecutionHook ignoring
+    every event. Without hooks they run as the phases of the suite time them."""
+
+    return {
+        f"{program} hooked": summary(
+            [
+                run_child(HOOK_TIMER, project_dir, program_path(program))
+                for _ in range(repeat)
+            ]
+        )
+        for program in OPTION_PROGRAMS
+    }
+
+
+def sampling(project_dir, repeat):
+    """The programs run on the tree engine while --sample profiles them every
+    5 milliseconds of CPU time, writing the samples is part of the time."""
+
+    samples_path = write_temporary_source("", suffix=".txt")
+
+    try:
+        return {
+            f"{program} sampled": summary(
+                time_program(
+                    program_path(program),
+                    ["--no-memo", "--sample", samples_path, "--sample-interval", "5"],
+                    repeat,
+                    project_dir,
+                )
+            )
+            for program in OPTION_PROGRAMS
+        }
+    finally:
+        os.remove(samples_path)
+
+
+def inline_caches(project_dir, repeat):
+    """The miss rates of the global variable and call site inline caches of
+    the tree engine running every program, as printed by --cache-stats.
+    They don't depend on timing, one run is enough."""
+
+    results = {}
+
+    for program in sorted(os.listdir(PROGRAMS_DIR)):
+        if not program.endswith(".crush"):
+            continue
+
+        completed = subprocess.run(
+            [
+                sys.executable,
+                os.path.join(crusher_dir(project_dir), "crusher_interpreter.py"),
+                "--no-memo",
+                "--cache-stats",
+                program_path(program),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+        # "inline cache globals: 10 hits, 2 misses, 83.3% hit rate"
+        for line in completed.stderr.splitlines():
+            if line.startswith("inline cache"):
+                words = line.split()
+                hits, misses = int(words[3]), int(words[5])
+                rate = misses / (hits + misses) * 100 if hits + misses else 0.0
+                results[f"{program} {words[2].rstrip(':')} misses"] = summary(
+                    [rate], "%"
+                )
+
+    return results
+
+
+# runs in the child process: argv is [crusher_lang directory]
+NODE_MEMORY = """
+import gc
+import json
+import sys
+import tracemalloc
+
+sys.path.insert(0, sys.argv[1])
+from lexer.scanner import Scanner
+from ast_generator.expression import Expression
+from ast_generator.parser import Parser
+from ast_generator.statement import Statement
+
+source = "".join(
+    f"fn f{index}(a, b) {{ let c = a * {index} + b; if (c > 10 and a != b) "
+    f"{{ return c - 1; }} return -c; }} print f{index}(1, 2);"
+    for index in range(5000)
+)
+tokens = Scanner().scan(source)
+
+gc.collect()
+tracemalloc.start()
+statements = Parser().parse(tokens)
+size = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+nodes = sum(isinstance(node, (Expression, Statement)) for node in gc.get_objects())
+print(json.dumps(size / nodes))
+"""
+
+
+def node_memory(project_dir, repeat):
+    """The bytes the syntax tree of a generated program takes per node"""
+
+    return {"bytes per node": summary([run_child(NODE_MEMORY, project_dir)], "bytes")}
+
+
+# runs in the child process: argv is [crusher_lang directory, source file, repeat]
+PARSE_TIMER = """
+import json
+import sys
+import time
+
+sys.path.insert(0, sys.argv[1])
+from lexer.scanner import Scanner
+from ast_generator.parser import Parser
+
+with open(sys.argv[2]) as file:
+    tokens = Scanner().scan(file.read())
+
+times = []
+
+for _ in range(int(sys.argv[3])):
+    start = time.perf_counter()
+    Parser().parse(tokens)
+    times.append(time.perf_counter() - start)
+
+print(json.dumps(times))
+"""
+
+OPERATORS = ["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">=", "and", "or"]
+OPERANDS = ["a", "b", "count", "1", "2.5", '"text"', "true", "null"]
+EXPRESSION_STATEMENTS = 20_000
+
+
+def generate_expression(random_source, depth=0):
+    choice = random_source.random()
+
+    if depth > 3 or choice < 0.3:
+        return random_source.choice(OPERANDS)
+
+    if choice < 0.75:
+        operator = random_source.choice(OPERATORS)
+        left = generate_expression(random_source, depth + 1)
+        right = generate_expression(random_source, depth + 1)
+        return f"{left} {operator} {right}"
+
+    if choice < 0.85:
+        return "-" + generate_expression(random_source, depth + 1)
+
+    if choice < 0.95:
+        return "(" + generate_expression(random_source, depth + 1) + ")"
+
+    return f"f({generate_expression(random_source, depth + 1)}, b)"
+
+
+def expression_parsing(project_dir, repeat):
+    """Parsing generated expression-heavy code: long arithmetic, comparison
+    and logical expressions, calls and plenty of single literals and variables"""
+
+    random_source = random.Random(42)
+    source_path = write_temporary_source(
+        "\n".join(
+            f"a = {generate_expression(random_source)};"
+            for _ in range(EXPRESSION_STATEMENTS)
+        )
+    )
+
+    try:
+        times = run_child(PARSE_TIMER, project_dir, source_path, str(repeat))
+    finally:
+        os.remove(source_path)
+
+    return {"parse": summary(times)}
+
+
+# runs in the child process: argv is [crusher_lang directory, source file, repeat]
+SCAN_TIMER = """
+import json
+import sys
+import time
+
+sys.path.insert(0, sys.argv[1])
+from lexer.scanner import Scanner
+
+scanners = {"classic": Scanner}
+
+try:
+    from lexer.regex_scanner import RegexScanner
+
+    scanners["regex"] = RegexScanner
+except ImportError:
+    pass
+
+with open(sys.argv[2]) as file:
+    source = file.read()
+
+times = {}
+
+for name, scanner_class in scanners.items():
+    times[name] = []
+
+    for _ in range(int(sys.argv[3])):
+        start = time.perf_counter()
+        scanner_class().scan(source)
+        times[name].append(time.perf_counter() - start)
+
+print(json.dumps(times))
+"""
+
+
+def scanners(project_dir, repeat):
+    """Every scanner of the checkout scanning a generated megabyte of source"""
+
+    source_path = write_temporary_source(generate_source(1))
+
+    try:
+        times = run_child(SCAN_TIMER, project_dir, source_path, str(repeat))
+    finally:
+        os.remove(source_path)
+
+    return {f"{name} scan": summary(runs) for name, runs in times.items()}
+
+
+# runs in the child process: argv is [crusher_lang directory, source file]
+TOKEN_MEMORY = """
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, sys.argv[1])
+from ast_generator.parser import Parser
+from lexer.regex_scanner import RegexScanner
+
+with open(sys.argv[2]) as file:
+    source = file.read()
+
+scanner = RegexScanner()
+results = {}
+
+for name, scan in [("list", scanner.scan), ("compact", scanner.scan_compact)]:
+    gc.collect()
+    tracemalloc.start()
+    tokens = scan(source)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    Parser().parse(tokens)
+    elapsed = time.perf_counter() - start
+
+    results[name] = [size / len(tokens), elapsed]
+    del tokens
+
+print(json.dumps(results))
+"""
+
+
+def token_memory(project_dir, repeat):
+    """The bytes a list of Tokens and a compact TokenBuffer keep alive per
+    token of a generated source, and the time parsing from each takes"""
+
+    source_path = write_temporary_source(generate_source(2))
+
+    try:
+        runs = [
+            run_child(TOKEN_MEMORY, project_dir, source_path) for _ in range(repeat)
+        ]
+    finally:
+        os.remove(source_path)
+
+    results = {}
+
+    for name in ["list", "compact"]:
+        results[f"{name} bytes per token"] = summary([runs[0][name][0]], "bytes")
+        results[f"parse from {name}"] = summary([run[name][1] for run in runs])
+
+    return results
+
+
+def printing(project_dir, repeat):
+    """print_lines.crush prints a million lines to /dev/null, block buffered
+    by default, and with --print-buffer 1 every line written on its own as a
+    terminal gets them"""
+
+    source = program_path("print_lines.crush")
+
+    return {
+        "buffered": summary(time_program(source, (), repeat, project_dir)),
+        "--print-buffer 1": summary(
+            time_program(source, ["--print-buffer", "1"], repeat, project_dir)
+        ),
+    }
+
+
+CACHED_FUNCTIONS = 2_000
+
+
+def program_cache(project_dir, repeat):
+    """A large generated program run from an empty __crushcache__, scanning,
+    parsing and resolving the source, and then from the .crushc cached by the
+    previous run"""
+
+    directory = tempfile.mkdtemp()
+
+    try:
+        source = os.path.join(directory, "functions.crush")
+        cache = os.path.join(directory, "__crushcache__")
+
+        with open(source, "w") as file:
+            for index in range(CACHED_FUNCTIONS):
+                file.write(
+                    f"fn f{index}(a, b) {{\n"
+                    f"    let c = a * {index} + b;\n"
+                    f"    if (c > 10 and a != b) {{ return c - 1; }} else {{ return c; }}\n"
+                    f"}}\n"
+                )
+
+            file.write("print f0(1, 2);\n")
+
+        cold = []
+
+        for _ in range(repeat):
+            shutil.rmtree(cache, ignore_errors=True)
+            cold += time_program(source, (), 1, project_dir)
+
+        # the last cold run left the cache behind
+        warm = time_program(source, (), repeat, project_dir)
+    finally:
+        shutil.rmtree(directory)
+
+    return {"cold cache": summary(cold), "warm cache": summary(warm)}
+
+
+# runs in the child process: argv is [crusher_lang directory, functions, repeat]
+INCREMENTAL_TIMER = """
+import itertools
+import json
+import sys
+import time
+
+sys.path.insert(0, sys.argv[1])
+from lexer.scanner import Scanner
+from ast_generator.incremental_parser import IncrementalParser
+from ast_generator.optimizer import Optimizer
+from ast_generator.parser import Parser
+from ast_generator.resolver import Resolver
+
+
+def generate_program(functions, edited=None):
+    source = []
+
+    for index in range(functions):
+        factor = index + 1 if index != edited else -1
+        source.append(
+            f"fn f{index}(a, b) {{\\n"
+            f"    let c = a * {factor} + b;\\n"
+            f"    if (c > 10) {{ return c - 1; }}\\n"
+            f"    return c;\\n"
+            f"}}\\n"
+            f"print f{index}(1, 2);\\n"
+        )
+
+    return "".join(source)
+
+
+def new_parser():
+    return IncrementalParser(Scanner(), Parser(), Optimizer(0), Resolver())
+
+
+def times(function, repeat):
+    runs = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+
+    return runs
+
+
+functions, repeat = int(sys.argv[2]), int(sys.argv[3])
+original = generate_program(functions)
+edited = generate_program(functions, edited=functions // 2)
+full = times(lambda: new_parser().parse(original), repeat)
+
+incremental_parser = new_parser()
+incremental_parser.parse(original)
+
+# alternate between the two versions so every parse sees one edited function
+versions = itertools.cycle([edited, original])
+incremental = times(lambda: incremental_parser.parse(next(versions)), repeat)
+
+print(json.dumps([full, incremental]))
+"""
+
+INCREMENTAL_SIZES = [500, 4_000]
+
+
+def incremental_parsing(project_dir, repeat):
+    """How long --watch takes to parse a generated file again after one of its
+    functions changed, next to a full parse. The first only grows with the
+    cheap splitting of the file into chunks."""
+
+    results = {}
+
+    for functions in INCREMENTAL_SIZES:
+        full, incremental = run_child(
+            INCREMENTAL_TIMER, project_dir, str(functions), str(repeat)
+        )
+        results[f"{functions} functions full parse"] = summary(full)
+        results[f"{functions} functions after one edit"] = summary(incremental)
+
+    return results
+
+
+# runs in the child process: argv is [crusher_lang directory, interpreter arguments...]
+PEAK_MEMORY = """
+import os
+import resource
+import sys
+
+sys.path.insert(0, sys.argv[1])
+from crusher_interpreter import Interpreter
+
+sys.stdout = open(os.devnull, "w")
+Interpreter(["crusher"] + sys.argv[2:]).interpret()
+sys.stdout = sys.__stdout__
+
+# ru_maxrss is in kilobytes on Linux
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+"""
+
+STREAMED_STATEMENTS = 200_000
+
+
+def streaming_memory(project_dir, repeat):
+    """The peak memory of running a huge generated script, a long run of
+    independent top-level statements, whole and with --stream"""
+
+    directory = tempfile.mkdtemp()
+
+    try:
+        source = os.path.join(directory, "generated.crush")
+
+        with open(source, "w") as file:
+            file.write("let total = 0;\n")
+
+            for index in range(STREAMED_STATEMENTS):
+                file.write(f"total = total + {index} * 2; // statement {index}\n")
+
+            file.write("print total;\n")
+
+        results = {}
+
+        for name, arguments in [("whole file", []), ("--stream", ["--stream"])]:
+            # the program cache is written next to the source, it isn't what's measured
+            shutil.rmtree(os.path.join(directory, "__crushcache__"), True)
+            peak = run_child(PEAK_MEMORY, project_dir, *arguments, source)
+            results[f"{name} peak"] = summary([peak], "bytes")
+    finally:
+        shutil.rmtree(directory)
+
+    return results
+
+
+TAIL_DEPTH = 1_000_000
+
+TAIL_SOURCE = f"""
+fn count_down(n) {{
+    if (n == 0) {{
+        return "reached the bottom";
+    }}
+
+    return count_down(n - 1);
+}}
+
+print count_down({TAIL_DEPTH});
+"""
+
+
+def tail_recursion(project_dir, repeat):
+    """Whether every engine gets to the end of a tail recursion a million
+    calls deep, which only works when tail calls don't grow the Python stack"""
+
+    source_path = write_temporary_source(TAIL_SOURCE)
+    results = {}
+
+    try:
+        for engine in ENGINES:
+            failures = runs_to_completion(
+                project_dir,
+                source_path,
+                [f"--engine={engine}"],
+                '"reached the bottom"',
+            )
+
+            if failures is not None:
+                results[f"{engine} {TAIL_DEPTH:,} deep"] = summary(
+                    [failures], "failures"
+                )
+    finally:
+        os.remove(source_path)
+
+    return results
+
+
+DEPTHS = [100, 10_000, 200_000]
+
+# `1 + depth(n - 1)` has work left after the call, it can't be a tail call
+DEEP_SOURCE = """
+fn depth(n) {{
+    if (n == 0) {{
+        return 0;
+    }}
+
+    return 1 + depth(n - 1);
+}}
+
+print depth({depth});
+"""
+
+
+def deep_recursion(project_dir, repeat):
+    """Whether every engine gets to the bottom of recursions that aren't in
+    tail position, of a few depths"""
+
+    results = {}
+
+    for depth in DEPTHS:
+        source_path = write_temporary_source(DEEP_SOURCE.format(depth=depth))
+
+        try:
+            for engine in ENGINES:
+                failures = runs_to_completion(
+                    project_dir,
+                    source_path,
+                    [f"--engine={engine}", "--max-depth=0"],
+                    str(depth),
+                )
+
+                if failures is not None:
+                    results[f"{engine} {depth:,} deep"] = summary(
+                        [failures], "failures"
+                    )
+        finally:
+            os.remove(source_path)
+
+    return results
+
+
+CASES = {
+    "memoization": memoization,
+    "hooks": hooks,
+    "sampling": sampling,
+    "inline caches": inline_caches,
+    "node memory": node_memory,
+    "expression parsing": expression_parsing,
+    "scanners": scanners,
+    "token memory": token_memory,
+    "printing": printing,
+    "program cache": program_cache,
+    "incremental parsing": incremental_parsing,
+    "streaming memory": streaming_memory,
+    "tail recursion": tail_recursion,
+    "deep recursion": deep_recursion,
+}
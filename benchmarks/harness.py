@@ -0,0 +1,75 @@
+"""Helpers shared by the benchmark suite and its cases.
+
+Everything is measured in a fresh Python process that imports the interpreter
+of a given checkout, so the current tree can be compared against another one
+and interpreter start-up isn't part of the measurement.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARKS_DIR)
+PROGRAMS_DIR = os.path.join(BENCHMARKS_DIR, "programs")
+
+# runs in the child process: argv is [crusher_lang directory, interpreter arguments...]
+TIMER = """
+import os
+import sys
+import time
+
+sys.path.insert(0, sys.argv[1])
+from crusher_interpreter import Interpreter
+
+interpreter = Interpreter(["crusher"] + sys.argv[2:])
+stdout = sys.stdout
+sys.stdout = open(os.devnull, "w")
+
+start = time.perf_counter()
+interpreter.interpret()
+elapsed = time.perf_counter() - start
+
+sys.stdout = stdout
+print(elapsed)
+"""
+
+
+def program_path(name):
+    return os.path.join(PROGRAMS_DIR, name)
+
+
+def crusher_dir(project_dir):
+    return os.path.join(project_dir, "crusher_lang")
+
+
+def run_child(script, project_dir, *arguments):
+    """Runs `script` in a fresh Python process, its arguments being the
+    crusher_lang directory of `project_dir` then `arguments`, and returns the
+    last line it printed parsed as JSON. Raises CalledProcessError when the
+    script fails, when the checkout lacks what it measures for instance."""
+
+    completed = subprocess.run(
+        [sys.executable, "-c", script, crusher_dir(project_dir), *arguments],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def time_program(source, arguments=(), repeat=5, project_dir=PROJECT_DIR):
+    """Returns the times, in seconds, the interpreter of `project_dir` takes to
+    run the source file with the given extra arguments, one per run."""
+
+    return [run_child(TIMER, project_dir, *arguments, source) for _ in range(repeat)]
+
+
+def summary(values, unit="s"):
+    """What the suite records of a measure: its best and median value, the
+    lower the better, and the unit they're in"""
+
+    return {"best": min(values), "median": statistics.median(values), "unit": unit}
@@ -0,0 +1,374 @@
+"""Measures the interpreter of a checkout and compares the results of two runs.
+
+Run it from the project root:
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --output after.json --engine vm
+    python benchmarks/suite.py --output old.json --project ../crusher_lang_old
+    python benchmarks/suite.py --case hooks --case "tail recursion"
+    python benchmarks/suite.py --compare before.json after.json --threshold 5
+
+First every program is scanned, parsed, resolved and executed `--repeat` times
+in a fresh Python process, each phase timed on its own with the chosen engine.
+The programs cover recursion, counting loops, nested calls, string
+concatenation, deep scope chains, returns, tail calls and a large generated
+source for the scanner and parser. Then every case of cases.py measures one
+feature: memoization, hooks, sampling, the inline caches, node and token
+memory, expression parsing, the scanners, printing, the program cache,
+incremental parsing, streaming, tail and deep recursion.
+
+The best and median of every measure is printed and, with --output, written
+as JSON. With --project another checkout is measured instead, an older one
+runs what it can: the phases it has, and the cases it doesn't predate.
+
+--compare reads two result files and flags every measure that got worse by
+more than --threshold percent, exiting with status 1 if any did. Phases too
+short to time reliably are left out.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from cases import CASES
+from harness import PROJECT_DIR
+from harness import program_path
+from harness import run_child
+from harness import summary
+
+# the name --case gives to timing the phases of the programs
+PROGRAMS_CASE = "programs"
+
+PROGRAMS = [
+    "fibonacci.crush",
+    "nested_loops.crush",
+    "calls.crush",
+    "nested_calls.crush",
+    "strings.crush",
+    "scope_chain.crush",
+    "returns.crush",
+    "tail_calls.crush",
+]
+
+# the generated source repeats this snippet, every copy does the same work
+GENERATED = "generated.crush"
+GENERATED_SNIPPETS = 2000
+SNIPPET = """// scales and sums the first few numbers
+fn sum_{index}(limit, scale) {{
+    let sum = 0;
+    let i = 0;
+    while (i < limit and sum != -1) {{
+        sum = sum + i * {index}.5 / scale;
+        i = i + 1;
+    }}
+    if (!(sum >= 100)) {{ print "small {index}"; }} else {{ print "large"; }}
+    return sum;
+}}
+let result_{index} = sum_{index}(10, 2) + -{index};
+"""
+
+PHASES = ("scan", "parse", "resolve", "execute")
+
+# phases faster than this, in seconds, in both files are too noisy to compare
+MIN_COMPARED = 0.001
+
+# runs in the child process: argv is [crusher_lang directory, source file,
+# repeat, engine]. Prints the times of every phase of every run as JSON.
+# Older checkouts have fewer parts and options, what they lack is detected
+# so they can be timed too.
+SUITE_TIMER = """
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, sys.argv[1])
+from ast_generator.parser import Parser
+from crusher_interpreter import Interpreter
+
+try:
+    from lexer.regex_scanner import RegexScanner as Scanner
+except ImportError:
+    from lexer.scanner import Scanner
+
+try:
+    from ast_generator.resolver import Resolver
+except ImportError:
+    Resolver = None
+
+source_path, repeat, engine = sys.argv[2], int(sys.argv[3]), sys.argv[4]
+
+with open(source_path) as file:
+    source = file.read()
+
+
+def create_interpreter(*arguments):
+    # memoization would answer most of the calls the programs make. Older
+    # checkouts don't know --no-memo, the oldest take no option at all.
+    for options in (["--no-memo", "--engine", engine], ["--engine", engine]):
+        try:
+            interpreter = Interpreter(["crusher", *options, *arguments])
+        except SystemExit:
+            continue
+
+        if hasattr(interpreter, "options"):
+            return interpreter
+
+        break
+
+    if engine != "tree":
+        sys.exit(f"This checkout has no {engine} engine.")
+
+    return Interpreter(["crusher", *arguments])
+
+
+def execute_file(statements_time):
+    # before Interpreter.execute parsed statements couldn't be run on their
+    # own: the file is run through the command line entry point instead, less
+    # the time its statements took to get. A copy is run, so that no program
+    # cached next to the file skips the parsing.
+    directory = tempfile.mkdtemp()
+
+    try:
+        interpreter = create_interpreter(shutil.copy(source_path, directory))
+        start = time.perf_counter()
+        interpreter.interpret()
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+
+    return max(elapsed - statements_time, 0.0)
+
+
+times = {"scan": [], "parse": [], "execute": []}
+
+if Resolver is not None:
+    times["resolve"] = []
+
+stdout = sys.stdout
+sys.stdout = open(os.devnull, "w")
+
+for _ in range(repeat):
+    start = time.perf_counter()
+    tokens = Scanner().scan(source)
+    scanned = time.perf_counter()
+    statements = Parser().parse(tokens)
+    parsed = time.perf_counter()
+    times["scan"].append(scanned - start)
+    times["parse"].append(parsed - scanned)
+
+    if Resolver is not None:
+        statements = Resolver().resolve(statements)
+        times["resolve"].append(time.perf_counter() - parsed)
+
+    if hasattr(Interpreter, "execute"):
+        interpreter = create_interpreter()
+        start = time.perf_counter()
+        interpreter.execute(statements)
+
+        # checkouts that buffer print but whose execute() doesn't write the
+        # buffer out still pay for the writes
+        if hasattr(interpreter, "output"):
+            interpreter.output.flush()
+
+        times["execute"].append(time.perf_counter() - start)
+    else:
+        times["execute"].append(execute_file(time.perf_counter() - start))
+
+sys.stdout = stdout
+print(json.dumps(times))
+"""
+
+
+def time_phases(project_dir, source_path, repeat, engine):
+    """Returns the summary of every phase the checkout has"""
+
+    times = run_child(SUITE_TIMER, project_dir, source_path, str(repeat), engine)
+
+    return {phase: summary(times[phase]) for phase in PHASES if phase in times}
+
+
+def format_measure(measure):
+    value, unit = measure["best"], measure.get("unit", "s")
+
+    if unit == "s":
+        return f"{value * 1000:9.2f} ms"
+
+    if unit == "bytes":
+        return (
+            f"{value / 1024 / 1024:9.2f} MB"
+            if value >= 1024 * 1024
+            else f"{value:9.1f} B"
+        )
+
+    if unit == "%":
+        return f"{value:9.1f} %"
+
+    return f"{'failed' if value else 'ok':>9}"
+
+
+def run_programs(project_dir, repeat, engine):
+    results = {}
+    descriptor, generated_path = tempfile.mkstemp(suffix=".crush")
+
+    try:
+        with os.fdopen(descriptor, "w") as file:
+            file.write(
+                "".join(
+                    SNIPPET.format(index=index) for index in range(GENERATED_SNIPPETS)
+                )
+            )
+
+        sources = [(program, program_path(program)) for program in PROGRAMS]
+        sources.append((GENERATED, generated_path))
+
+        for name, path in sources:
+            try:
+                results[name] = time_phases(project_dir, path, repeat, engine)
+            except subprocess.CalledProcessError:
+                print(f"{name:<24} skipped, the checkout can't run it")
+                continue
+
+            print(
+                f"{name:<24}"
+                + "".join(
+                    f" {phase} {format_measure(measure)}"
+                    for phase, measure in results[name].items()
+                )
+            )
+    finally:
+        os.remove(generated_path)
+
+    return results
+
+
+def run_cases(project_dir, repeat, names):
+    results = {}
+
+    for name in names:
+        try:
+            measures = CASES[name](project_dir, repeat)
+        except subprocess.CalledProcessError:
+            measures = {}
+
+        if not measures:
+            print(f"{name:<24} skipped, the checkout can't run it")
+            continue
+
+        results[name] = measures
+
+        for measure, result in results[name].items():
+            print(f"{name:<24} {measure:<40} {format_measure(result)}")
+
+    return results
+
+
+def run_suite(project_dir, repeat, engine, names):
+    results = {}
+
+    if PROGRAMS_CASE in names:
+        results.update(run_programs(project_dir, repeat, engine))
+
+    results.update(
+        run_cases(project_dir, repeat, [name for name in names if name in CASES])
+    )
+
+    return {
+        "python": platform.python_version(),
+        "engine": engine,
+        "repeat": repeat,
+        "benchmarks": results,
+    }
+
+
+def compare(before_path, after_path, threshold):
+    """Prints how every measure changed, returns whether any regressed"""
+
+    with open(before_path) as file:
+        before = json.load(file)["benchmarks"]
+
+    with open(after_path) as file:
+        after = json.load(file)["benchmarks"]
+
+    regressed = False
+
+    for name in before:
+        if name not in after:
+            continue
+
+        for measure in before[name]:
+            if measure not in after[name]:
+                continue
+
+            old = before[name][measure]["best"]
+            new = after[name][measure]["best"]
+            unit = before[name][measure].get("unit", "s")
+
+            if unit == "s" and old < MIN_COMPARED and new < MIN_COMPARED:
+                continue
+
+            if old:
+                change = f"{(new / old - 1) * 100:+6.1f}%"
+                worse = (new / old - 1) * 100 > threshold
+            else:
+                # nothing to take a percentage of, a failure that wasn't there
+                change = "   new" if new else ""
+                worse = new > 0
+
+            print(
+                f"{name:<24} {measure:<40} {format_measure(before[name][measure])} -> "
+                f"{format_measure(after[name][measure])}  {change}"
+                + ("   REGRESSION" if worse else "")
+            )
+            regressed = regressed or worse
+
+    return regressed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--output", help="write the results to this JSON file")
+    arg_parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="compare two result files instead of running the suite",
+    )
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percent a measure may get worse before it's flagged (default: 10)",
+    )
+    arg_parser.add_argument(
+        "--project", default=PROJECT_DIR, help="root of the checkout to measure"
+    )
+    arg_parser.add_argument(
+        "--case",
+        action="append",
+        choices=[PROGRAMS_CASE, *CASES],
+        help="run only this case, can be repeated (default: all of them)",
+    )
+    arg_parser.add_argument("--engine", default="tree")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    if args.compare is not None:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    names = args.case or [PROGRAMS_CASE, *CASES]
+    results = run_suite(args.project, args.repeat, args.engine, names)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
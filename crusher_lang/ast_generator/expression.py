@@ -36,15 +36,28 @@ class ExpressionVisitor(ABC):
 
 
 class Expression(ABC):
+    # nodes have no per-instance __dict__, every node class lists its fields
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor):
         pass
 
 
 class Assignment(Expression):
+    __slots__ = ("identifier", "value", "depth", "slot", "forward", "fallback")
+
     def __init__(self, identifier, value):
         self.identifier = identifier
         self.value = value
+        # scope distance and slot index, filled in by the resolver.
+        # Both stay None for globals.
+        self.depth = None
+        self.slot = None
+        # like Variable.forward and Variable.fallback, the slot can still be
+        # UNDEFINED and the variable it shadows is assigned meanwhile
+        self.forward = False
+        self.fallback = ()
 
     def accept(self, visitor):
         return visitor.visit_assignment(self)
@@ -54,6 +67,8 @@ class Assignment(Expression):
 
 
 class Binary(Expression):
+    __slots__ = ("left", "token", "right")
+
     def __init__(self, left, token, right):
         self.left = left
         self.token = token
@@ -67,9 +82,14 @@ class Binary(Expression):
 
 
 class Call(Expression):
+    __slots__ = ("callee", "arguments", "cached_callee")
+
     def __init__(self, callee, arguments):
         self.callee = callee
         self.arguments = arguments
+        # inline cache of the interpreter: the last function called from here,
+        # already checked to be a function taking this many arguments
+        self.cached_callee = None
 
     def accept(self, visitor):
         return visitor.visit_call(self)
@@ -79,6 +99,8 @@ class Call(Expression):
 
 
 class Grouping(Expression):
+    __slots__ = ("expr",)
+
     def __init__(self, expr):
         self.expr = expr
 
@@ -90,6 +112,8 @@ class Grouping(Expression):
 
 
 class Literal(Expression):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -101,6 +125,8 @@ class Literal(Expression):
 
 
 class Logical(Expression):
+    __slots__ = ("left", "token", "right")
+
     def __init__(self, left, token, right):
         self.left = left
         self.token = token
@@ -114,6 +140,8 @@ class Logical(Expression):
 
 
 class Unary(Expression):
+    __slots__ = ("token", "right")
+
     def __init__(self, token, right):
         self.token = token
         self.right = right
@@ -126,8 +154,32 @@ class Unary(Expression):
 
 
 class Variable(Expression):
+    __slots__ = (
+        "name",
+        "depth",
+        "slot",
+        "forward",
+        "fallback",
+        "cached_globals",
+        "cached_cell",
+    )
+
     def __init__(self, name):
         self.name = name
+        # scope distance and slot index, filled in by the resolver.
+        # Both stay None for globals.
+        self.depth = None
+        self.slot = None
+        # set by the resolver when a function reads a local of an enclosing
+        # scope declared after it, the slot can still be UNDEFINED then.
+        # The variable it shadows is read until it's declared: the first
+        # defined of the `fallback` (depth, slot) pairs, else the global.
+        self.forward = False
+        self.fallback = ()
+        # inline cache of the interpreter for globals: the global table read
+        # last time and the cell of the global in it
+        self.cached_globals = None
+        self.cached_cell = None
 
     def accept(self, visitor):
         return visitor.visit_variable(self)
@@ -0,0 +1,108 @@
+import re
+
+from .line_shifter import LineShifter
+
+# what the splitter has to look at: strings and comments (so braces and `fn`s
+# inside them are ignored), braces, and the `fn` keyword.
+TOP_LEVEL_PATTERN = re.compile(r'"[^"]*"?|//[^\n]*|[{}]|\bfn\b')
+
+
+def split_top_level(raw_text):
+    """Splits the source into chunks of top-level code without scanning it.
+    Every top-level function declaration, from `fn` to its closing brace,
+    is a chunk of its own, the code between two functions is another one.
+    Yields `(text, line)` pairs, `line` being the line the chunk starts on.
+    """
+
+    depth = 0
+    chunk_start = 0
+    line = 1
+    line_counted_to = 0
+    in_function = False
+
+    def chunk(end):
+        nonlocal line, line_counted_to
+
+        line += raw_text.count("\n", line_counted_to, chunk_start)
+        line_counted_to = chunk_start
+
+        return raw_text[chunk_start:end], line
+
+    for match in TOP_LEVEL_PATTERN.finditer(raw_text):
+        lexeme = match.group()
+
+        if lexeme == "{":
+            depth += 1
+        elif lexeme == "}":
+            depth -= 1
+
+            if in_function and depth == 0:
+                yield chunk(match.end())
+                chunk_start = match.end()
+                in_function = False
+        elif lexeme == "fn" and depth == 0 and not in_function:
+            if raw_text[chunk_start : match.start()].strip():
+                yield chunk(match.start())
+
+            chunk_start = match.start()
+            in_function = True
+
+    if raw_text[chunk_start:].strip():
+        yield chunk(len(raw_text))
+
+
+class IncrementalParser:
+    """Parses successive versions of the same source file.
+    The statements parsed from every chunk of top-level code (see split_top_level)
+    are kept, keyed by the chunk's text. Parsing a new version of the file only
+    scans, parses, optimizes and resolves the chunks that changed, the
+    statements of the others are reused, moved to the line their chunk now
+    starts on. Token columns count from the start of their chunk, they stay
+    right wherever it moves.
+    Top-level functions are resolved independently of the code around them
+    (globals are looked up by name), which is what makes reusing them safe.
+    """
+
+    def __init__(self, scanner, parser, optimizer, resolver):
+        self.scanner = scanner
+        self.parser = parser
+        self.optimizer = optimizer
+        self.resolver = resolver
+        self.chunks = {}  # text -> (statements, line they were parsed on)
+        self.line_shifter = LineShifter()
+        self.reused = 0  # chunks reused by the last call to parse
+
+    def parse(self, raw_text):
+        chunks = {}
+        statements = []
+        self.reused = 0
+
+        try:
+            for text, line in split_top_level(raw_text):
+                # popped, a chunk repeated in the file can't reuse it twice
+                parsed, parsed_line = self.chunks.pop(text, (None, None))
+
+                if parsed is None:
+                    parsed = self.__parse(text, line)
+                else:
+                    self.reused += 1
+
+                    if parsed_line != line:
+                        self.line_shifter.shift(parsed, line - parsed_line)
+
+                chunks[text] = (parsed, line)
+                statements.extend(parsed)
+        except Exception:
+            # an edit that doesn't parse can cut the file where the splitter
+            # didn't expect, parsing it whole reports the error it really has.
+            self.chunks = {}
+            return self.__parse(raw_text, 1)
+
+        self.chunks = chunks
+        return statements
+
+    def __parse(self, raw_text, line):
+        tokens = self.scanner.scan(raw_text=raw_text, line=line)
+        statements = self.optimizer.optimize(self.parser.parse(tokens=tokens))
+
+        return self.resolver.resolve(statements)
@@ -0,0 +1,90 @@
+from .expression import ExpressionVisitor
+from .statement import StatementVisitor
+
+
+class LineShifter(ExpressionVisitor, StatementVisitor):
+    """Moves a syntax tree by a number of lines, the line of every statement
+    and of every token it holds. Tokens can't be changed, they are replaced
+    by moved copies."""
+
+    def __init__(self):
+        self.lines = 0
+
+    def shift(self, statements, lines):
+        self.lines = lines
+
+        for statement in statements:
+            statement.accept(self)
+
+    def __visit(self, *nodes):
+        for node in nodes:
+            if node is not None:
+                node.accept(self)
+
+    def __shift_token(self, token):
+        return token._replace(line=token.line + self.lines)
+
+    def __shift_statement(self, statement):
+        statement.line += self.lines
+
+    def visit_literal(self, literal_expr):
+        pass
+
+    def visit_variable(self, variable_expr):
+        variable_expr.name = self.__shift_token(variable_expr.name)
+
+    def visit_unary(self, unary_expr):
+        unary_expr.token = self.__shift_token(unary_expr.token)
+        self.__visit(unary_expr.right)
+
+    def visit_logical(self, logical_expr):
+        logical_expr.token = self.__shift_token(logical_expr.token)
+        self.__visit(logical_expr.left, logical_expr.right)
+
+    def visit_grouping(self, grouping_expr):
+        self.__visit(grouping_expr.expr)
+
+    def visit_call(self, call_expr):
+        self.__visit(call_expr.callee, *call_expr.arguments)
+
+    def visit_binary(self, binary_expr):
+        binary_expr.token = self.__shift_token(binary_expr.token)
+        self.__visit(binary_expr.left, binary_expr.right)
+
+    def visit_assignment(self, assignment_expr):
+        assignment_expr.identifier = self.__shift_token(assignment_expr.identifier)
+        self.__visit(assignment_expr.value)
+
+    def visit_while(self, while_stmt):
+        self.__shift_statement(while_stmt)
+        self.__visit(while_stmt.condition, while_stmt.body)
+
+    def visit_let(self, let_stmt):
+        self.__shift_statement(let_stmt)
+        let_stmt.name = self.__shift_token(let_stmt.name)
+        self.__visit(let_stmt.initializer)
+
+    def visit_return(self, return_stmt):
+        self.__shift_statement(return_stmt)
+        self.__visit(return_stmt.expr)
+
+    def visit_print(self, print_stmt):
+        self.__shift_statement(print_stmt)
+        self.__visit(print_stmt.expr)
+
+    def visit_if(self, if_stmt):
+        self.__shift_statement(if_stmt)
+        self.__visit(if_stmt.condition, if_stmt.then_branch, if_stmt.else_branch)
+
+    def visit_function(self, function_stmt):
+        self.__shift_statement(function_stmt)
+        function_stmt.name = self.__shift_token(function_stmt.name)
+        self.__visit(*function_stmt.parameters, *function_stmt.body)
+
+    def visit_block(self, block_stmt):
+        self.__shift_statement(block_stmt)
+        self.__visit(*block_stmt.statements)
+
+    def visit_expression(self, expression_stmt):
+        self.__shift_statement(expression_stmt)
+        self.__visit(expression_stmt.expr)
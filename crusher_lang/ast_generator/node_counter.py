@@ -0,0 +1,85 @@
+from .expression import ExpressionVisitor
+from .statement import StatementVisitor
+
+
+class NodeCounter(ExpressionVisitor, StatementVisitor):
+    """Counts the expression and statement nodes of a syntax tree,
+    function parameters included."""
+
+    def __init__(self):
+        self.nodes = 0
+
+    def count(self, statements):
+        self.nodes = 0
+
+        for statement in statements:
+            statement.accept(self)
+
+        return self.nodes
+
+    def __visit(self, *nodes):
+        for node in nodes:
+            if node is not None:
+                node.accept(self)
+
+    def visit_literal(self, literal_expr):
+        self.nodes += 1
+
+    def visit_variable(self, variable_expr):
+        self.nodes += 1
+
+    def visit_unary(self, unary_expr):
+        self.nodes += 1
+        self.__visit(unary_expr.right)
+
+    def visit_logical(self, logical_expr):
+        self.nodes += 1
+        self.__visit(logical_expr.left, logical_expr.right)
+
+    def visit_grouping(self, grouping_expr):
+        self.nodes += 1
+        self.__visit(grouping_expr.expr)
+
+    def visit_call(self, call_expr):
+        self.nodes += 1
+        self.__visit(call_expr.callee, *call_expr.arguments)
+
+    def visit_binary(self, binary_expr):
+        self.nodes += 1
+        self.__visit(binary_expr.left, binary_expr.right)
+
+    def visit_assignment(self, assignment_expr):
+        self.nodes += 1
+        self.__visit(assignment_expr.value)
+
+    def visit_while(self, while_stmt):
+        self.nodes += 1
+        self.__visit(while_stmt.condition, while_stmt.body)
+
+    def visit_let(self, let_stmt):
+        self.nodes += 1
+        self.__visit(let_stmt.initializer)
+
+    def visit_return(self, return_stmt):
+        self.nodes += 1
+        self.__visit(return_stmt.expr)
+
+    def visit_print(self, print_stmt):
+        self.nodes += 1
+        self.__visit(print_stmt.expr)
+
+    def visit_if(self, if_stmt):
+        self.nodes += 1
+        self.__visit(if_stmt.condition, if_stmt.then_branch, if_stmt.else_branch)
+
+    def visit_function(self, function_stmt):
+        self.nodes += 1
+        self.__visit(*function_stmt.parameters, *function_stmt.body)
+
+    def visit_block(self, block_stmt):
+        self.nodes += 1
+        self.__visit(*block_stmt.statements)
+
+    def visit_expression(self, expression_stmt):
+        self.nodes += 1
+        self.__visit(expression_stmt.expr)
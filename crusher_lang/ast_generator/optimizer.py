@@ -0,0 +1,203 @@
+import math
+
+from .expression import ExpressionVisitor
+from .expression import Grouping
+from .expression import Literal
+from .statement import BlockStatement
+from .statement import ReturnStatement
+from .statement import StatementVisitor
+from lexer.token_type import TokenType
+from crusher_state.operations import evaluate_binary
+from crusher_state.operations import evaluate_unary
+from crusher_state.operations import is_truthy
+from crusher_state.runtime_exceptions import CrusherRuntimeError
+
+# optimization levels accepted by -O
+OPTIMIZATION_LEVELS = (0, 1, 2)
+
+
+class Optimizer(ExpressionVisitor, StatementVisitor):
+    """Rewrites the parsed program before it is resolved.
+    Level 1 folds operators whose operands are all literals into a single literal.
+    Level 2 also drops code that can never run: the untaken branch of an if
+    with a constant condition, loops whose condition is constantly false and
+    statements following a return.
+    An operation that would fail at runtime is never folded, so the error is
+    still reported when (and only if) the program reaches it.
+    """
+
+    def __init__(self, level=1):
+        self.level = level
+
+    def optimize(self, statements):
+        if self.level == 0:
+            return statements
+
+        return self.__optimize_statements(statements)
+
+    def __optimize(self, node):
+        if node is None:
+            return None
+
+        return node.accept(self)
+
+    def __optimize_statements(self, statements):
+        optimized = []
+
+        for statement in statements:
+            statement = self.__optimize(statement)
+
+            if statement is None:
+                continue
+
+            optimized.append(statement)
+
+            if self.level >= 2 and isinstance(statement, ReturnStatement):
+                break
+
+        return optimized
+
+    def __optimize_branch(self, branch):
+        # a branch can't be removed from under an if or while, it's emptied instead
+        optimized = self.__optimize(branch)
+
+        if optimized is None:
+            optimized = BlockStatement([])
+            optimized.line = branch.line
+
+        return optimized
+
+    def __fold(self, node, operation, *operands):
+        try:
+            value = operation(*operands)
+        except (CrusherRuntimeError, ArithmeticError):
+            return node
+
+        # overflowing to infinity is left to runtime, no literal can spell it
+        if isinstance(value, float) and not math.isfinite(value):
+            return node
+
+        return Literal(value)
+
+    def visit_literal(self, literal_expr):
+        return literal_expr
+
+    def visit_variable(self, variable_expr):
+        return variable_expr
+
+    def visit_unary(self, unary_expr):
+        unary_expr.right = self.__optimize(unary_expr.right)
+
+        if isinstance(unary_expr.right, Literal):
+            return self.__fold(
+                unary_expr, evaluate_unary, unary_expr.token, unary_expr.right.value
+            )
+
+        return unary_expr
+
+    def visit_logical(self, logical_expr):
+        logical_expr.left = self.__optimize(logical_expr.left)
+        logical_expr.right = self.__optimize(logical_expr.right)
+
+        if not isinstance(logical_expr.left, Literal):
+            return logical_expr
+
+        # the right operand only runs when the left one doesn't decide the result
+        left_decides = is_truthy(logical_expr.left.value)
+
+        if logical_expr.token.token_type == TokenType.AND:
+            left_decides = not left_decides
+
+        return logical_expr.left if left_decides else logical_expr.right
+
+    def visit_grouping(self, grouping_expr):
+        grouping_expr.expr = self.__optimize(grouping_expr.expr)
+
+        if isinstance(grouping_expr.expr, (Literal, Grouping)):
+            return grouping_expr.expr
+
+        return grouping_expr
+
+    def visit_call(self, call_expr):
+        call_expr.callee = self.__optimize(call_expr.callee)
+        call_expr.arguments = [
+            self.__optimize(argument) for argument in call_expr.arguments
+        ]
+
+        return call_expr
+
+    def visit_binary(self, binary_expr):
+        binary_expr.left = self.__optimize(binary_expr.left)
+        binary_expr.right = self.__optimize(binary_expr.right)
+
+        if isinstance(binary_expr.left, Literal) and isinstance(
+            binary_expr.right, Literal
+        ):
+            return self.__fold(
+                binary_expr,
+                evaluate_binary,
+                binary_expr.token,
+                binary_expr.left.value,
+                binary_expr.right.value,
+            )
+
+        return binary_expr
+
+    def visit_assignment(self, assignment_expr):
+        assignment_expr.value = self.__optimize(assignment_expr.value)
+        return assignment_expr
+
+    def visit_while(self, while_stmt):
+        while_stmt.condition = self.__optimize(while_stmt.condition)
+
+        if (
+            self.level >= 2
+            and isinstance(while_stmt.condition, Literal)
+            and not is_truthy(while_stmt.condition.value)
+        ):
+            return None
+
+        while_stmt.body = self.__optimize_branch(while_stmt.body)
+        return while_stmt
+
+    def visit_let(self, let_stmt):
+        let_stmt.initializer = self.__optimize(let_stmt.initializer)
+        return let_stmt
+
+    def visit_return(self, return_stmt):
+        return_stmt.expr = self.__optimize(return_stmt.expr)
+        return return_stmt
+
+    def visit_print(self, print_stmt):
+        print_stmt.expr = self.__optimize(print_stmt.expr)
+        return print_stmt
+
+    def visit_if(self, if_stmt):
+        if_stmt.condition = self.__optimize(if_stmt.condition)
+
+        if self.level >= 2 and isinstance(if_stmt.condition, Literal):
+            # a branch that is a block keeps its own scope, so it can stand alone
+            if is_truthy(if_stmt.condition.value):
+                return self.__optimize(if_stmt.then_branch)
+
+            return self.__optimize(if_stmt.else_branch)
+
+        if_stmt.then_branch = self.__optimize_branch(if_stmt.then_branch)
+
+        if if_stmt.else_branch is not None:
+            if_stmt.else_branch = self.__optimize_branch(if_stmt.else_branch)
+
+        return if_stmt
+
+    def visit_function(self, function_stmt):
+        # parameters are left alone, the runtime checks they are identifiers
+        function_stmt.body = self.__optimize_statements(function_stmt.body)
+        return function_stmt
+
+    def visit_block(self, block_stmt):
+        block_stmt.statements = self.__optimize_statements(block_stmt.statements)
+        return block_stmt
+
+    def visit_expression(self, expression_stmt):
+        expression_stmt.expr = self.__optimize(expression_stmt.expr)
+        return expression_stmt
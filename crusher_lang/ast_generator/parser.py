@@ -16,6 +16,28 @@ from .statement import LetStatement
 from .statement import WhileStatement
 from lexer.token_type import TokenType
 
+# Binding power and node class of every binary operator, from loosest to tightest.
+# All of them are left associative.
+BINARY_OPERATORS = {
+    TokenType.OR: (1, Logical),
+    TokenType.AND: (2, Logical),
+    TokenType.BANG_EQUAL: (3, Binary),
+    TokenType.EQUAL_EQUAL: (3, Binary),
+    TokenType.GREATER: (4, Binary),
+    TokenType.GREATER_EQUAL: (4, Binary),
+    TokenType.LESS: (4, Binary),
+    TokenType.LESS_EQUAL: (4, Binary),
+    TokenType.PLUS: (5, Binary),
+    TokenType.MINUS: (5, Binary),
+    TokenType.SLASH: (6, Binary),
+    TokenType.STAR: (6, Binary),
+}
+
+UNARY_OPERATORS = {TokenType.BANG, TokenType.MINUS}
+
+# tokens that are an expression on their own, and the value of their Literal
+LITERAL_KEYWORDS = {TokenType.TRUE: True, TokenType.FALSE: False, TokenType.NULL: None}
+
 
 class ParserException(Exception):
     """Crusher parser exception"""
@@ -27,10 +49,12 @@ class Parser:
     def __init__(self):
         self.tokens = []
         self.current = 0
+        self.token_source = iter(())
 
-    def __init_parser(self, tokens):
+    def __init_parser(self, tokens, token_source=()):
         self.tokens = tokens
         self.current = 0
+        self.token_source = iter(token_source)
 
     def parse(self, tokens):
         self.__init_parser(tokens)
@@ -41,16 +65,45 @@ class Parser:
 
         return statements
 
+    def parse_stream(self, tokens):
+        """Yields the top-level statements one at a time.
+        Tokens are pulled from the `tokens` iterable only when the parser needs
+        them and dropped once their statement is parsed, so at any time only
+        the tokens of the statement being parsed are held in memory.
+        """
+
+        self.__init_parser([], tokens)
+
+        while not self.__is_at_end:
+            statement = self.__declaration()
+
+            # __previous may still look one token back
+            del self.tokens[: self.current - 1]
+            self.current = min(self.current, 1)
+
+            yield statement
+
     def __declaration(self):
-        if self.__match(TokenType.FN):
-            return self.__function_declaration()
+        line = self.__line
 
-        if self.__match(TokenType.LET):
-            return self.__let_declaration()
+        if self.__match(TokenType.FN):
+            statement = self.__function_declaration()
+        elif self.__match(TokenType.LET):
+            statement = self.__let_declaration()
+        else:
+            return self.__statement()
 
-        return self.__statement()
+        statement.line = line
+        return statement
 
     def __statement(self):
+        line = self.__line
+        statement = self.__statement_without_line()
+        statement.line = line
+
+        return statement
+
+    def __statement_without_line(self):
         if self.__match(TokenType.WHILE):
             return self.__while_statement()
 
@@ -161,7 +214,7 @@ class Parser:
         return self.__assignment()
 
     def __assignment(self):
-        expr = self.__or()
+        expr = self.__binary(1)
 
         if self.__match(TokenType.EQUAL):
             if not isinstance(expr, Variable):
@@ -172,74 +225,31 @@ class Parser:
 
         return expr
 
-    def __or(self):
-        expr = self.__and()
-
-        while self.__match(TokenType.OR):
-            operator = self.__previous
-            right = self.__and()
-            expr = Logical(expr, operator, right)
-
-        return expr
-
-    def __and(self):
-        expr = self.__equality()
-
-        while self.__match(TokenType.AND):
-            operator = self.__previous
-            right = self.__equality()
-            expr = Logical(expr, operator, right)
-
-        return expr
-
-    def __equality(self):
-        expr = self.__comparison()
-
-        while self.__match_many(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.__previous
-            right = self.__comparison()
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def __comparison(self):
-        expr = self.__term()
-
-        while self.__match_many(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator = self.__previous
-            right = self.__term()
-            expr = Binary(expr, operator, right)
-
-        return expr
+    def __binary(self, min_power):
+        """Pratt parser for the binary operators. Parses an expression made of
+        operators binding at least as tight as `min_power`, see BINARY_OPERATORS."""
 
-    def __term(self):
-        expr = self.__factor()
+        expr = self.__unary()
 
-        while self.__match_many(TokenType.PLUS, TokenType.MINUS):
-            operator = self.__previous
-            right = self.__factor()
-            expr = Binary(expr, operator, right)
+        while not self.__is_at_end:
+            operator = self.__current
+            binary_operator = BINARY_OPERATORS.get(operator.token_type)
 
-        return expr
+            if binary_operator is None or binary_operator[0] < min_power:
+                return expr
 
-    def __factor(self):
-        expr = self.__unary()
+            power, node_class = binary_operator
+            self.current += 1
 
-        while self.__match_many(TokenType.SLASH, TokenType.STAR):
-            operator = self.__previous
-            right = self.__unary()
-            expr = Binary(expr, operator, right)
+            # only tighter operators go to the right operand: left associativity
+            right = self.__binary(power + 1)
+            expr = node_class(expr, operator, right)
 
         return expr
 
     def __unary(self):
-        if self.__match_many(TokenType.BANG, TokenType.MINUS):
-            operator = self.__previous
+        if not self.__is_at_end and self.__current.token_type in UNARY_OPERATORS:
+            operator = self.__advance()
             right = self.__unary()
 
             return Unary(operator, right)
@@ -270,22 +280,26 @@ class Parser:
         return Call(callee=callee, arguments=args)
 
     def __primary(self):
-        if self.__match(TokenType.TRUE):
-            return Literal(True)
+        if self.__is_at_end:
+            raise ParserException("Unexpected expression")
 
-        if self.__match(TokenType.FALSE):
-            return Literal(False)
+        token = self.__current
+        token_type = token.token_type
 
-        if self.__match(TokenType.NULL):
-            return Literal(None)
+        if token_type == TokenType.IDENTIFIER:
+            self.current += 1
+            return Variable(token)
 
-        if self.__match(TokenType.IDENTIFIER):
-            return Variable(self.__previous)
+        if token_type == TokenType.NUMBER or token_type == TokenType.STRING:
+            self.current += 1
+            return Literal(token.literal)
 
-        if self.__match_many(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.__previous.literal)
+        if token_type in LITERAL_KEYWORDS:
+            self.current += 1
+            return Literal(LITERAL_KEYWORDS[token_type])
 
-        if self.__match(TokenType.LEFT_PAREN):
+        if token_type == TokenType.LEFT_PAREN:
+            self.current += 1
             expr = self.__expression()
             self.__assert_match(
                 TokenType.RIGHT_PAREN, "Expect closing ')' after an expression"
@@ -299,6 +313,12 @@ class Parser:
     def __current(self):
         return self.tokens[self.current]
 
+    @property
+    def __line(self):
+        """Line of the current token, None once all of them are consumed"""
+
+        return None if self.__is_at_end else self.__current.line
+
     @property
     def __previous(self):
         return self.tokens[self.current - 1]
@@ -311,7 +331,18 @@ class Parser:
 
     @property
     def __is_at_end(self):
-        return self.current >= len(self.tokens)
+        return self.current >= len(self.tokens) and not self.__pull_token()
+
+    def __pull_token(self):
+        """Appends the next token of the stream being parsed, False when it's exhausted"""
+
+        token = next(self.token_source, None)
+
+        if token is None:
+            return False
+
+        self.tokens.append(token)
+        return True
 
     def __match(self, token_type):
         if self.__is_at_end:
@@ -332,13 +363,6 @@ class Parser:
 
         return True
 
-    def __match_many(self, *token_type):
-        for type in token_type:
-            if self.__match(type):
-                return True
-
-        return False
-
     def __assert_match(self, token_type, message=None):
         if self.__match(token_type=token_type):
             return self.tokens[self.current - 1]
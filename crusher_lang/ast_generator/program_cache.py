@@ -0,0 +1,78 @@
+"""Caches the parsed program of a source file on disk.
+A .crushc file holds the pickled statement list, already optimized and
+resolved, along with the number of tokens it was parsed from, so a later
+run of the unchanged source skips the scanner, the parser, the optimizer
+and the resolver. Its first line is the key of the source it was parsed
+from, a run of an edited source overwrites it.
+"""
+
+import os
+import pickle
+
+from transpiler.module_cache import cache_file_path
+from transpiler.module_cache import cache_key
+from transpiler.module_cache import can_write_cache
+
+# what loading a missing, truncated or corrupted cache file raises. Unpickling
+# runs code named by the file, the __crushcache__ directory must be trusted.
+UNREADABLE_CACHE_ERRORS = (
+    OSError,
+    EOFError,
+    pickle.UnpicklingError,
+    AttributeError,
+    ImportError,
+    RecursionError,
+)
+
+# bump whenever the shape of the AST or of the resolver's annotations changes,
+# it's part of the cache key so programs cached by an older interpreter are ignored
+PROGRAM_CACHE_VERSION = "12"
+
+PROGRAM_CACHE_EXTENSION = ".crushc"
+
+
+def cached_program_path(file_name):
+    return cache_file_path(file_name, PROGRAM_CACHE_EXTENSION)
+
+
+def program_cache_key(raw_text, optimization_level=0):
+    return cache_key(f"{PROGRAM_CACHE_VERSION}\0{optimization_level}\0{raw_text}")
+
+
+def read_cached_program(path, key):
+    """Returns the cached (statement list, token count), None when there is
+    no usable cache"""
+
+    try:
+        with open(path, "rb") as file:
+            if file.readline() != f"{key}\n".encode("ascii"):
+                return None
+
+            return pickle.load(file)
+    except UNREADABLE_CACHE_ERRORS:
+        # an unreadable cache is a miss, the program is parsed again and the
+        # file rewritten
+        return None
+
+
+def write_cached_program(path, key, statements, token_count):
+    if not can_write_cache(path):
+        return
+
+    # written to a temporary file first so a concurrent run never loads half a program
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(temporary_path, "wb") as file:
+            file.write(f"{key}\n".encode("ascii"))
+            pickle.dump((statements, token_count), file, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporary_path, path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        # a cache that can't be written (full disk, ...) only costs speed
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
@@ -0,0 +1,212 @@
+from .expression import ExpressionVisitor
+from .expression import Variable
+from .statement import FunctionStatement
+from .statement import StatementVisitor
+
+
+class FunctionFacts:
+    """What the analyzer found out about one function's body.
+    `blocks` counts the blocks entered inside the function at the current point
+    of the walk: a resolved variable with a larger depth lives outside it.
+    """
+
+    __slots__ = ("function_stmt", "impure", "calls", "blocks")
+
+    def __init__(self, function_stmt):
+        self.function_stmt = function_stmt
+        self.impure = False
+        self.calls = set()  # names of the global functions it calls
+        self.blocks = 0
+
+
+class PurityAnalyzer(ExpressionVisitor, StatementVisitor):
+    """Runs after the resolver and marks the functions whose result only
+    depends on their arguments, by setting FunctionStatement.pure.
+    A pure function only reads its own parameters and locals, only calls
+    global functions that are pure themselves, has no print, assigns no
+    variable declared outside of it and declares no nested function.
+    Calls to a pure function can then be memoized.
+
+    Global functions are only trusted while their name is never assigned to,
+    the analyzer remembers every program it analyzed (each line of the REPL)
+    and withdraws purity when a later one assigns to a function's name.
+    """
+
+    def __init__(self):
+        self.global_functions = {}  # top-level function name -> its FunctionFacts
+        self.assigned_globals = set()
+        self.callers = {}  # global name -> FunctionFacts of the functions calling it
+        self.functions = []  # facts of the functions being walked, innermost last
+        self.found = []  # facts of the functions of the program being analyzed
+        self.newly_assigned = set()  # global names first assigned by that program
+
+    def analyze(self, statements):
+        self.found = []
+        self.newly_assigned = set()
+
+        for statement in statements:
+            if not isinstance(statement, FunctionStatement):
+                statement.accept(self)
+                continue
+
+            name = statement.name.lexeme
+
+            if name in self.global_functions:
+                # declaring it again fails at runtime, the name can't be trusted
+                self.__assign_global(name)
+
+            self.global_functions[name] = self.__analyze_function(statement)
+
+        self.__mark_pure_functions()
+        return statements
+
+    def __mark_pure_functions(self):
+        impure = []
+
+        for facts in self.found:
+            for name in facts.calls:
+                self.callers.setdefault(name, []).append(facts)
+
+        for facts in self.found:
+            facts.function_stmt.pure = not facts.impure
+
+        for facts in self.found:
+            if not facts.function_stmt.pure or not all(
+                self.__is_trusted(name) for name in facts.calls
+            ):
+                impure.append(facts)
+
+        # whatever calls a name that was just assigned to can't be pure anymore
+        for name in self.newly_assigned:
+            impure.extend(self.callers.get(name, ()))
+
+        # then neither can the callers of an impure function, and so on
+        while impure:
+            facts = impure.pop()
+            facts.function_stmt.pure = False
+            name = facts.function_stmt.name.lexeme
+
+            if self.global_functions.get(name) is not facts:
+                continue
+
+            for caller in self.callers.get(name, ()):
+                if caller.function_stmt.pure:
+                    impure.append(caller)
+
+    def __is_trusted(self, name):
+        # a pure global function, of this program or an earlier one, whose name
+        # was never assigned to. Functions of this program that call impure
+        # ones are only found out by the propagation in __mark_pure_functions.
+        return (
+            name in self.global_functions
+            and name not in self.assigned_globals
+            and self.global_functions[name].function_stmt.pure
+        )
+
+    def __assign_global(self, name):
+        if name not in self.assigned_globals:
+            self.assigned_globals.add(name)
+            self.newly_assigned.add(name)
+
+    def __analyze_function(self, function_stmt):
+        facts = FunctionFacts(function_stmt)
+        self.functions.append(facts)
+
+        for statement in function_stmt.body:
+            statement.accept(self)
+
+        self.functions.pop()
+        self.found.append(facts)
+        return facts
+
+    def __visit(self, node):
+        if node is not None:
+            node.accept(self)
+
+    def __mark_impure(self):
+        if self.functions:
+            self.functions[-1].impure = True
+
+    def __is_outer(self, depth):
+        # globals (depth None) and locals of enclosing functions or blocks
+        return depth is None or depth > self.functions[-1].blocks
+
+    def visit_literal(self, literal_expr):
+        pass
+
+    def visit_variable(self, variable_expr):
+        if self.functions and self.__is_outer(variable_expr.depth):
+            self.__mark_impure()
+
+    def visit_unary(self, unary_expr):
+        self.__visit(unary_expr.right)
+
+    def visit_logical(self, logical_expr):
+        self.__visit(logical_expr.left)
+        self.__visit(logical_expr.right)
+
+    def visit_grouping(self, grouping_expr):
+        self.__visit(grouping_expr.expr)
+
+    def visit_call(self, call_expr):
+        callee = call_expr.callee
+
+        if self.functions:
+            if isinstance(callee, Variable) and callee.depth is None:
+                # calling a global function, pure if that function is
+                self.functions[-1].calls.add(callee.name.lexeme)
+            else:
+                self.__mark_impure()
+
+        for argument in call_expr.arguments:
+            self.__visit(argument)
+
+    def visit_binary(self, binary_expr):
+        self.__visit(binary_expr.left)
+        self.__visit(binary_expr.right)
+
+    def visit_assignment(self, assignment_expr):
+        if assignment_expr.depth is None:
+            self.__assign_global(assignment_expr.identifier.lexeme)
+
+        if self.functions and self.__is_outer(assignment_expr.depth):
+            self.__mark_impure()
+
+        self.__visit(assignment_expr.value)
+
+    def visit_while(self, while_stmt):
+        self.__visit(while_stmt.condition)
+        self.__visit(while_stmt.body)
+
+    def visit_let(self, let_stmt):
+        self.__visit(let_stmt.initializer)
+
+    def visit_return(self, return_stmt):
+        self.__visit(return_stmt.expr)
+
+    def visit_print(self, print_stmt):
+        self.__mark_impure()
+        self.__visit(print_stmt.expr)
+
+    def visit_if(self, if_stmt):
+        self.__visit(if_stmt.condition)
+        self.__visit(if_stmt.then_branch)
+        self.__visit(if_stmt.else_branch)
+
+    def visit_function(self, function_stmt):
+        # a new function object is created on every call, memoizing would share it
+        self.__mark_impure()
+        self.__analyze_function(function_stmt)
+
+    def visit_block(self, block_stmt):
+        if self.functions:
+            self.functions[-1].blocks += 1
+
+        for statement in block_stmt.statements:
+            statement.accept(self)
+
+        if self.functions:
+            self.functions[-1].blocks -= 1
+
+    def visit_expression(self, expression_stmt):
+        self.__visit(expression_stmt.expr)
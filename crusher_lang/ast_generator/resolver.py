@@ -0,0 +1,218 @@
+from .expression import Call
+from .expression import ExpressionVisitor
+from .expression import Variable
+from .statement import StatementVisitor
+
+
+class Scope:
+    """A local scope as seen by the resolver.
+    Maps every name declared in the scope to its slot index in the runtime frame.
+    """
+
+    __slots__ = ("slots", "size")
+
+    def __init__(self):
+        self.slots = {}
+        self.size = 0
+
+    def declare(self, name):
+        # re-declaring a name reuses its slot, the interpreter then reports
+        # the duplicate declaration when it finds the slot already filled.
+        if name not in self.slots:
+            self.slots[name] = self.size
+            self.size += 1
+
+        return self.slots[name]
+
+
+class Resolver(ExpressionVisitor, StatementVisitor):
+    """Runs between parsing and execution.
+    Annotates every local variable access with the number of scopes between
+    the access and the declaration (depth) and the position of the variable
+    in that scope's frame (slot). Names not declared in an enclosing local scope
+    are left unresolved and are looked up in the global symbol table at runtime.
+    It also marks the return statements whose value is a call as tail calls.
+
+    Function bodies are resolved last, once every scope around them has all
+    its declarations, so a function sees the variables and functions declared
+    after it in the scopes it's nested in, as it does when it's finally called.
+    Called before such a declaration has run, it uses the variable the
+    declaration shadows, like a lookup by name would.
+    """
+
+    def __init__(self):
+        self.scopes = []
+        self.functions = 0  # number of function bodies around the current node
+        # for every scope around the function being resolved, how many of its
+        # names had been declared when the function was. The scopes of the
+        # function itself come after these and are resolved in order.
+        self.declared = []
+        self.deferred = []  # (function, scopes around it, declared) to resolve
+
+    def resolve(self, statements):
+        self.scopes = []
+        self.functions = 0
+        self.declared = []
+        self.deferred = []
+
+        for statement in statements:
+            self.__resolve(statement)
+
+        # in source order, the bodies nested in them are appended as they're found
+        for function in self.deferred:
+            self.__resolve_body(*function)
+
+        return statements
+
+    def __resolve(self, node):
+        if node is not None:
+            node.accept(self)
+
+    def __resolve_local(self, node, name):
+        """Sets the node's depth and slot, and its `forward` flag when the
+        variable is declared after the function using it, it can then be used
+        before its declaration has run. The variables it shadows until then
+        go in the node's `fallback`, up to the first one declared before the
+        function, no local one leaves the global."""
+
+        lexeme = name.lexeme
+        node.forward = False
+        found = False
+        fallback = []
+
+        for depth in range(len(self.scopes)):
+            scope = self.scopes[-1 - depth]
+
+            if lexeme not in scope.slots:
+                continue
+
+            slot = scope.slots[lexeme]
+            index = len(self.scopes) - 1 - depth
+            forward = index < len(self.declared) and slot >= self.declared[index]
+
+            if not found:
+                found = True
+                node.depth = depth
+                node.slot = slot
+                node.forward = forward
+            else:
+                fallback.append((depth, slot))
+
+            if not forward:
+                break
+
+        node.fallback = tuple(fallback)
+
+    def __declare(self, name):
+        if not self.scopes:
+            return None
+
+        return self.scopes[-1].declare(name.lexeme)
+
+    def visit_literal(self, literal_expr):
+        pass
+
+    def visit_variable(self, variable_expr):
+        self.__resolve_local(variable_expr, variable_expr.name)
+
+    def visit_unary(self, unary_expr):
+        self.__resolve(unary_expr.right)
+
+    def visit_logical(self, logical_expr):
+        self.__resolve(logical_expr.left)
+        self.__resolve(logical_expr.right)
+
+    def visit_grouping(self, grouping_expr):
+        self.__resolve(grouping_expr.expr)
+
+    def visit_call(self, call_expr):
+        self.__resolve(call_expr.callee)
+
+        for argument in call_expr.arguments:
+            self.__resolve(argument)
+
+    def visit_binary(self, binary_expr):
+        self.__resolve(binary_expr.left)
+        self.__resolve(binary_expr.right)
+
+    def visit_assignment(self, assignment_expr):
+        self.__resolve(assignment_expr.value)
+        self.__resolve_local(assignment_expr, assignment_expr.identifier)
+
+    def visit_while(self, while_stmt):
+        self.__resolve(while_stmt.condition)
+        self.__resolve(while_stmt.body)
+
+    def visit_let(self, let_stmt):
+        # the initializer is resolved first so `let a = a;` reads the outer `a`
+        self.__resolve(let_stmt.initializer)
+        let_stmt.slot = self.__declare(let_stmt.name)
+
+    def visit_return(self, return_stmt):
+        self.__resolve(return_stmt.expr)
+
+        # nothing is left to do in the caller after the call, so the engines
+        # can run it in the caller's place instead of nesting a new call
+        return_stmt.tail_call = self.functions > 0 and isinstance(
+            return_stmt.expr, Call
+        )
+
+    def visit_print(self, print_stmt):
+        self.__resolve(print_stmt.expr)
+
+    def visit_if(self, if_stmt):
+        self.__resolve(if_stmt.condition)
+        self.__resolve(if_stmt.then_branch)
+        self.__resolve(if_stmt.else_branch)
+
+    def visit_function(self, function_stmt):
+        # declared before the body is resolved so the function can call itself
+        function_stmt.slot = self.__declare(function_stmt.name)
+
+        # the scopes are still being filled, the body is resolved when they're done
+        declared = self.declared + [
+            scope.size for scope in self.scopes[len(self.declared) :]
+        ]
+        self.deferred.append((function_stmt, list(self.scopes), declared))
+
+    def __resolve_body(self, function_stmt, scopes, declared):
+        scope = Scope()
+
+        # parameter i always lives in slot i of the call frame. Bad parameters
+        # only fail when the function is called: a parameter that isn't an
+        # identifier first, then the first repeated name.
+        for parameter in function_stmt.parameters:
+            if not isinstance(parameter, Variable):
+                function_stmt.parameters_error = (
+                    "Function parameters can only be identifiers"
+                )
+            elif parameter.name.lexeme not in scope.slots:
+                scope.slots[parameter.name.lexeme] = scope.size
+            elif function_stmt.parameters_error is None:
+                function_stmt.parameters_error = (
+                    f"Variable {parameter.name.lexeme} already defined."
+                )
+
+            scope.size += 1
+
+        self.scopes = scopes + [scope]
+        self.declared = declared
+        self.functions = 1
+
+        for statement in function_stmt.body:
+            self.__resolve(statement)
+
+        function_stmt.slot_count = scope.size
+
+    def visit_block(self, block_stmt):
+        scope = Scope()
+        self.scopes.append(scope)
+
+        for statement in block_stmt.statements:
+            self.__resolve(statement)
+
+        self.scopes.pop()
+        block_stmt.slot_count = scope.size
+
+    def visit_expression(self, expression_stmt):
+        self.__resolve(expression_stmt.expr)
@@ -36,12 +36,18 @@ class StatementVisitor(ABC):
 
 
 class Statement(ABC):
+    # nodes have no per-instance __dict__, every node class lists its fields.
+    # Every statement also has the line it starts on, set by the parser.
+    __slots__ = ("line",)
+
     @abstractmethod
     def accept(self, visitor):
         pass
 
 
 class ExpressionStatement(Statement):
+    __slots__ = ("expr",)
+
     def __init__(self, expr):
         self.expr = expr
 
@@ -53,8 +59,12 @@ class ExpressionStatement(Statement):
 
 
 class BlockStatement(Statement):
+    __slots__ = ("statements", "slot_count")
+
     def __init__(self, statements):
         self.statements = statements
+        # number of locals declared in the block, set by the resolver
+        self.slot_count = 0
 
     def accept(self, visitor):
         return visitor.visit_block(self)
@@ -64,10 +74,29 @@ class BlockStatement(Statement):
 
 
 class FunctionStatement(Statement):
+    __slots__ = (
+        "name",
+        "parameters",
+        "body",
+        "slot",
+        "slot_count",
+        "parameters_error",
+        "pure",
+    )
+
     def __init__(self, name, parameters, body):
         self.name = name
         self.parameters = parameters
         self.body = body
+        # set by the resolver: the slot holding the function in its enclosing scope
+        # (None for global functions) and the size of the frame used by its body.
+        self.slot = None
+        self.slot_count = 0
+        # set by the resolver: the runtime error of calling the function, when
+        # a parameter isn't an identifier or repeats an earlier one
+        self.parameters_error = None
+        # set by the PurityAnalyzer: calls can be memoized
+        self.pure = False
 
     def accept(self, visitor):
         return visitor.visit_function(self)
@@ -77,6 +106,8 @@ class FunctionStatement(Statement):
 
 
 class IfStatement(Statement):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
     def __init__(self, condition, then_branch, else_branch):
         self.condition = condition
         self.then_branch = then_branch
@@ -90,6 +121,8 @@ class IfStatement(Statement):
 
 
 class PrintStatement(Statement):
+    __slots__ = ("expr",)
+
     def __init__(self, expr):
         self.expr = expr
 
@@ -101,8 +134,11 @@ class PrintStatement(Statement):
 
 
 class ReturnStatement(Statement):
+    __slots__ = ("expr", "tail_call")
+
     def __init__(self, expr):
         self.expr = expr
+        self.tail_call = False  # set by the resolver: `return f(...);` in a function
 
     def accept(self, visitor):
         return visitor.visit_return(self)
@@ -112,9 +148,12 @@ class ReturnStatement(Statement):
 
 
 class LetStatement(Statement):
+    __slots__ = ("name", "initializer", "slot")
+
     def __init__(self, name, initializer):
         self.name = name
         self.initializer = initializer
+        self.slot = None  # set by the resolver for locals, None for globals
 
     def accept(self, visitor):
         return visitor.visit_let(self)
@@ -124,6 +163,8 @@ class LetStatement(Statement):
 
 
 class WhileStatement(Statement):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -0,0 +1,62 @@
+from .opcode import OpCode
+
+
+class CodeObject:
+    """The compiled form of a function body or of the top-level code.
+    `instructions` holds `(opcode, a, b)` tuples and `constants` the literals,
+    variable names and nested CodeObjects the instructions refer to.
+    """
+
+    def __init__(self, name, arity=0, slot_count=0, parameters_error=None):
+        self.name = name
+        self.arity = arity
+        self.slot_count = slot_count
+        self.parameters_error = parameters_error
+        self.instructions = []
+        self.constants = []
+        self.constant_indexes = {}
+
+    def emit(self, opcode, a=0, b=0):
+        """Appends an instruction and returns its index"""
+
+        self.instructions.append((opcode.value, a, b))
+        return len(self.instructions) - 1
+
+    def patch(self, index, a):
+        """Points the jump instruction at `index` to the target `a`"""
+
+        opcode, _, b = self.instructions[index]
+        self.instructions[index] = (opcode, a, b)
+
+    def add_constant(self, value, key=None):
+        """Adds a value to the constant pool, reusing the slot of an equal value.
+        The type is part of the key so 1 and true don't end up sharing a slot.
+        """
+
+        if key is None:
+            key = (type(value), value)
+
+        if key not in self.constant_indexes:
+            self.constant_indexes[key] = len(self.constants)
+            self.constants.append(value)
+
+        return self.constant_indexes[key]
+
+    def add_name(self, token):
+        return self.add_constant(token.lexeme, key=("name", token.lexeme))
+
+    def add_code(self, code):
+        self.constants.append(code)
+        return len(self.constants) - 1
+
+    def __str__(self):
+        lines = [f"== {self.name} =="]
+
+        for index, (opcode, a, b) in enumerate(self.instructions):
+            lines.append(f"{index:04} {OpCode(opcode).name:<14} {a} {b}")
+
+        for constant in self.constants:
+            if isinstance(constant, CodeObject):
+                lines.append(str(constant))
+
+        return "\n".join(lines)
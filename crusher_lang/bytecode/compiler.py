@@ -0,0 +1,214 @@
+from ast_generator.expression import ExpressionVisitor
+from ast_generator.statement import StatementVisitor
+from lexer.token_type import TokenType
+from .code_object import CodeObject
+from .opcode import OpCode
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+}
+
+
+class Compiler(ExpressionVisitor, StatementVisitor):
+    """Compiles resolved statements into a CodeObject for the VirtualMachine.
+    Expects the statements to have gone through the Resolver, the (depth, slot)
+    annotations are turned into GET_LOCAL/SET_LOCAL operands.
+    """
+
+    def __init__(self):
+        self.code = None
+
+    def compile(self, statements):
+        self.code = CodeObject("<script>")
+
+        for statement in statements:
+            statement.accept(self)
+
+        self.code.emit(OpCode.HALT)
+
+        return self.code
+
+    def __compile(self, node):
+        node.accept(self)
+
+    def visit_literal(self, literal_expr):
+        self.code.emit(OpCode.CONSTANT, self.code.add_constant(literal_expr.value))
+
+    def visit_variable(self, variable_expr):
+        if variable_expr.depth is None:
+            self.code.emit(OpCode.GET_GLOBAL, self.code.add_name(variable_expr.name))
+        elif variable_expr.forward:
+            self.code.emit(
+                OpCode.GET_DECLARED,
+                self.__add_declared(variable_expr, variable_expr.name),
+            )
+        else:
+            self.code.emit(OpCode.GET_LOCAL, variable_expr.depth, variable_expr.slot)
+
+    def visit_unary(self, unary_expr):
+        self.__compile(unary_expr.right)
+
+        if unary_expr.token.token_type == TokenType.BANG:
+            self.code.emit(OpCode.NOT)
+
+        if unary_expr.token.token_type == TokenType.MINUS:
+            self.code.emit(OpCode.NEGATE)
+
+    def visit_logical(self, logical_expr):
+        self.__compile(logical_expr.left)
+
+        if logical_expr.token.token_type == TokenType.OR:
+            end_jump = self.code.emit(OpCode.JUMP_IF_TRUE_OR_POP)
+        else:
+            end_jump = self.code.emit(OpCode.JUMP_IF_FALSE_OR_POP)
+
+        self.__compile(logical_expr.right)
+        self.code.patch(end_jump, len(self.code.instructions))
+
+    def visit_grouping(self, grouping_expr):
+        self.__compile(grouping_expr.expr)
+
+    def visit_call(self, call_expr):
+        self.__compile(call_expr.callee)
+
+        for argument in call_expr.arguments:
+            self.__compile(argument)
+
+        self.code.emit(OpCode.CALL, len(call_expr.arguments))
+
+    def visit_binary(self, binary_expr):
+        self.__compile(binary_expr.left)
+        self.__compile(binary_expr.right)
+        self.code.emit(BINARY_OPCODES[binary_expr.token.token_type])
+
+    def visit_assignment(self, assignment_expr):
+        self.__compile(assignment_expr.value)
+
+        if assignment_expr.depth is None:
+            self.code.emit(
+                OpCode.SET_GLOBAL, self.code.add_name(assignment_expr.identifier)
+            )
+        elif assignment_expr.forward:
+            self.code.emit(
+                OpCode.SET_DECLARED,
+                self.__add_declared(assignment_expr, assignment_expr.identifier),
+            )
+        else:
+            self.code.emit(
+                OpCode.SET_LOCAL, assignment_expr.depth, assignment_expr.slot
+            )
+
+    def __add_declared(self, node, name):
+        """Adds the operand of GET_DECLARED and SET_DECLARED for `node`"""
+
+        operand = (node.depth, node.slot, name, node.fallback)
+        return self.code.add_constant(
+            operand, key=("declared", node.depth, node.slot, name.lexeme, node.fallback)
+        )
+
+    def visit_while(self, while_stmt):
+        loop_start = len(self.code.instructions)
+
+        self.__compile(while_stmt.condition)
+        exit_jump = self.code.emit(OpCode.JUMP_IF_FALSE)
+
+        self.__compile(while_stmt.body)
+        self.code.emit(OpCode.JUMP, loop_start)
+
+        self.code.patch(exit_jump, len(self.code.instructions))
+
+    def visit_let(self, let_stmt):
+        if let_stmt.initializer is not None:
+            self.__compile(let_stmt.initializer)
+        else:
+            self.code.emit(OpCode.CONSTANT, self.code.add_constant(None))
+
+        self.__define(let_stmt.name, let_stmt.slot)
+
+    def __define(self, name, slot):
+        if slot is None:
+            self.code.emit(OpCode.DEFINE_GLOBAL, self.code.add_name(name))
+        else:
+            self.code.emit(OpCode.DEFINE_LOCAL, slot, self.code.add_name(name))
+
+    def visit_return(self, return_stmt):
+        if return_stmt.tail_call:
+            call_expr = return_stmt.expr
+            self.__compile(call_expr.callee)
+
+            for argument in call_expr.arguments:
+                self.__compile(argument)
+
+            self.code.emit(OpCode.TAIL_CALL, len(call_expr.arguments))
+            return
+
+        if return_stmt.expr is not None:
+            self.__compile(return_stmt.expr)
+        else:
+            self.code.emit(OpCode.CONSTANT, self.code.add_constant(None))
+
+        self.code.emit(OpCode.RETURN)
+
+    def visit_print(self, print_stmt):
+        self.__compile(print_stmt.expr)
+        self.code.emit(OpCode.PRINT)
+
+    def visit_if(self, if_stmt):
+        self.__compile(if_stmt.condition)
+        else_jump = self.code.emit(OpCode.JUMP_IF_FALSE)
+
+        self.__compile(if_stmt.then_branch)
+
+        if if_stmt.else_branch is None:
+            self.code.patch(else_jump, len(self.code.instructions))
+            return
+
+        end_jump = self.code.emit(OpCode.JUMP)
+        self.code.patch(else_jump, len(self.code.instructions))
+
+        self.__compile(if_stmt.else_branch)
+        self.code.patch(end_jump, len(self.code.instructions))
+
+    def visit_function(self, function_stmt):
+        enclosing = self.code
+
+        self.code = CodeObject(
+            function_stmt.name.lexeme,
+            arity=len(function_stmt.parameters),
+            slot_count=function_stmt.slot_count,
+            parameters_error=function_stmt.parameters_error,
+        )
+
+        for statement in function_stmt.body:
+            self.__compile(statement)
+
+        # falling off the end of a function returns null
+        self.code.emit(OpCode.CONSTANT, self.code.add_constant(None))
+        self.code.emit(OpCode.RETURN)
+
+        function_code = self.code
+        self.code = enclosing
+
+        self.code.emit(OpCode.FUNCTION, self.code.add_code(function_code))
+        self.__define(function_stmt.name, function_stmt.slot)
+
+    def visit_block(self, block_stmt):
+        self.code.emit(OpCode.ENTER_SCOPE, block_stmt.slot_count)
+
+        for statement in block_stmt.statements:
+            self.__compile(statement)
+
+        self.code.emit(OpCode.EXIT_SCOPE)
+
+    def visit_expression(self, expression_stmt):
+        self.__compile(expression_stmt.expr)
+        self.code.emit(OpCode.POP)
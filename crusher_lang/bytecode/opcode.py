@@ -0,0 +1,70 @@
+from enum import IntEnum
+
+
+class OpCode(IntEnum):
+    """This enum contains the Crusher VM instructions.
+    Every instruction is an `(opcode, a, b)` tuple, the operands a and b
+    are described next to each opcode and are 0 when unused.
+    """
+
+    # push code.constants[a]
+    CONSTANT = 0
+    # discard the top of the stack
+    POP = 1
+
+    # variables. Globals are addressed by the name in code.constants[a],
+    # locals by a=depth and b=slot as computed by the resolver.
+    GET_GLOBAL = 2
+    SET_GLOBAL = 3
+    DEFINE_GLOBAL = 4
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    # a=slot, b=index of the variable name in code.constants
+    DEFINE_LOCAL = 7
+    # a local declared after the function using it, a=index in code.constants
+    # of its (depth, slot, name token, fallback). Until its declaration has run
+    # they use the variable it shadows, see Variable.fallback.
+    GET_DECLARED = 32
+    SET_DECLARED = 33
+
+    # unary operators
+    NEGATE = 8
+    NOT = 9
+
+    # binary operators, they pop the right then the left operand
+    ADD = 10
+    SUBTRACT = 11
+    MULTIPLY = 12
+    DIVIDE = 13
+    GREATER = 14
+    GREATER_EQUAL = 15
+    LESS = 16
+    LESS_EQUAL = 17
+    EQUAL = 18
+    NOT_EQUAL = 19
+
+    # control flow, a is the absolute target instruction index
+    JUMP = 22
+    JUMP_IF_FALSE = 23
+    # `and` / `or`: jump keeping the left operand when it decides the result,
+    # otherwise pop it and fall through to the right operand
+    JUMP_IF_FALSE_OR_POP = 20
+    JUMP_IF_TRUE_OR_POP = 21
+
+    # a=number of slots in the new scope
+    ENTER_SCOPE = 24
+    EXIT_SCOPE = 25
+
+    # push a function for the CodeObject in code.constants[a]
+    FUNCTION = 26
+    # a=number of arguments on the stack above the callee
+    CALL = 27
+    RETURN = 28
+    # a call in tail position, like CALL but the new frame takes the place of
+    # the current one, the callee's RETURN goes straight back to our caller
+    TAIL_CALL = 31
+
+    PRINT = 29
+
+    # end of the top-level code
+    HALT = 30
@@ -0,0 +1,311 @@
+import operator
+
+from crusher_state.operations import assert_operands_are_number
+from crusher_state.operations import add
+from crusher_state.operations import overflowed
+from crusher_state.operations import stringify_to_crusher_format
+from crusher_state.runtime_exceptions import CrusherRuntimeError
+from crusher_state.symbol_table import SymbolTable
+from crusher_state.symbol_table import UNDEFINED
+from .opcode import OpCode
+
+
+class CompiledFunction:
+    """A function created by the VM.
+    Pairs the function's CodeObject with the symbol table it was declared in.
+    """
+
+    __slots__ = ("code", "table")
+
+    def __init__(self, code, table):
+        self.code = code
+        self.table = table
+
+    @property
+    def arity(self):
+        return self.code.arity
+
+    def __str__(self):
+        return f"<function {self.code.name}>"
+
+
+class VirtualMachine:
+    """Stack based virtual machine for compiled Crusher code.
+    A Crusher call saves the caller's registers on an explicit frame list
+    instead of recursing in Python, and the operand stack is a plain list.
+    """
+
+    def __init__(self, output):
+        self.globals = SymbolTable()
+        self.output = output  # the Output print writes to
+
+    def execute(self, code, max_depth=None):
+        """Runs the top-level CodeObject, with at most `max_depth` nested calls"""
+
+        # the opcodes are bound to locals, comparing against them is a lot
+        # cheaper than looking up the OpCode members in the dispatch loop.
+        CONSTANT = OpCode.CONSTANT.value
+        POP = OpCode.POP.value
+        GET_GLOBAL = OpCode.GET_GLOBAL.value
+        SET_GLOBAL = OpCode.SET_GLOBAL.value
+        DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+        GET_LOCAL = OpCode.GET_LOCAL.value
+        SET_LOCAL = OpCode.SET_LOCAL.value
+        DEFINE_LOCAL = OpCode.DEFINE_LOCAL.value
+        GET_DECLARED = OpCode.GET_DECLARED.value
+        SET_DECLARED = OpCode.SET_DECLARED.value
+        NEGATE = OpCode.NEGATE.value
+        NOT = OpCode.NOT.value
+        ADD = OpCode.ADD.value
+        SUBTRACT = OpCode.SUBTRACT.value
+        MULTIPLY = OpCode.MULTIPLY.value
+        DIVIDE = OpCode.DIVIDE.value
+        GREATER = OpCode.GREATER.value
+        GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+        LESS = OpCode.LESS.value
+        LESS_EQUAL = OpCode.LESS_EQUAL.value
+        EQUAL = OpCode.EQUAL.value
+        NOT_EQUAL = OpCode.NOT_EQUAL.value
+        JUMP_IF_FALSE_OR_POP = OpCode.JUMP_IF_FALSE_OR_POP.value
+        JUMP_IF_TRUE_OR_POP = OpCode.JUMP_IF_TRUE_OR_POP.value
+        JUMP = OpCode.JUMP.value
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+        ENTER_SCOPE = OpCode.ENTER_SCOPE.value
+        EXIT_SCOPE = OpCode.EXIT_SCOPE.value
+        FUNCTION = OpCode.FUNCTION.value
+        CALL = OpCode.CALL.value
+        TAIL_CALL = OpCode.TAIL_CALL.value
+        RETURN = OpCode.RETURN.value
+        PRINT = OpCode.PRINT.value
+        HALT = OpCode.HALT.value
+
+        global_values = self.globals.values
+        write_line = self.output.write_line
+        instructions = code.instructions
+        constants = code.constants
+        table = self.globals
+        ip = 0
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        # (instructions, constants, ip, table) of every caller
+        frames = []
+
+        while True:
+            op, a, b = instructions[ip]
+            ip += 1
+
+            if op == GET_LOCAL:
+                frame = table
+
+                while a:
+                    frame = frame.parent
+                    a -= 1
+
+                push(frame.slots[b])
+
+            elif op == CONSTANT:
+                push(constants[a])
+
+            elif op == GET_GLOBAL:
+                name = constants[a]
+
+                if name not in global_values:
+                    raise CrusherRuntimeError(f"Undefined variable {name}.")
+
+                push(global_values[name][0])
+
+            elif op == JUMP_IF_FALSE:
+                condition = pop()
+
+                if condition is None or condition is False:
+                    ip = a
+
+            elif op == JUMP:
+                ip = a
+
+            elif op == ADD:
+                right = pop()
+                stack[-1] = add(stack[-1], right)
+
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                assert_operands_are_number("-", left, right)
+
+                try:
+                    stack[-1] = left - right
+                except OverflowError:
+                    stack[-1] = overflowed(operator.sub, left, right)
+
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                assert_operands_are_number("*", left, right)
+
+                try:
+                    stack[-1] = left * right
+                except OverflowError:
+                    stack[-1] = overflowed(operator.mul, left, right)
+
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                assert_operands_are_number("/", left, right)
+
+                try:
+                    stack[-1] = left / right
+                except OverflowError:
+                    stack[-1] = overflowed(operator.truediv, left, right)
+
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                assert_operands_are_number("<", left, right)
+                stack[-1] = left < right
+
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                assert_operands_are_number("<=", left, right)
+                stack[-1] = left <= right
+
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                assert_operands_are_number(">", left, right)
+                stack[-1] = left > right
+
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                assert_operands_are_number(">=", left, right)
+                stack[-1] = left >= right
+
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] != right
+
+            elif op == SET_LOCAL:
+                frame = table
+
+                while a:
+                    frame = frame.parent
+                    a -= 1
+
+                frame.slots[b] = stack[-1]
+
+            elif op == SET_GLOBAL:
+                name = constants[a]
+
+                if name not in global_values:
+                    raise CrusherRuntimeError(f"Undefined variable {name}.")
+
+                global_values[name][0] = stack[-1]
+
+            elif op == POP:
+                pop()
+
+            elif op == CALL or op == TAIL_CALL:
+                callee = stack[-a - 1]
+
+                if not isinstance(callee, CompiledFunction):
+                    raise CrusherRuntimeError("Call can only be done on functions.")
+
+                function_code = callee.code
+
+                if a != function_code.arity:
+                    raise CrusherRuntimeError(
+                        f"Expected {function_code.arity} arguments, but got {a}."
+                    )
+
+                if function_code.parameters_error is not None:
+                    raise CrusherRuntimeError(function_code.parameters_error)
+
+                # a tail call has nothing left to do here, it doesn't save
+                # the registers, so the frame list doesn't grow either
+                if op == CALL:
+                    if max_depth is not None and len(frames) >= max_depth:
+                        raise CrusherRuntimeError(
+                            f"Maximum recursion depth of {max_depth} exceeded."
+                        )
+
+                    frames.append((instructions, constants, ip, table))
+
+                table = SymbolTable(callee.table, function_code.slot_count)
+                table.slots[:a] = stack[len(stack) - a :]
+                del stack[len(stack) - a - 1 :]
+
+                instructions = function_code.instructions
+                constants = function_code.constants
+                ip = 0
+
+            elif op == RETURN:
+                if not frames:
+                    raise CrusherRuntimeError("Can't return from top-level code.")
+
+                instructions, constants, ip, table = frames.pop()
+
+            elif op == ENTER_SCOPE:
+                table = SymbolTable(table, a)
+
+            elif op == EXIT_SCOPE:
+                table = table.parent
+
+            elif op == DEFINE_LOCAL:
+                if table.slots[a] is not UNDEFINED:
+                    raise CrusherRuntimeError(
+                        f"Variable {constants[b]} already defined."
+                    )
+
+                table.slots[a] = pop()
+
+            elif op == DEFINE_GLOBAL:
+                name = constants[a]
+
+                if name in global_values:
+                    raise CrusherRuntimeError(f"Variable {name} already defined.")
+
+                global_values[name] = [pop()]
+
+            elif op == PRINT:
+                write_line(stringify_to_crusher_format(pop()))
+
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+
+            elif op == NEGATE:
+                assert_operands_are_number("-", stack[-1])
+                stack[-1] = -stack[-1]
+
+            elif op == JUMP_IF_FALSE_OR_POP:
+                if stack[-1] is None or stack[-1] is False:
+                    ip = a
+                else:
+                    pop()
+
+            elif op == JUMP_IF_TRUE_OR_POP:
+                if stack[-1] is None or stack[-1] is False:
+                    pop()
+                else:
+                    ip = a
+
+            elif op == FUNCTION:
+                push(CompiledFunction(constants[a], table))
+
+            elif op == GET_DECLARED:
+                push(table.get_declared_at(*constants[a]))
+
+            elif op == SET_DECLARED:
+                depth, slot, name, fallback = constants[a]
+                table.assign_declared_at(depth, slot, name, stack[-1], fallback)
+
+            elif op == HALT:
+                return
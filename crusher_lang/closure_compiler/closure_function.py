@@ -0,0 +1,25 @@
+class ClosureFunction:
+    """A function created by the closure compiled engine.
+    `body` is the Python closure the function body was compiled to once,
+    `table` the symbol table the function was declared in.
+    """
+
+    __slots__ = (
+        "name",
+        "arity",
+        "slot_count",
+        "parameters_error",
+        "body",
+        "table",
+    )
+
+    def __init__(self, name, arity, slot_count, parameters_error, body, table):
+        self.name = name
+        self.arity = arity
+        self.slot_count = slot_count
+        self.parameters_error = parameters_error
+        self.body = body
+        self.table = table
+
+    def __str__(self):
+        return f"<function {self.name}>"
@@ -0,0 +1,394 @@
+from ast_generator.expression import ExpressionVisitor
+from ast_generator.expression import Literal
+from ast_generator.statement import StatementVisitor
+from crusher_state.operations import add
+from crusher_state.operations import assert_operands_are_number
+from crusher_state.operations import NUMBER_OPERATIONS
+from crusher_state.operations import NUMBER_TYPES
+from crusher_state.operations import overflowed
+from crusher_state.operations import stringify_to_crusher_format
+from crusher_state.runtime_exceptions import CrusherRuntimeError
+from crusher_state.symbol_table import SymbolTable
+from crusher_state.symbol_table import UNDEFINED
+from lexer.token_type import TokenType
+from .closure_function import ClosureFunction
+
+
+class ClosureCompiler(ExpressionVisitor, StatementVisitor):
+    """Turns resolved statements into nested Python closures, once.
+    Every expression becomes a `closure(table) -> value` and every statement a
+    `closure(table) -> None | (return_value,) | (callee, arguments)`, the last
+    one for a tail call left to the caller's call closure. Running the program is a
+    chain of closure calls with the dispatch on node and operator types already
+    decided at compile time. Function bodies are compiled when the compiler
+    meets the FunctionStatement, not every time the function is declared or called.
+    """
+
+    def __init__(self, globals, output):
+        self.globals = globals
+        self.output = output  # the Output print writes to
+
+    def compile(self, statements):
+        """Returns a closure running the statements in the given (global) table"""
+
+        body = self.__compile_statements(statements)
+
+        def run(table):
+            if body(table) is not None:
+                raise CrusherRuntimeError("Can't return from top-level code.")
+
+        return run
+
+    def __compile(self, node):
+        return node.accept(self)
+
+    def __compile_statements(self, statements):
+        compiled = [self.__compile(statement) for statement in statements]
+
+        def execute(table):
+            for statement in compiled:
+                completion = statement(table)
+
+                if completion is not None:
+                    return completion
+
+        return execute
+
+    def visit_literal(self, literal_expr):
+        value = literal_expr.value
+        return lambda table: value
+
+    def visit_variable(self, variable_expr):
+        depth, slot = variable_expr.depth, variable_expr.slot
+
+        if depth is None:
+            name = variable_expr.name.lexeme
+            values = self.globals.values
+
+            def get_global(table):
+                if name not in values:
+                    raise CrusherRuntimeError(f"Undefined variable {name}.")
+
+                return values[name][0]
+
+            return get_global
+
+        if variable_expr.forward:
+            name = variable_expr.name
+            fallback = variable_expr.fallback
+            return lambda table: table.get_declared_at(depth, slot, name, fallback)
+
+        if depth == 0:
+            return lambda table: table.slots[slot]
+
+        if depth == 1:
+            return lambda table: table.parent.slots[slot]
+
+        return lambda table: table.get_at(depth, slot)
+
+    def visit_unary(self, unary_expr):
+        right = self.__compile(unary_expr.right)
+
+        if unary_expr.token.token_type == TokenType.BANG:
+
+            def evaluate_not(table):
+                value = right(table)
+                return value is None or value is False
+
+            return evaluate_not
+
+        def evaluate_negate(table):
+            value = right(table)
+            assert_operands_are_number("-", value)
+            return -value
+
+        return evaluate_negate
+
+    def visit_logical(self, logical_expr):
+        left = self.__compile(logical_expr.left)
+        right = self.__compile(logical_expr.right)
+
+        if logical_expr.token.token_type == TokenType.OR:
+
+            def evaluate_or(table):
+                left_value = left(table)
+
+                if left_value is None or left_value is False:
+                    return right(table)
+
+                return left_value
+
+            return evaluate_or
+
+        def evaluate_and(table):
+            left_value = left(table)
+
+            if left_value is None or left_value is False:
+                return left_value
+
+            return right(table)
+
+        return evaluate_and
+
+    def visit_grouping(self, grouping_expr):
+        return self.__compile(grouping_expr.expr)
+
+    def visit_call(self, call_expr):
+        callee_closure = self.__compile(call_expr.callee)
+        argument_closures = [
+            self.__compile(argument) for argument in call_expr.arguments
+        ]
+
+        def call(table):
+            callee = callee_closure(table)
+            arguments = [argument(table) for argument in argument_closures]
+
+            # loops for as long as the body ends with a tail call
+            while True:
+                argument_count = len(arguments)
+
+                if not isinstance(callee, ClosureFunction):
+                    raise CrusherRuntimeError("Call can only be done on functions.")
+
+                if argument_count != callee.arity:
+                    raise CrusherRuntimeError(
+                        f"Expected {callee.arity} arguments, but got {argument_count}."
+                    )
+
+                if callee.parameters_error is not None:
+                    raise CrusherRuntimeError(callee.parameters_error)
+
+                frame = SymbolTable(callee.table, callee.slot_count)
+                frame.slots[:argument_count] = arguments
+
+                completion = callee.body(frame)
+
+                if completion is None:
+                    return None
+
+                if len(completion) == 1:
+                    return completion[0]
+
+                callee, arguments = completion
+
+        return call
+
+    def visit_binary(self, binary_expr):
+        closure = self.__compile_binary(binary_expr)
+
+        if isinstance(binary_expr.left, Literal) and isinstance(
+            binary_expr.right, Literal
+        ):
+            # both operands are known, so is the result, unless evaluating
+            # it fails. Then the error is left to happen at runtime.
+            try:
+                value = closure(None)
+            except (CrusherRuntimeError, ArithmeticError):
+                return closure
+
+            return lambda table: value
+
+        return closure
+
+    def __compile_binary(self, binary_expr):
+        token_type = binary_expr.token.token_type
+        lexeme = binary_expr.token.lexeme
+        left = self.__compile(binary_expr.left)
+        right = self.__compile(binary_expr.right)
+
+        if token_type == TokenType.EQUAL_EQUAL:
+            return lambda table: left(table) == right(table)
+
+        if token_type == TokenType.BANG_EQUAL:
+            return lambda table: left(table) != right(table)
+
+        if token_type == TokenType.PLUS:
+            return lambda table: add(left(table), right(table))
+
+        number_operator = NUMBER_OPERATIONS[token_type]
+
+        if (
+            isinstance(binary_expr.right, Literal)
+            and type(binary_expr.right.value) in NUMBER_TYPES
+        ):
+            # the common `n - 1` shape, the right operand is a known number
+            constant = binary_expr.right.value
+
+            def evaluate_with_constant(table):
+                left_value = left(table)
+
+                if type(left_value) in NUMBER_TYPES:
+                    try:
+                        return number_operator(left_value, constant)
+                    except OverflowError:
+                        return overflowed(number_operator, left_value, constant)
+
+                assert_operands_are_number(lexeme, left_value)
+
+            return evaluate_with_constant
+
+        def evaluate(table):
+            left_value = left(table)
+            right_value = right(table)
+
+            if type(left_value) in NUMBER_TYPES and type(right_value) in NUMBER_TYPES:
+                try:
+                    return number_operator(left_value, right_value)
+                except OverflowError:
+                    return overflowed(number_operator, left_value, right_value)
+
+            assert_operands_are_number(lexeme, left_value, right_value)
+
+        return evaluate
+
+    def visit_assignment(self, assignment_expr):
+        value_closure = self.__compile(assignment_expr.value)
+        depth, slot = assignment_expr.depth, assignment_expr.slot
+
+        if depth is None:
+            name = assignment_expr.identifier.lexeme
+            values = self.globals.values
+
+            def assign_global(table):
+                value = value_closure(table)
+
+                if name not in values:
+                    raise CrusherRuntimeError(f"Undefined variable {name}.")
+
+                values[name][0] = value
+                return value
+
+            return assign_global
+
+        if assignment_expr.forward:
+            name = assignment_expr.identifier
+            fallback = assignment_expr.fallback
+
+            def assign_declared(table):
+                return table.assign_declared_at(
+                    depth, slot, name, value_closure(table), fallback
+                )
+
+            return assign_declared
+
+        def assign_local(table):
+            return table.assign_at(depth, slot, value_closure(table))
+
+        return assign_local
+
+    def visit_while(self, while_stmt):
+        condition = self.__compile(while_stmt.condition)
+        body = self.__compile(while_stmt.body)
+
+        def execute_while(table):
+            while True:
+                value = condition(table)
+
+                if value is None or value is False:
+                    return
+
+                completion = body(table)
+
+                if completion is not None:
+                    return completion
+
+        return execute_while
+
+    def visit_let(self, let_stmt):
+        initializer = None
+
+        if let_stmt.initializer is not None:
+            initializer = self.__compile(let_stmt.initializer)
+
+        return self.__define(let_stmt.name, let_stmt.slot, initializer)
+
+    def __define(self, name, slot, value_closure):
+        if slot is None:
+
+            def define_global(table):
+                value = None if value_closure is None else value_closure(table)
+                table.define(name, value)
+
+            return define_global
+
+        def define_local(table):
+            value = None if value_closure is None else value_closure(table)
+
+            if table.slots[slot] is not UNDEFINED:
+                raise CrusherRuntimeError(f"Variable {name.lexeme} already defined.")
+
+            table.slots[slot] = value
+
+        return define_local
+
+    def visit_return(self, return_stmt):
+        if return_stmt.tail_call:
+            callee = self.__compile(return_stmt.expr.callee)
+            arguments = [
+                self.__compile(argument) for argument in return_stmt.expr.arguments
+            ]
+            return lambda table: (
+                callee(table),
+                [argument(table) for argument in arguments],
+            )
+
+        if return_stmt.expr is None:
+            return lambda table: (None,)
+
+        value = self.__compile(return_stmt.expr)
+        return lambda table: (value(table),)
+
+    def visit_print(self, print_stmt):
+        value = self.__compile(print_stmt.expr)
+        write_line = self.output.write_line
+
+        def execute_print(table):
+            write_line(stringify_to_crusher_format(value(table)))
+
+        return execute_print
+
+    def visit_if(self, if_stmt):
+        condition = self.__compile(if_stmt.condition)
+        then_branch = self.__compile(if_stmt.then_branch)
+        else_branch = None
+
+        if if_stmt.else_branch is not None:
+            else_branch = self.__compile(if_stmt.else_branch)
+
+        def execute_if(table):
+            value = condition(table)
+
+            if value is not None and value is not False:
+                return then_branch(table)
+
+            if else_branch is not None:
+                return else_branch(table)
+
+        return execute_if
+
+    def visit_function(self, function_stmt):
+        name = function_stmt.name.lexeme
+        arity = len(function_stmt.parameters)
+        slot_count = function_stmt.slot_count
+        parameters_error = function_stmt.parameters_error
+        body = self.__compile_statements(function_stmt.body)
+
+        create_function = lambda table: ClosureFunction(
+            name, arity, slot_count, parameters_error, body, table
+        )
+
+        return self.__define(function_stmt.name, function_stmt.slot, create_function)
+
+    def visit_block(self, block_stmt):
+        body = self.__compile_statements(block_stmt.statements)
+        slot_count = block_stmt.slot_count
+
+        return lambda table: body(SymbolTable(table, slot_count))
+
+    def visit_expression(self, expression_stmt):
+        expr = self.__compile(expression_stmt.expr)
+
+        def execute_expression(table):
+            expr(table)
+
+        return execute_expression
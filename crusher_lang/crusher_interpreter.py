@@ -1,19 +1,188 @@
+import argparse
+import mmap
+import operator
+import os
 import sys
+import time
 
 from lexer.scanner import CrusherException
 from lexer.scanner import Scanner
+from lexer.regex_scanner import RegexScanner
 from lexer.scanner import TokenType
 from ast_generator.parser import Parser
 from ast_generator.parser import ParserException
+from ast_generator.incremental_parser import IncrementalParser
+from ast_generator.node_counter import NodeCounter
+from ast_generator.optimizer import OPTIMIZATION_LEVELS
+from ast_generator.optimizer import Optimizer
+from ast_generator.program_cache import cached_program_path
+from ast_generator.program_cache import program_cache_key
+from ast_generator.program_cache import read_cached_program
+from ast_generator.program_cache import write_cached_program
+from ast_generator.resolver import Resolver
+from ast_generator.purity_analyzer import PurityAnalyzer
 from ast_generator.expression import ExpressionVisitor
-from ast_generator.expression import Variable
-from ast_generator.expression import Literal
 from ast_generator.statement import StatementVisitor
-from ast_generator.statement import LetStatement
+from bytecode.compiler import Compiler
+from bytecode.virtual_machine import VirtualMachine
+from closure_compiler.compiler import ClosureCompiler
+from stack_evaluator.evaluator import StackEvaluator
 from crusher_state.crusher_function import CrusherFunction
+from profiling.profiler import ProfiledBody
+from profiling.profiler import Profiler
+from profiling.sampler import SamplingProfiler
+from crusher_state.memo_cache import EVICTION_POLICIES
+from crusher_state.memo_cache import MISSING
+from crusher_state.memo_cache import MemoCache
+from crusher_state.output import DEFAULT_BUFFER_LINES
+from crusher_state.output import Output
 from crusher_state.symbol_table import SymbolTable
 from crusher_state.runtime_exceptions import CrusherRuntimeError
-from crusher_state.runtime_exceptions import ReturnException
+from crusher_state.operations import add
+from crusher_state.operations import assert_operands_are_number
+from crusher_state.operations import is_truthy
+from crusher_state.operations import overflowed
+from crusher_state.operations import stringify_to_crusher_format
+from transpiler.module_cache import cached_module_path
+from transpiler.module_cache import module_cache_key
+from transpiler.module_cache import read_cached_module
+from transpiler.module_cache import write_cached_module
+from transpiler.python_transpiler import PythonTranspiler
+from transpiler.runtime import execute as execute_python_module
+
+# "tree" walks the AST directly, "vm" compiles it to bytecode for the VirtualMachine
+# and "closure" compiles every node once into a Python closure.
+# "python" transpiles the program to a Python module and runs it natively.
+# "stack" walks the AST with its own stack instead of Python's, for deep recursion.
+ENGINES = ("tree", "vm", "closure", "python", "stack")
+
+# deepest nesting of Crusher calls the stack and vm engines allow by default
+DEFAULT_MAX_DEPTH = 100_000
+
+# the visitor methods of the statements --profile times, every statement but
+# blocks, the statements inside a block are timed on their own
+PROFILED_VISITORS = (
+    "visit_expression",
+    "visit_function",
+    "visit_if",
+    "visit_let",
+    "visit_print",
+    "visit_return",
+    "visit_while",
+)
+
+# the visitor methods of every statement
+STATEMENT_VISITORS = PROFILED_VISITORS + ("visit_block",)
+
+# milliseconds of CPU time between two samples of --sample by default
+DEFAULT_SAMPLE_INTERVAL = 5.0
+
+# "regex" matches whole tokens with one compiled regular expression,
+# "classic" is the original character by character scanner. Both give the same tokens.
+SCANNERS = ("regex", "classic")
+
+# targets of `crusher compile`
+COMPILE_TARGETS = ("python",)
+
+# seconds between two checks of a --watch'ed file
+WATCH_INTERVAL = 0.2
+
+# the engines that recurse in Python report running out of Python stack with this
+RECURSION_TOO_DEEP = (
+    "Maximum recursion depth exceeded, --engine=stack can run deeper recursion."
+)
+
+# Returned by a statement visitor when a return statement ran, the blocks, loops
+# and ifs enclosing it hand it back up to visit_call without running anything else.
+# The returned value itself waits in Interpreter.return_value.
+RETURNING = object()
+
+
+class TailCall:
+    """What a tail call returns in place of a value in Interpreter.return_value:
+    the function to call and its arguments. visit_call of the caller then runs
+    that call itself, in a loop, so tail recursion doesn't grow the Python stack.
+    """
+
+    __slots__ = ("callee", "arguments")
+
+    def __init__(self, callee, arguments):
+        self.callee = callee
+        self.arguments = arguments
+
+
+class ExecutionHook:
+    """Base class of the hooks Interpreter.add_hook takes, a hook overrides
+    the events it wants to hear about. They're reported by the tree engine.
+    """
+
+    def statement_enter(self, statement):
+        """A statement is about to run"""
+
+    def call_enter(self, function, arguments):
+        """The CrusherFunction is called with the list of arguments"""
+
+    def call_exit(self, function, arguments, result):
+        """The call of the CrusherFunction returned result. Also reported,
+        with None, when a runtime error ends the call"""
+
+    def runtime_error(self, error):
+        """The CrusherRuntimeError stopped the program"""
+
+
+class HookedBody:
+    """Stands in for the body of a function while hooks are registered and
+    reports its calls to them, like ProfiledBody does for the profiler.
+    """
+
+    __slots__ = ("function", "body", "hooks")
+
+    def __init__(self, function, body, hooks):
+        self.function = function
+        self.body = body
+        self.hooks = hooks
+
+    def accept(self, visitor):
+        function = self.function
+        # the frame's slots start with the arguments
+        arguments = visitor.table.slots[: function.arity]
+        completion = result = None
+
+        for hook in self.hooks:
+            hook.call_enter(function, arguments)
+
+        try:
+            for statement in self.body:
+                if statement.accept(visitor) is RETURNING:
+                    completion, result = RETURNING, visitor.return_value
+                    break
+        finally:
+            for hook in self.hooks:
+                hook.call_exit(function, arguments, result)
+
+        # the returned value still waits in visitor.return_value
+        return completion
+
+
+class Workload:
+    """What --stats counts, None until something is counted"""
+
+    __slots__ = (
+        "tokens",
+        "nodes",
+        "statements",
+        "calls",
+        "symbol_tables",
+        "scope_depth",
+    )
+
+    def __init__(self):
+        self.tokens = None
+        self.nodes = None
+        self.statements = 0
+        self.calls = 0
+        self.symbol_tables = 0
+        self.scope_depth = 0  # the deepest seen
 
 
 class Interpreter(ExpressionVisitor, StatementVisitor):
@@ -21,31 +190,616 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
 
     def __init__(self, arguments):
         self.args = arguments
-        self.scanner = Scanner()
+        self.options = self.__parse_arguments(arguments[1:])
+        self.scanner = RegexScanner() if self.options.scanner == "regex" else Scanner()
         self.parser = Parser()
-        self.table = SymbolTable()
+        self.optimizer = Optimizer(self.options.optimization_level)
+        self.resolver = Resolver()
+        self.compiler = Compiler()
+        self.transpiler = PythonTranspiler()
+        # what the program prints goes through it, whatever the engine
+        self.output = Output(
+            buffer_lines=(
+                self.options.print_buffer if self.options.command == "run" else None
+            )
+        )
+        # creates the symbol tables of blocks and calls, --stats counts them
+        self.symbol_table = SymbolTable
+        self.__reset_runtime()
+        self.profiler = None
+        self.sampler = None
+        self.hooks = []  # the registered ExecutionHooks
+        self.phase_times = {}  # phase -> seconds spent in it, see timings()
+        # only counted with --stats. The counts share one attribute: CPython
+        # 3.11 reads the attributes of an object with more than 30 of them
+        # slower, the interpreter's hot paths would pay for every new one.
+        self.workload = Workload()
+
+        if self.options.command == "run" and self.options.cache_stats:
+            self.__count_lookups()
+
+        if self.options.command == "run" and self.options.stats:
+            self.__count_workload()
+
+        if self.options.command == "run" and self.options.profile:
+            self.profiler = Profiler(self.options.file)
+            self.__profile_statements()
+
+        if self.options.command == "run" and self.options.sample is not None:
+            self.sampler = SamplingProfiler(
+                self.options.file,
+                self.options.sample_interval / 1000,
+                Interpreter.visit_call.__code__,
+                [getattr(Interpreter, name).__code__ for name in STATEMENT_VISITORS],
+            )
+
+    def __reset_runtime(self):
+        """Gives every engine a fresh set of globals"""
+
+        self.globals = SymbolTable()
+        self.table = self.globals
+        self.return_value = None
+        self.vm = VirtualMachine(self.output)
+        self.closure_compiler = ClosureCompiler(self.globals, self.output)
+        self.stack_evaluator = StackEvaluator(self.globals, self.output)
+        self.python_globals = {}
+        self.purity_analyzer = PurityAnalyzer()
+        self.memo_caches = {}  # FunctionStatement -> MemoCache
+        # only counted with --cache-stats, except for the call cache misses
+        self.global_lookups = 0
+        self.global_cache_misses = 0
+        self.call_lookups = 0
+        self.call_cache_misses = 0
+
+    def __parse_arguments(self, arguments):
+        if arguments and arguments[0] == "compile":
+            return self.__parse_compile_arguments(arguments[1:])
+
+        arg_parser = argparse.ArgumentParser(
+            prog="crusher", description="The Crusher interpreter"
+        )
+        arg_parser.add_argument(
+            "file", nargs="?", help="a .crush source file, starts the REPL if omitted"
+        )
+        arg_parser.add_argument(
+            "--engine",
+            choices=ENGINES,
+            default="tree",
+            help="execution engine (default: tree)",
+        )
+        arg_parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="run the file again every time it changes",
+        )
+        arg_parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="run every statement as soon as it is parsed, "
+            "keeping memory flat on huge files",
+        )
+        arg_parser.add_argument(
+            "--max-depth",
+            type=int,
+            default=DEFAULT_MAX_DEPTH,
+            help="deepest nesting of calls the stack and vm engines allow, "
+            f"0 for no limit (default: {DEFAULT_MAX_DEPTH})",
+        )
+        arg_parser.add_argument(
+            "--no-memo",
+            dest="memo",
+            action="store_false",
+            help="don't memoize calls to pure functions (tree engine)",
+        )
+        arg_parser.add_argument(
+            "--memo-size",
+            type=int,
+            default=1024,
+            help="results kept per memoized function (default: 1024)",
+        )
+        arg_parser.add_argument(
+            "--memo-eviction",
+            choices=EVICTION_POLICIES,
+            default="lru",
+            help="which result a full memo cache drops (default: lru)",
+        )
+        arg_parser.add_argument(
+            "--memo-stats",
+            action="store_true",
+            help="print the memo cache hits and misses to stderr when done",
+        )
+        arg_parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="print where the time goes, by function and by line, to stderr "
+            "(tree engine, turns memoization off)",
+        )
+        arg_parser.add_argument(
+            "--profile-output",
+            metavar="PATH",
+            help="profile and write the function timings to PATH: a speedscope "
+            "profile if it ends with .json, a pstats file otherwise",
+        )
+        arg_parser.add_argument(
+            "--sample",
+            metavar="PATH",
+            help="sample where the time goes and write the samples to PATH as "
+            "collapsed stacks, for flame graphs (tree engine, turns memoization off)",
+        )
+        arg_parser.add_argument(
+            "--sample-interval",
+            metavar="MS",
+            type=float,
+            default=DEFAULT_SAMPLE_INTERVAL,
+            help="milliseconds of CPU time between two samples "
+            f"(default: {DEFAULT_SAMPLE_INTERVAL:g})",
+        )
+        arg_parser.add_argument(
+            "--print-buffer",
+            metavar="LINES",
+            type=int,
+            help="how many printed lines are held back and written at once "
+            f"(default: 1 on a terminal, {DEFAULT_BUFFER_LINES} otherwise)",
+        )
+        arg_parser.add_argument(
+            "--timings",
+            action="store_true",
+            help="print the time spent scanning, parsing and executing to stderr "
+            "when done",
+        )
+        arg_parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="print the tokens, syntax tree nodes, statements, calls, symbol "
+            "tables and deepest scope of the run to stderr when done "
+            "(statements and the rest with the tree engine)",
+        )
+        arg_parser.add_argument(
+            "--no-cache",
+            dest="cache",
+            action="store_false",
+            help="don't load or save the parsed program, or the generated Python "
+            "module, in the __crushcache__ directory next to the file",
+        )
+        arg_parser.add_argument(
+            "--cache-stats",
+            action="store_true",
+            help="print the hit rates of the inline caches to stderr when done "
+            "(tree engine)",
+        )
+        self.__add_common_arguments(arg_parser)
+
+        options = arg_parser.parse_args(arguments)
+        options.command = "run"
+
+        if options.memo_size < 1:
+            arg_parser.error("--memo-size must be at least 1")
+
+        if options.max_depth < 0:
+            arg_parser.error("--max-depth can't be negative")
+
+        if options.print_buffer is not None and options.print_buffer < 1:
+            arg_parser.error("--print-buffer must be at least 1")
+
+        options.profile = options.profile or options.profile_output is not None
+
+        if options.profile and (
+            options.file is None or options.watch or options.engine != "tree"
+        ):
+            arg_parser.error(
+                "--profile needs a file, the tree engine and can't be used with --watch"
+            )
+
+        if options.sample is not None and (
+            options.file is None or options.watch or options.engine != "tree"
+        ):
+            arg_parser.error(
+                "--sample needs a file, the tree engine and can't be used with --watch"
+            )
+
+        if options.sample is not None and not SamplingProfiler.is_supported():
+            arg_parser.error("--sample needs interval timers, which this system lacks")
+
+        if options.sample_interval <= 0:
+            arg_parser.error("--sample-interval must be positive")
+
+        self.__check_common_arguments(arg_parser, options)
+
+        if options.watch and options.file is None:
+            arg_parser.error("--watch needs a file")
+
+        if options.stream and (options.file is None or options.watch):
+            arg_parser.error("--stream needs a file and can't be used with --watch")
+
+        if options.stream and options.scanner != "regex":
+            arg_parser.error("--stream needs the regex scanner")
+
+        return options
+
+    def __parse_compile_arguments(self, arguments):
+        arg_parser = argparse.ArgumentParser(
+            prog="crusher compile",
+            description="Compile a Crusher source file ahead of time",
+        )
+        arg_parser.add_argument("file", help="a .crush source file")
+        arg_parser.add_argument(
+            "--target",
+            choices=COMPILE_TARGETS,
+            default="python",
+            help="output language",
+        )
+        arg_parser.add_argument(
+            "-o", "--output", help="where to write the output (default: stdout)"
+        )
+        self.__add_common_arguments(arg_parser)
+
+        options = arg_parser.parse_args(arguments)
+        options.command = "compile"
+        self.__check_common_arguments(arg_parser, options)
+
+        return options
+
+    def __add_common_arguments(self, arg_parser):
+        arg_parser.add_argument(
+            "--scanner",
+            choices=SCANNERS,
+            default="regex",
+            help="scanner implementation (default: regex)",
+        )
+        arg_parser.add_argument(
+            "--compact-tokens",
+            action="store_true",
+            help="keep the tokens in a compact buffer instead of a list "
+            "(regex scanner only)",
+        )
+        arg_parser.add_argument(
+            "-O",
+            dest="optimization_level",
+            type=int,
+            choices=OPTIMIZATION_LEVELS,
+            default=0,
+            help="0: none (default), 1: fold constant expressions, "
+            "2: also remove code that can never run",
+        )
+
+    def __check_common_arguments(self, arg_parser, options):
+        if options.compact_tokens and options.scanner != "regex":
+            arg_parser.error("--compact-tokens needs the regex scanner")
 
     def interpret(self):
         """Run the interpreter"""
 
-        if len(self.args) == 1:
+        if self.options.file is None:
             self.__run_repl()
-        elif len(self.args) == 2:
+        else:
             try:
-                self.__run_file(self.args[1])
+                if self.options.command == "compile":
+                    self.__compile_file(self.options.file)
+                elif self.options.watch:
+                    self.__watch_file(self.options.file)
+                elif self.options.stream:
+                    self.__stream_file(self.options.file)
+                else:
+                    self.__run_file(self.options.file)
             except CrusherException as e:
-                print("Error: " + str(e))
+                self.__report_error("Error: " + str(e))
                 sys.exit(1)
             except ParserException as e:
-                print("Parser Error: " + str(e))
+                self.__report_error("Parser Error: " + str(e))
                 sys.exit(1)
             except CrusherRuntimeError as e:
-                print("Runtime Error: " + str(e))
+                self.__report_error("Runtime Error: " + str(e))
                 sys.exit(1)
-        else:
-            print("Error!!!")
-            print("Usage: python crusher.py [some_file.crush]")
-            sys.exit(1)
+            finally:
+                self.output.flush()
+
+                if self.options.command == "run" and self.options.memo_stats:
+                    self.__print_memo_statistics()
+
+                if self.options.command == "run" and self.options.cache_stats:
+                    self.__print_inline_cache_statistics()
+
+                if self.options.command == "run" and self.options.timings:
+                    self.__print_timings()
+
+                if self.options.command == "run" and self.options.stats:
+                    self.__print_workload_statistics()
+
+                if self.profiler is not None:
+                    self.__report_profile()
+
+                if self.sampler is not None:
+                    self.sampler.write(self.options.sample)
+
+    def redirect_output(self, stream, buffer_lines=None):
+        """Sends what programs print to `stream`, an open file, an io.StringIO
+        or anything else with write() and flush(). Up to `buffer_lines` lines
+        are held back, by default 1 for a terminal and more for the rest.
+        What's held back is written when the program ends or fails."""
+
+        self.output.redirect(stream, buffer_lines)
+
+    def __report_error(self, message):
+        # after what the program printed before failing
+        self.output.flush()
+        print(message)
+
+    def execute(self, statements):
+        """Runs resolved statements with the chosen engine, for tools that
+        scan, parse and resolve a program on their own, to time each phase.
+        What the program prints is written out before it returns."""
+
+        try:
+            self.__execute_statements(statements)
+        finally:
+            self.output.flush()
+
+    def add_hook(self, hook):
+        """Registers an ExecutionHook, the tree engine then reports the statements,
+        calls and runtime errors of the programs it runs to it. While there are
+        hooks calls aren't memoized and tail calls return to their caller, so
+        every call is reported, with its result.
+        """
+
+        if not self.hooks:
+            self.__install_hooks()
+
+        self.hooks.append(hook)
+
+    def memo_statistics(self):
+        """Hits and misses of the memo cache of every memoized function so far,
+        keyed by the function's name and the line it is declared on."""
+
+        return {
+            f"{function_stmt.name.lexeme} (line {function_stmt.name.line})": {
+                "hits": memo.hits,
+                "misses": memo.misses,
+                "cached": len(memo.results),
+            }
+            for function_stmt, memo in self.memo_caches.items()
+        }
+
+    def __print_memo_statistics(self):
+        for name, statistics in self.memo_statistics().items():
+            print(
+                f"memo {name}: {statistics['hits']} hits, "
+                f"{statistics['misses']} misses, {statistics['cached']} cached",
+                file=sys.stderr,
+            )
+
+    def inline_cache_statistics(self):
+        """Lookups, hits and misses of the inline caches of global variables
+        and of call sites. Lookups, and so hits, are only counted when the
+        interpreter was started with --cache-stats."""
+
+        return {
+            "globals": {
+                "lookups": self.global_lookups,
+                "hits": self.global_lookups - self.global_cache_misses,
+                "misses": self.global_cache_misses,
+            },
+            "calls": {
+                "lookups": self.call_lookups,
+                "hits": self.call_lookups - self.call_cache_misses,
+                "misses": self.call_cache_misses,
+            },
+        }
+
+    def __print_inline_cache_statistics(self):
+        for kind, statistics in self.inline_cache_statistics().items():
+            rate = statistics["hits"] / max(statistics["lookups"], 1)
+            print(
+                f"inline cache {kind}: {statistics['hits']} hits, "
+                f"{statistics['misses']} misses, {rate:.1%} hit rate",
+                file=sys.stderr,
+            )
+
+    def timings(self):
+        """Seconds spent so far in every phase that ran: scan, parse, optimize,
+        resolve, load (a cached program), transpile and execute, which includes
+        compiling for the vm and closure engines. A streamed file is scanned
+        while it is parsed, both are timed as one scan+parse phase."""
+
+        return dict(self.phase_times)
+
+    def __print_timings(self):
+        for phase, seconds in self.timings().items():
+            print(f"timing {phase}: {seconds * 1000:.2f} ms", file=sys.stderr)
+
+    def __record_time(self, phase, start):
+        elapsed = time.perf_counter() - start
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + elapsed
+
+    def workload_statistics(self):
+        """How much work the programs run so far took, only counted when the
+        interpreter was started with --stats. What wasn't counted is None:
+        the tokens and nodes of a streamed file, and everything but tokens and
+        nodes with engines other than the tree engine. Calls answered from a
+        memo cache count as calls but create no symbol table, the scope depth
+        counts the globals as 1."""
+
+        workload = self.workload
+        statistics = {"tokens": workload.tokens, "nodes": workload.nodes}
+
+        if not self.options.stats or self.options.engine != "tree":
+            return {
+                **statistics,
+                "statements": None,
+                "calls": None,
+                "symbol tables": None,
+                "peak scope depth": None,
+            }
+
+        return {
+            **statistics,
+            "statements": workload.statements,
+            "calls": workload.calls,
+            "symbol tables": workload.symbol_tables,
+            "peak scope depth": workload.scope_depth,
+        }
+
+    def __print_workload_statistics(self):
+        for name, count in self.workload_statistics().items():
+            if count is not None:
+                print(f"stats {name}: {count}", file=sys.stderr)
+
+    def __count_program(self, statements, token_count):
+        nodes = NodeCounter().count(statements)
+        self.workload.tokens = (self.workload.tokens or 0) + token_count
+        self.workload.nodes = (self.workload.nodes or 0) + nodes
+
+    def __count_workload(self):
+        """Makes the interpreter count the statements it runs, the calls it
+        makes and the symbol tables it creates, and track the deepest chain of
+        symbol tables any statement ran in. As for --cache-stats the counting
+        visitor methods are set on this instance only.
+        """
+
+        workload = self.workload
+        workload.symbol_tables = 1  # the globals
+
+        def counted_symbol_table(parent, size=0, slots=None):
+            workload.symbol_tables += 1
+            return SymbolTable(parent, size, slots)
+
+        self.symbol_table = counted_symbol_table
+
+        def count_statements(visit):
+            def counted_visit(statement):
+                workload.statements += 1
+                depth = 0
+                table = self.table
+
+                while table is not None:
+                    depth += 1
+                    table = table.parent
+
+                if depth > workload.scope_depth:
+                    workload.scope_depth = depth
+
+                return visit(statement)
+
+            return counted_visit
+
+        for name in STATEMENT_VISITORS:
+            setattr(self, name, count_statements(getattr(self, name)))
+
+        visit_call = self.visit_call
+        visit_return = self.visit_return
+
+        def count_call(call_expr):
+            workload.calls += 1
+            return visit_call(call_expr)
+
+        def count_tail_call(return_stmt):
+            # a tail call is made by the visit_call that made the current call,
+            # while there are hooks by a visit_call of its own, counted there
+            if return_stmt.tail_call and not self.hooks:
+                workload.calls += 1
+
+            return visit_return(return_stmt)
+
+        self.visit_call = count_call
+        self.visit_return = count_tail_call
+
+    def __report_profile(self):
+        sys.stderr.write(self.profiler.report())
+
+        if self.options.profile_output is not None:
+            self.profiler.write(self.options.profile_output)
+
+    def __profile_statements(self):
+        """Sends the statements the interpreter runs through the profiler.
+        The profiling visitor methods are set on this instance only, so the
+        interpreter doesn't pay for profiling when it's off. Function calls
+        are profiled by the ProfiledBody visit_function gives functions.
+        """
+
+        for name in PROFILED_VISITORS:
+            setattr(self, name, self.profiler.profile_statements(getattr(self, name)))
+
+    def __install_hooks(self):
+        """Reports the statements the interpreter runs to the hooks. As for the
+        profiler the reporting visitor methods are set on this instance only,
+        the interpreter doesn't pay for hooks until one is registered.
+        Function calls are reported by the HookedBody visit_function gives
+        functions.
+        """
+
+        hooks = self.hooks
+        self.__hook_declared_functions()
+
+        for name in STATEMENT_VISITORS:
+            visit = getattr(self, name)
+
+            def hooked_visit(statement, visit=visit):
+                for hook in hooks:
+                    hook.statement_enter(statement)
+
+                return visit(statement)
+
+            setattr(self, name, hooked_visit)
+
+    def __hook_declared_functions(self):
+        """Gives the functions declared before the first hook was registered a
+        HookedBody, visit_function gives one to those declared after, and stops
+        memoizing their calls. A function that can still be called is in a
+        symbol table reachable from the current one, or from the table of
+        another such function.
+        """
+
+        tables = [self.table]
+        seen = set()  # ids of the tables and functions already looked at
+
+        while tables:
+            table = tables.pop()
+
+            while table is not None and id(table) not in seen:
+                seen.add(id(table))
+
+                if table.values is None:
+                    values = table.slots
+                else:
+                    values = [cell[0] for cell in table.values.values()]
+
+                for value in values:
+                    if type(value) is CrusherFunction and id(value) not in seen:
+                        seen.add(id(value))
+                        value.memo = None
+                        value.body = [HookedBody(value, value.body, self.hooks)]
+                        tables.append(value.table)
+
+                table = table.parent
+
+    def __notify_runtime_error(self, error):
+        for hook in self.hooks:
+            hook.runtime_error(error)
+
+    def __count_lookups(self):
+        """Makes the interpreter count the global variable reads and calls,
+        and which of the reads miss the inline cache. Counting them all slows
+        the hot path down, so it's only done on request: the counting visitor
+        methods are set on this instance only.
+        """
+
+        visit_variable = self.visit_variable
+        visit_call = self.visit_call
+
+        def count_global_lookup(variable_expr):
+            if variable_expr.depth is None:
+                self.global_lookups += 1
+
+                if variable_expr.cached_globals is not self.globals:
+                    self.global_cache_misses += 1
+
+            return visit_variable(variable_expr)
+
+        def count_call_lookup(call_expr):
+            self.call_lookups += 1
+            return visit_call(call_expr)
+
+        self.visit_variable = count_global_lookup
+        self.visit_call = count_call_lookup
 
     def __run_repl(self):
         """Starts the crusher REPL"""
@@ -62,24 +816,130 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
             try:
                 self.__execute(user_input)
             except CrusherException as e:
-                print("Error: " + str(e))
+                self.__report_error("Error: " + str(e))
             except ParserException as e:
-                print("Parser Error: " + str(e))
+                self.__report_error("Parser Error: " + str(e))
             except CrusherRuntimeError as e:
-                print("Runtime Error: " + str(e))
+                self.__report_error("Runtime Error: " + str(e))
+
+            self.output.flush()
 
     def __run_file(self, file_name):
         """Run a crusher source file"""
 
+        raw_text = self.__read_source(file_name)
+
+        if self.options.engine == "python":
+            self.__execute_python(raw_text, file_name)
+            return
+
+        self.__execute_statements(self.__parse_cached(raw_text, file_name))
+
+    def __stream_file(self, file_name):
+        """Runs a crusher source file while it is being parsed.
+        The scanner reads the file straight out of a memory map and every
+        top-level statement runs as soon as it is parsed, so neither the whole
+        source, its tokens nor its syntax tree are ever held in memory.
+        Statements before a syntax error run before the error is reported.
+        """
+
+        self.__assert_crusher_extension(file_name=file_name)
+
+        with open(file_name, "rb") as file:
+            # an empty file can't be mapped, and has nothing to run anyway
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                tokens = self.scanner.stream(buffer)
+
+                statements = self.parser.parse_stream(tokens)
+
+                try:
+                    while True:
+                        # the scanner runs as the parser pulls tokens, the two
+                        # can only be timed together
+                        start = time.perf_counter()
+                        statement = next(statements, None)
+                        self.__record_time("scan+parse", start)
+
+                        if statement is None:
+                            break
+
+                        start = time.perf_counter()
+                        optimized = self.optimizer.optimize([statement])
+                        self.__record_time("optimize", start)
+                        start = time.perf_counter()
+                        resolved = self.resolver.resolve(optimized)
+                        self.__record_time("resolve", start)
+                        self.__execute_statements(resolved)
+                finally:
+                    # the scanner holds on to the map until it's closed
+                    tokens.close()
+
+    def __watch_file(self, file_name):
+        """Runs a crusher source file, then again every time it changes.
+        Only the top-level functions that were edited are parsed again.
+        """
+
+        incremental_parser = IncrementalParser(
+            self.scanner, self.parser, self.optimizer, self.resolver
+        )
+        modified = None
+
+        try:
+            while True:
+                try:
+                    last_modified = os.stat(file_name).st_mtime_ns
+                except FileNotFoundError:
+                    # editors that save by replacing the file briefly remove it
+                    last_modified = modified
+
+                if last_modified != modified:
+                    if modified is not None:
+                        print(f"\n{file_name} changed, running it again\n")
+
+                    modified = last_modified
+                    self.__reset_runtime()
+
+                    try:
+                        raw_text = self.__read_source(file_name)
+                        self.__execute_statements(incremental_parser.parse(raw_text))
+                    except CrusherException as e:
+                        self.__report_error("Error: " + str(e))
+                    except ParserException as e:
+                        self.__report_error("Parser Error: " + str(e))
+                    except CrusherRuntimeError as e:
+                        self.__report_error("Runtime Error: " + str(e))
+
+                    self.output.flush()
+
+                time.sleep(WATCH_INTERVAL)
+        except KeyboardInterrupt:
+            self.output.flush()
+            print(f"\nStopped watching {file_name}")
+
+    def __compile_file(self, file_name):
+        """Compile a crusher source file to the requested target language"""
+
+        raw_text = self.__read_source(file_name)
+        source = self.__transpile(self.__parse(raw_text), file_name)
+
+        if self.options.output is None:
+            sys.stdout.write(source)
+            return
+
+        with open(self.options.output, "w") as file:
+            file.write(source)
+
+    def __read_source(self, file_name):
         self.__assert_crusher_extension(file_name=file_name)
 
         with open(file_name) as file:
             # Loads the source file and writes the entire file content
             # to the raw_text property as string.
 
-            raw_text = file.read()
-
-        self.__execute(raw_text)
+            return file.read()
 
     def __assert_crusher_extension(self, file_name):
         if not file_name.endswith(".crush"):
@@ -87,12 +947,167 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
                 f"Expect source code to end with .crush. Got a file named {file_name} instead."
             )
 
-    def __execute(self, raw_text):
-        tokens = self.scanner.scan(raw_text=raw_text)
+    def __parse(self, raw_text):
+        return self.__parse_counting_tokens(raw_text)[0]
+
+    def __parse_counting_tokens(self, raw_text):
+        """__parse that also returns the number of tokens of the source"""
+
+        start = time.perf_counter()
+
+        if self.options.compact_tokens:
+            tokens = self.scanner.scan_compact(raw_text=raw_text)
+        else:
+            tokens = self.scanner.scan(raw_text=raw_text)
+
+        self.__record_time("scan", start)
+        start = time.perf_counter()
         statements = self.parser.parse(tokens=tokens)
+        self.__record_time("parse", start)
+        start = time.perf_counter()
+        statements = self.optimizer.optimize(statements)
+        self.__record_time("optimize", start)
+        start = time.perf_counter()
+        statements = self.resolver.resolve(statements)
+        self.__record_time("resolve", start)
+
+        if self.options.command == "run" and self.options.stats:
+            self.__count_program(statements, len(tokens))
+
+        return statements, len(tokens)
+
+    def __parse_cached(self, raw_text, file_name):
+        """Like __parse, but the result is cached on disk next to the source file.
+        A later run of the same source loads it instead of parsing again.
+        """
+
+        if not self.options.cache:
+            return self.__parse(raw_text)
+
+        path = cached_program_path(file_name)
+        key = program_cache_key(raw_text, self.options.optimization_level)
+        start = time.perf_counter()
+        cached = read_cached_program(path, key)
+
+        if cached is not None:
+            self.__record_time("load", start)
+            statements, token_count = cached
+
+            if self.options.command == "run" and self.options.stats:
+                self.__count_program(statements, token_count)
+        else:
+            statements, token_count = self.__parse_counting_tokens(raw_text)
+            write_cached_program(path, key, statements, token_count)
+
+        return statements
+
+    def __execute(self, raw_text):
+        if self.options.engine == "python":
+            self.__execute_python(raw_text)
+            return
+
+        self.__execute_statements(self.__parse(raw_text))
+
+    def __execute_statements(self, statements):
+        if self.options.engine == "python":
+            source = self.__transpile(statements, "<crusher>")
+            self.__execute_python_module(source, "<crusher>")
+            return
+
+        max_depth = self.options.max_depth or None
+        start = time.perf_counter()
+
+        if self.profiler is not None:
+            self.profiler.start()
+
+        if self.sampler is not None:
+            self.sampler.start()
+
+        try:
+            if self.options.engine == "vm":
+                self.vm.execute(self.compiler.compile(statements), max_depth)
+                return
 
-        for statement in statements:
-            self.__execute_statement(statement)
+            if self.options.engine == "stack":
+                self.stack_evaluator.execute(statements, max_depth)
+                return
+
+            if self.options.engine == "closure":
+                self.closure_compiler.compile(statements)(self.globals)
+                return
+
+            if self.options.memo:
+                self.purity_analyzer.analyze(statements)
+
+            for statement in statements:
+                if self.__execute_statement(statement) is RETURNING:
+                    raise CrusherRuntimeError("Can't return from top-level code.")
+        except CrusherRuntimeError as error:
+            self.__notify_runtime_error(error)
+            raise
+        except RecursionError:
+            error = CrusherRuntimeError(RECURSION_TOO_DEEP)
+            self.__notify_runtime_error(error)
+            raise error from None
+        finally:
+            if self.sampler is not None:
+                self.sampler.stop()
+
+            if self.profiler is not None:
+                self.profiler.stop()
+
+            self.__record_time("execute", start)
+
+    def __transpile(self, statements, file_name):
+        start = time.perf_counter()
+
+        try:
+            source = self.transpiler.transpile(statements, file_name)
+        except RecursionError:
+            # the transpiler recurses through the tree, like the closure compiler
+            raise CrusherRuntimeError(RECURSION_TOO_DEEP) from None
+
+        self.__record_time("transpile", start)
+        return source
+
+    def __execute_python(self, raw_text, file_name=None):
+        """Transpiles the source to Python and runs it.
+        For source files the generated module is cached on disk, a later run
+        of the same source skips scanning, parsing and transpiling.
+        """
+
+        module_name = "<crusher>"
+        source = None
+        cached = file_name is not None and self.options.cache
+
+        if cached:
+            module_name = cached_module_path(file_name)
+            key = module_cache_key(raw_text, self.options.optimization_level)
+            start = time.perf_counter()
+            source = read_cached_module(module_name, key)
+
+            if source is not None:
+                self.__record_time("load", start)
+
+        if source is None:
+            source = self.__transpile(self.__parse(raw_text), file_name or "<repl>")
+
+            if cached:
+                write_cached_module(module_name, key, source)
+
+        self.__execute_python_module(source, module_name)
+
+    def __execute_python_module(self, source, module_name):
+        start = time.perf_counter()
+        namespace = {}
+
+        try:
+            exec(compile(source, module_name, "exec"), namespace)
+            execute_python_module(namespace["main"], self.python_globals, self.output)
+        except RecursionError:
+            raise CrusherRuntimeError(RECURSION_TOO_DEEP) from None
+        finally:
+            self.__record_time("execute", start)
 
     def __execute_statement(self, statement):
         return statement.accept(self)
@@ -101,74 +1116,124 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
         return literal_expr.value
 
     def visit_variable(self, variable_expr):
-        return self.table.get(variable_expr.name)
+        if variable_expr.depth is not None:
+            if variable_expr.forward:
+                return self.table.get_declared_at(
+                    variable_expr.depth,
+                    variable_expr.slot,
+                    variable_expr.name,
+                    variable_expr.fallback,
+                )
+
+            return self.table.get_at(variable_expr.depth, variable_expr.slot)
+
+        # a global keeps its cell, it's only looked up again in new globals
+        if variable_expr.cached_globals is self.globals:
+            return variable_expr.cached_cell[0]
+
+        cell = self.globals.get_cell(variable_expr.name)
+        variable_expr.cached_globals = self.globals
+        variable_expr.cached_cell = cell
+        return cell[0]
 
     def visit_unary(self, unary_expr):
         right = self.__execute_statement(unary_expr.right)
 
         if unary_expr.token.token_type == TokenType.BANG:
-            return not self.__is_truthy(right)
+            return not is_truthy(right)
 
         if unary_expr.token.token_type == TokenType.MINUS:
-            self.__assert_operands_are_number(unary_expr.token, right)
+            assert_operands_are_number(unary_expr.token.lexeme, right)
             return -right
 
     def visit_logical(self, logical_expr):
         left = self.__execute_statement(logical_expr.left)
-        right = self.__execute_statement(logical_expr.right)
 
+        # the right operand is only evaluated when the left one doesn't decide
         if logical_expr.token.token_type == TokenType.OR:
-            if self.__is_truthy(left):
+            if is_truthy(left):
                 return left
 
         if logical_expr.token.token_type == TokenType.AND:
-            if not self.__is_truthy(left):
+            if not is_truthy(left):
                 return left
 
-        return right
+        return self.__execute_statement(logical_expr.right)
 
     def visit_grouping(self, grouping_expr):
         return self.__execute_statement(grouping_expr.expr)
 
     def visit_call(self, call_expr):
-        callee = self.__execute_statement(call_expr.callee)
-        arguments = []
+        callee = call_expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in call_expr.arguments]
+        memoized = None  # (MemoCache, key) of the calls waiting for the result
+
+        # the same function as last time passed the checks below already
+        if callee is not call_expr.cached_callee:
+            self.call_cache_misses += 1
+            self.__check_callee(callee, arguments)
+            call_expr.cached_callee = callee
+
+        # every iteration runs one call, the ones after the first are tail calls
+        # made by the previous one, which returns whatever they return.
+        while True:
+            memo = callee.memo
 
-        for argument in call_expr.arguments:
-            arguments.append(self.__execute_statement(argument))
+            # the purity of a function can be withdrawn by a later line of the REPL
+            if memo is not None and callee.function_stmt.pure:
+                # types are part of the key, Python holds 1.0 and True equal
+                key = (*map(type, arguments), *arguments)
+                result = memo.lookup(key)
 
-        if not isinstance(callee, CrusherFunction):
-            raise CrusherRuntimeError("Call can only be done on functions.")
+                if result is not MISSING:
+                    break
 
-        if len(arguments) != callee.arity:
-            raise CrusherRuntimeError(
-                f"Expected {callee.arity} arguments, but got {len(arguments)}."
-            )
+                if memoized is None:
+                    memoized = []
 
-        parameters_declarations = (
-            self.__convert_arguments_and_parameters_to_declarations(
-                callee.function_stmt.parameters, arguments
-            )
-        )
-        body = parameters_declarations + callee.function_stmt.body
+                memoized.append((memo, key))
 
-        try:
-            self.__execute_block(body, SymbolTable(callee.table))
-        except ReturnException as ret:
-            return ret.value
+            # parameter i lives in slot i, so the argument list itself becomes the
+            # frame's slots once room is made for the body's locals.
+            arguments += callee.locals_padding
 
-    def __convert_arguments_and_parameters_to_declarations(self, parameters, arguments):
-        """Adds the function's parameters as declarations to the top of the body"""
+            previous = self.table
+            self.table = self.symbol_table(callee.table, slots=arguments)
+            result = None
 
-        declarations = []
+            # the body runs right here rather than through __execute_block,
+            # it's the hottest loop of any recursive program.
+            try:
+                for statement in callee.body:
+                    if statement.accept(self) is RETURNING:
+                        result = self.return_value
+                        break
+            finally:
+                self.table = previous
 
-        for parameter, argument in zip(parameters, arguments):
-            if not isinstance(parameter, Variable):
-                raise CrusherRuntimeError("Function parameters can only be identifiers")
+            if type(result) is not TailCall:
+                break
+
+            callee, arguments = result.callee, result.arguments
+            self.__check_callee(callee, arguments)
+
+        if memoized is not None:
+            for memo, key in memoized:
+                memo.store(key, result)
+
+        return result
+
+    def __check_callee(self, callee, arguments):
+        if not isinstance(callee, CrusherFunction):
+            raise CrusherRuntimeError("Call can only be done on functions.")
 
-            declarations.append(LetStatement(parameter.name, Literal(argument)))
+        if len(arguments) != callee.arity:
+            raise CrusherRuntimeError(
+                f"Expected {callee.arity} arguments, but got {len(arguments)}."
+            )
 
-        return declarations
+        if callee.parameters_error is not None:
+            raise CrusherRuntimeError(callee.parameters_error)
 
     def visit_binary(self, binary_expr):
         left = self.__execute_statement(binary_expr.left)
@@ -181,48 +1246,69 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
             return left != right
 
         if binary_expr.token.token_type == TokenType.GREATER:
-            self.__assert_operands_are_number(binary_expr.token, left, right)
+            assert_operands_are_number(binary_expr.token.lexeme, left, right)
             return left > right
 
         if binary_expr.token.token_type == TokenType.GREATER_EQUAL:
-            self.__assert_operands_are_number(binary_expr.token, left, right)
+            assert_operands_are_number(binary_expr.token.lexeme, left, right)
             return left >= right
 
         if binary_expr.token.token_type == TokenType.LESS:
-            self.__assert_operands_are_number(binary_expr.token, left, right)
+            assert_operands_are_number(binary_expr.token.lexeme, left, right)
             return left < right
 
         if binary_expr.token.token_type == TokenType.LESS_EQUAL:
-            self.__assert_operands_are_number(binary_expr.token, left, right)
+            assert_operands_are_number(binary_expr.token.lexeme, left, right)
             return left <= right
 
         if binary_expr.token.token_type == TokenType.MINUS:
-            self.__assert_operands_are_number(binary_expr.token, left, right)
-            return left - right
+            assert_operands_are_number(binary_expr.token.lexeme, left, right)
+
+            try:
+                return left - right
+            except OverflowError:
+                return overflowed(operator.sub, left, right)
 
         if binary_expr.token.token_type == TokenType.SLASH:
-            self.__assert_operands_are_number(binary_expr.token, left, right)
-            return left / right
+            assert_operands_are_number(binary_expr.token.lexeme, left, right)
+
+            try:
+                return left / right
+            except OverflowError:
+                return overflowed(operator.truediv, left, right)
 
         if binary_expr.token.token_type == TokenType.STAR:
-            self.__assert_operands_are_number(binary_expr.token, left, right)
-            return left * right
+            assert_operands_are_number(binary_expr.token.lexeme, left, right)
 
-        if binary_expr.token.token_type == TokenType.PLUS:
-            if (isinstance(left, float) and isinstance(right, float)) or (
-                isinstance(left, str) and isinstance(right, str)
-            ):
-                return left + right
+            try:
+                return left * right
+            except OverflowError:
+                return overflowed(operator.mul, left, right)
 
-            raise CrusherRuntimeError("Can only add two numbers or strings.")
+        if binary_expr.token.token_type == TokenType.PLUS:
+            return add(left, right)
 
     def visit_assignment(self, assignment_expr):
         value = self.__execute_statement(assignment_expr.value)
-        return self.table.assign(assignment_expr.identifier, value)
+
+        if assignment_expr.depth is None:
+            return self.globals.assign(assignment_expr.identifier, value)
+
+        if assignment_expr.forward:
+            return self.table.assign_declared_at(
+                assignment_expr.depth,
+                assignment_expr.slot,
+                assignment_expr.identifier,
+                value,
+                assignment_expr.fallback,
+            )
+
+        return self.table.assign_at(assignment_expr.depth, assignment_expr.slot, value)
 
     def visit_while(self, while_stmt):
-        while self.__is_truthy(self.__execute_statement(while_stmt.condition)):
-            self.__execute_statement(while_stmt.body)
+        while is_truthy(self.__execute_statement(while_stmt.condition)):
+            if self.__execute_statement(while_stmt.body) is RETURNING:
+                return RETURNING
 
     def visit_let(self, let_stmt):
         initializer = None
@@ -230,36 +1316,90 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
         if let_stmt.initializer is not None:
             initializer = self.__execute_statement(let_stmt.initializer)
 
-        self.table.define(let_stmt.name, initializer)
+        self.__define(let_stmt.name, let_stmt.slot, initializer)
 
     def visit_return(self, return_stmt):
         value = None
 
-        if return_stmt.expr is not None:
+        # while there are hooks tail calls are made as usual calls, so every
+        # call is reported with its result
+        if return_stmt.tail_call and not self.hooks:
+            # the callee and arguments are evaluated here, the call itself is
+            # left to the visit_call running the current function
+            call_expr = return_stmt.expr
+            value = TailCall(
+                call_expr.callee.accept(self),
+                [argument.accept(self) for argument in call_expr.arguments],
+            )
+        elif return_stmt.expr is not None:
             value = self.__execute_statement(return_stmt.expr)
 
-        raise ReturnException(value)
+        self.return_value = value
+        return RETURNING
 
     def visit_print(self, print_stmt):
         value = self.__execute_statement(print_stmt.expr)
-        print(self.__stringify_to_crusher_format(value))
+        self.output.write_line(stringify_to_crusher_format(value))
 
     def visit_if(self, if_stmt):
-        if self.__is_truthy(self.__execute_statement(if_stmt.condition)):
-            self.__execute_statement(if_stmt.then_branch)
-        elif if_stmt.else_branch is not None:
-            self.__execute_statement(if_stmt.else_branch)
+        if is_truthy(self.__execute_statement(if_stmt.condition)):
+            return self.__execute_statement(if_stmt.then_branch)
+
+        if if_stmt.else_branch is not None:
+            return self.__execute_statement(if_stmt.else_branch)
 
     def visit_function(self, function_stmt):
         # create a CrusherFunction instance with the function statement and current symbol table.
-        crusher_function = CrusherFunction(function_stmt, self.table)
-        self.table.define(function_stmt.name, crusher_function)
+        crusher_function = CrusherFunction(
+            function_stmt, self.table, self.__memo_cache(function_stmt)
+        )
+
+        if self.profiler is not None:
+            crusher_function.body = [ProfiledBody(function_stmt, self.profiler)]
+
+        if self.hooks:
+            crusher_function.body = [
+                HookedBody(crusher_function, crusher_function.body, self.hooks)
+            ]
+
+        self.__define(function_stmt.name, function_stmt.slot, crusher_function)
+
+    def __memo_cache(self, function_stmt):
+        """The MemoCache for the function, None when its calls aren't memoized.
+        A pure function reads nothing but its arguments, so every function
+        object created from the same declaration shares one cache. Calls
+        aren't memoized while profiling, so that every call shows up.
+        """
+
+        if not function_stmt.pure or not self.options.memo or self.hooks:
+            return None
+
+        if self.profiler is not None or self.sampler is not None:
+            return None
+
+        if function_stmt not in self.memo_caches:
+            self.memo_caches[function_stmt] = MemoCache(
+                function_stmt.name.lexeme,
+                self.options.memo_size,
+                self.options.memo_eviction,
+            )
+
+        return self.memo_caches[function_stmt]
+
+    def __define(self, name, slot, value):
+        if slot is None:
+            self.table.define(name, value)
+        else:
+            self.table.define_at(slot, name, value)
 
     def visit_block(self, block_stmt):
-        self.__execute_block(block_stmt.statements, SymbolTable(self.table))
+        return self.__execute_block(
+            block_stmt.statements,
+            self.symbol_table(self.table, block_stmt.slot_count),
+        )
 
     def visit_expression(self, expression_stmt):
-        return self.__execute_statement(expression_stmt.expr)
+        self.__execute_statement(expression_stmt.expr)
 
     def __execute_block(self, statements, table):
         previous = self.table  # store existing symbol table
@@ -269,37 +1409,11 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
 
         try:
             for statement in statements:
-                self.__execute_statement(statement)
+                if self.__execute_statement(statement) is RETURNING:
+                    return RETURNING
         finally:
             self.table = previous  # and never forget to set the interpreters symbol table back to what it was
 
-    def __stringify_to_crusher_format(self, value):
-        if value is None:
-            return "null"
-
-        if isinstance(value, bool):
-            return "true" if value else "false"
-
-        if isinstance(value, float):
-            if str(value).endswith(".0"):
-                return int(value)
-
-        return value
-
-    def __is_truthy(self, value):
-        if value is None:
-            return False
-
-        if isinstance(value, bool):
-            return value
-
-        return True
-
-    def __assert_operands_are_number(self, operator, *operands):
-        for operand in operands:
-            if not isinstance(operand, float):
-                raise CrusherRuntimeError(f"{operator.lexeme} expects a number.")
-
 
 if __name__ == "__main__":
     Interpreter(sys.argv).interpret()
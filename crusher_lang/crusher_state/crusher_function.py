@@ -1,17 +1,36 @@
+from .symbol_table import UNDEFINED
+
+
 class CrusherFunction:
     """Allows capture of the function statement and symbol table
     at the time of the function declaration.
     Also allows easier symbol table
     value type checking when asserting that a callee is actually a function.
+
+    The parameter layout is worked out once, when the function is declared,
+    so a call only has to evaluate the arguments and put them in a new frame.
     """
 
-    def __init__(self, function_stmt, table):
+    __slots__ = (
+        "function_stmt",
+        "table",
+        "body",
+        "arity",
+        "parameters_error",
+        "locals_padding",
+        "memo",
+    )
+
+    def __init__(self, function_stmt, table, memo=None):
         self.function_stmt = function_stmt
         self.table = table
-
-    @property
-    def arity(self):
-        return len(self.function_stmt.parameters)
+        # the MemoCache of a pure function when calls are memoized
+        self.memo = memo
+        self.body = function_stmt.body
+        self.arity = len(function_stmt.parameters)
+        self.parameters_error = function_stmt.parameters_error
+        # the frame's slots after the parameters, the body's own locals
+        self.locals_padding = [UNDEFINED] * (function_stmt.slot_count - self.arity)
 
     def __str__(self):
         return f"<function {self.function_stmt.name.lexeme}>"
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+# what MemoCache.lookup returns for arguments it holds no result for
+MISSING = object()
+
+# "lru" evicts the result used least recently, "fifo" the one stored first
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+class MemoCache:
+    """The results of a pure function, keyed by the arguments they were computed for.
+    Holds at most `size` results, evicting one according to `eviction` when full.
+    Counts its hits and misses.
+    """
+
+    __slots__ = ("name", "size", "least_recently_used", "results", "hits", "misses")
+
+    def __init__(self, name, size, eviction="lru"):
+        self.name = name
+        self.size = size
+        self.least_recently_used = eviction == "lru"
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        result = self.results.get(key, MISSING)
+
+        if result is MISSING:
+            self.misses += 1
+            return MISSING
+
+        self.hits += 1
+
+        if self.least_recently_used:
+            self.results.move_to_end(key)
+
+        return result
+
+    def store(self, key, result):
+        self.results[key] = result
+
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
@@ -0,0 +1,133 @@
+"""Runtime semantics shared by every Crusher execution engine.
+Keeping them in one place guarantees the tree-walking interpreter and the
+bytecode VM agree on truthiness, printing and operand checks.
+
+Numbers are ints, from literals without a decimal point, or floats. They mix
+as in Python: an operation on two ints gives an int, except for `/` which
+always gives a float, and one with a float gives a float.
+
+Before ints, every number was a float and one too large for a float became
+an infinity. An int too large to turn into a float still does, when mixed
+with a float, divided or printed, so those programs give the same output.
+"""
+
+import math
+import operator
+
+from lexer.token_type import TokenType
+from .runtime_exceptions import CrusherRuntimeError
+
+# the Python types of Crusher numbers, checked with `type(value) in NUMBER_TYPES`
+# as booleans are ints too for isinstance
+NUMBER_TYPES = frozenset((int, float))
+
+# binary operators that only accept numbers
+NUMBER_OPERATIONS = {
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+
+def is_truthy(value):
+    if value is None:
+        return False
+
+    if isinstance(value, bool):
+        return value
+
+    return True
+
+
+def stringify_to_crusher_format(value):
+    """The text print writes for `value`"""
+
+    if value is None:
+        return "null"
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    if isinstance(value, float):
+        text = str(value)
+        return str(int(value)) if text.endswith(".0") else text
+
+    if isinstance(value, int):
+        try:
+            return str(value)
+        except ValueError:
+            # past sys.get_int_max_str_digits(), 4300 digits by default
+            return str(as_float(value))
+
+    return str(value)
+
+
+def assert_operands_are_number(operator, *operands):
+    """`operator` is the lexeme of the operator, used in the error message"""
+
+    for operand in operands:
+        if type(operand) not in NUMBER_TYPES:
+            raise CrusherRuntimeError(f"{operator} expects a number.")
+
+
+def as_float(value):
+    """`value` as a float, an int too large for one is an infinity"""
+
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf if value > 0 else -math.inf
+
+
+def overflowed(operation, left, right):
+    """Repeats `operation` on the operands as floats, called when it raised
+    OverflowError because an int operand or the result doesn't fit a float"""
+
+    return operation(as_float(left), as_float(right))
+
+
+def add(left, right):
+    if (type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES) or (
+        isinstance(left, str) and isinstance(right, str)
+    ):
+        try:
+            return left + right
+        except OverflowError:
+            return overflowed(operator.add, left, right)
+
+    raise CrusherRuntimeError("Can only add two numbers or strings.")
+
+
+def evaluate_unary(operator, right):
+    """`operator` is the unary operator token, mirrors Interpreter.visit_unary"""
+
+    if operator.token_type == TokenType.BANG:
+        return not is_truthy(right)
+
+    assert_operands_are_number(operator.lexeme, right)
+    return -right
+
+
+def evaluate_binary(operator, left, right):
+    """`operator` is the binary operator token, mirrors Interpreter.visit_binary"""
+
+    if operator.token_type == TokenType.EQUAL_EQUAL:
+        return left == right
+
+    if operator.token_type == TokenType.BANG_EQUAL:
+        return left != right
+
+    if operator.token_type == TokenType.PLUS:
+        return add(left, right)
+
+    assert_operands_are_number(operator.lexeme, left, right)
+    operation = NUMBER_OPERATIONS[operator.token_type]
+
+    try:
+        return operation(left, right)
+    except OverflowError:
+        return overflowed(operation, left, right)
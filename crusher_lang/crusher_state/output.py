@@ -0,0 +1,54 @@
+import sys
+
+# lines held back before they are written, when writing to a file or pipe
+DEFAULT_BUFFER_LINES = 4096
+
+
+class Output:
+    """Where the print statements of every engine write their lines.
+    The lines are held until `buffer_lines` of them are waiting, then written
+    to the stream with a single write, instead of one print() call each.
+    By default a terminal gets every line right away while files and pipes
+    are block buffered. flush() writes whatever is waiting, the interpreter
+    calls it when the program ends or fails.
+
+    Without a stream the lines go to whatever sys.stdout is when they are
+    written out, so redirecting sys.stdout keeps working.
+    """
+
+    __slots__ = ("stream", "buffer_lines", "lines")
+
+    def __init__(self, stream=None, buffer_lines=None):
+        self.lines = []
+        self.stream = stream
+        self.buffer_lines = buffer_lines or self.__default_buffer_lines()
+
+    def __default_buffer_lines(self):
+        stream = self.stream or sys.stdout
+        isatty = getattr(stream, "isatty", None)
+
+        return 1 if isatty is not None and isatty() else DEFAULT_BUFFER_LINES
+
+    def redirect(self, stream, buffer_lines=None):
+        """Writes out the waiting lines, the next ones go to `stream`"""
+
+        self.flush()
+        self.stream = stream
+        self.buffer_lines = buffer_lines or self.__default_buffer_lines()
+
+    def write_line(self, text):
+        lines = self.lines
+        lines.append(text)
+
+        if len(lines) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        stream = self.stream or sys.stdout
+
+        if self.lines:
+            lines = self.lines
+            self.lines = []
+            stream.write("\n".join(lines) + "\n")
+
+        stream.flush()
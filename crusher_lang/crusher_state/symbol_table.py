@@ -1,27 +1,53 @@
 from .runtime_exceptions import CrusherRuntimeError
 
+# marks a frame slot whose declaration hasn't run yet
+UNDEFINED = object()
+
 
 class SymbolTable:
     """SymbolTable holds all the declarations in a block.
     Has a property `self.parent` which points to the symbol table of the current block.
+
+    Globals are kept by name in `self.values`, each in a one element list, its
+    cell. A global keeps its cell for as long as it exists, so the interpreter
+    caches the cell a global variable reads rather than its value.
+    Locals are kept in the array-backed `self.slots` and addressed by the
+    (depth, slot) pair the resolver computes for every local variable access.
+    Only the global table, the one without a parent, allocates `self.values`.
+    A call frame can be handed its already filled `slots` list.
     """
 
-    def __init__(self, parent=None):
+    # one is created for every block entered and every call, __slots__ keeps them small
+    __slots__ = ("parent", "values", "slots")
+
+    def __init__(self, parent=None, size=0, slots=None):
         self.parent = parent
-        self.values = {}
+        self.slots = [UNDEFINED] * size if slots is None else slots
+        self.values = {} if parent is None else None
 
     def get(self, token):
         if token.lexeme in self.values:
-            return self.values[token.lexeme]
+            return self.values[token.lexeme][0]
 
         if self.parent is not None:
             return self.parent.get(token)
 
         raise CrusherRuntimeError(f"Undefined variable {token.lexeme}.")
 
+    def get_cell(self, token):
+        """The cell of a global, the list its value is kept in"""
+
+        if token.lexeme in self.values:
+            return self.values[token.lexeme]
+
+        if self.parent is not None:
+            return self.parent.get_cell(token)
+
+        raise CrusherRuntimeError(f"Undefined variable {token.lexeme}.")
+
     def assign(self, token, value):
         if token.lexeme in self.values:
-            self.values[token.lexeme] = value
+            self.values[token.lexeme][0] = value
             return value
 
         if self.parent is not None:
@@ -33,4 +59,72 @@ class SymbolTable:
         if token.lexeme in self.values:
             raise CrusherRuntimeError(f"Variable {token.lexeme} already defined.")
 
-        self.values[token.lexeme] = value
+        self.values[token.lexeme] = [value]
+
+    def get_at(self, depth, slot):
+        table = self
+
+        while depth:
+            table = table.parent
+            depth -= 1
+
+        return table.slots[slot]
+
+    def get_declared_at(self, depth, slot, token, fallback=()):
+        """get_at for a variable that may be read before its declaration ran,
+        the variable it shadows is read until then"""
+
+        value = self.get_at(depth, slot)
+
+        if value is UNDEFINED:
+            return self.get_shadowed(fallback, token)
+
+        return value
+
+    def get_shadowed(self, fallback, token):
+        """The first defined of the `fallback` locals, else the global"""
+
+        for depth, slot in fallback:
+            value = self.get_at(depth, slot)
+
+            if value is not UNDEFINED:
+                return value
+
+        return self.__global_table().get(token)
+
+    def assign_at(self, depth, slot, value):
+        table = self
+
+        while depth:
+            table = table.parent
+            depth -= 1
+
+        table.slots[slot] = value
+        return value
+
+    def assign_declared_at(self, depth, slot, token, value, fallback=()):
+        """assign_at for a variable that may be assigned before its declaration
+        ran, the variable it shadows is assigned until then"""
+
+        if self.get_at(depth, slot) is not UNDEFINED:
+            return self.assign_at(depth, slot, value)
+
+        for shadowed_depth, shadowed_slot in fallback:
+            if self.get_at(shadowed_depth, shadowed_slot) is not UNDEFINED:
+                return self.assign_at(shadowed_depth, shadowed_slot, value)
+
+        return self.__global_table().assign(token, value)
+
+    def __global_table(self):
+        table = self
+
+        while table.parent is not None:
+            table = table.parent
+
+        return table
+
+    def define_at(self, slot, token, value):
+        if self.slots[slot] is not UNDEFINED:
+            raise CrusherRuntimeError(f"Variable {token.lexeme} already defined.")
+
+        self.slots[slot] = value
@@ -0,0 +1,143 @@
+import re
+
+from .scanner import CrusherException
+from .scanner import KEYWORDS_MAPPING
+from .token import Token
+from .token import number_literal
+from .token_buffer import TokenBuffer
+from .token_type import TokenType
+
+# operators and punctuation, by lexeme
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ";": TokenType.SEMICOLON,
+    "\0": TokenType.EOF,
+}
+
+# One alternative per kind of lexeme, the last one catches anything else.
+# Comments come before operators so `//` isn't read as two slashes.
+MASTER_PATTERN_SOURCE = r"""
+    (?P<SPACE>[ \t\r]+)
+    | (?P<NEWLINE>\n+)
+    | (?P<COMMENT>//[^\n]*)
+    | (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+    | (?P<STRING>"[^"]*")
+    | (?P<OPERATOR>[!=<>]=?|[(){},\-+/*;\0])
+    | (?P<UNTERMINATED_STRING>")
+    | (?P<INVALID>.)
+    """
+
+MASTER_PATTERN = re.compile(MASTER_PATTERN_SOURCE, re.VERBOSE | re.DOTALL)
+# the same pattern over bytes, for sources scanned straight out of an mmap
+MASTER_BYTES_PATTERN = re.compile(
+    MASTER_PATTERN_SOURCE.encode("ascii"), re.VERBOSE | re.DOTALL
+)
+
+
+class RegexScanner:
+    """Scans a source file and returns the tokens.
+    Produces exactly the tokens of Scanner, but every token is matched at once
+    by MASTER_PATTERN instead of being assembled one character at a time.
+    """
+
+    def scan(self, raw_text, line=1):
+        """Scans the source code or using the user input and returns
+        a lit of tokens. `line` is the line raw_text starts on in its file."""
+
+        return list(self.stream(raw_text, line))
+
+    def stream(self, buffer, line=1):
+        """Yields the tokens one at a time, scanning only as far as the consumer reads.
+        `buffer` is either a str or a bytes-like object holding UTF-8 source,
+        such as an mmap of the source file. For the latter the tokens' column
+        is a byte offset.
+        """
+
+        decode = not isinstance(buffer, str)
+        pattern = MASTER_BYTES_PATTERN if decode else MASTER_PATTERN
+        keywords = KEYWORDS_MAPPING
+        operators = OPERATORS
+        identifier = TokenType.IDENTIFIER
+
+        for match in pattern.finditer(buffer):
+            kind = match.lastgroup
+
+            if kind == "SPACE" or kind == "COMMENT":
+                continue
+
+            if kind == "INVALID":
+                # checked before decoding, it may be one byte of a longer character
+                raise CrusherException(f"Invalid character on line {line}")
+
+            lexeme = match.group()
+
+            if decode:
+                lexeme = lexeme.decode("utf-8")
+
+            if kind == "OPERATOR":
+                yield Token(operators[lexeme], lexeme, None, line, match.end())
+            elif kind == "IDENTIFIER":
+                token_type = keywords.get(lexeme, identifier)
+                yield Token(token_type, lexeme, None, line, match.end())
+            elif kind == "NEWLINE":
+                line += len(lexeme)
+            elif kind == "NUMBER":
+                yield Token(
+                    TokenType.NUMBER, lexeme, number_literal(lexeme), line, match.end()
+                )
+            elif kind == "STRING":
+                # like Scanner, newlines inside a string don't advance `line`
+                yield Token(TokenType.STRING, lexeme, lexeme, line, match.end())
+            else:
+                raise CrusherException(f"Unterminated string on line {line}")
+
+    def scan_compact(self, raw_text, line=1):
+        """Like scan, but the tokens are returned in a TokenBuffer,
+        which stores them in a fraction of the memory of a list of Tokens."""
+
+        tokens = TokenBuffer(raw_text)
+        append = tokens.append
+        keywords = KEYWORDS_MAPPING
+        operators = OPERATORS
+        identifier = TokenType.IDENTIFIER
+
+        for match in MASTER_PATTERN.finditer(raw_text):
+            kind = match.lastgroup
+
+            if kind == "SPACE" or kind == "COMMENT":
+                continue
+
+            if kind == "OPERATOR":
+                append(operators[match.group()], match.start(), match.end(), line)
+            elif kind == "IDENTIFIER":
+                token_type = keywords.get(match.group(), identifier)
+                append(token_type, match.start(), match.end(), line)
+            elif kind == "NEWLINE":
+                line += match.end() - match.start()
+            elif kind == "NUMBER":
+                append(TokenType.NUMBER, match.start(), match.end(), line)
+            elif kind == "STRING":
+                append(TokenType.STRING, match.start(), match.end(), line)
+            elif kind == "INVALID":
+                raise CrusherException(f"Invalid character on line {line}")
+            else:
+                raise CrusherException(f"Unterminated string on line {line}")
+
+        return tokens
@@ -1,4 +1,5 @@
 from .token import Token
+from .token import number_literal
 from .token_type import TokenType
 
 
@@ -35,19 +36,19 @@ class Scanner:
         self.tokens = []
         self.current_token_index = 0
 
-    def __init__scanner(self, raw_text):
+    def __init__scanner(self, raw_text, line):
         self.raw_text = raw_text
         self.start = 0
         self.current = 0
-        self.line = 1
+        self.line = line
         self.tokens = []
         self.current_token_index = 0
 
-    def scan(self, raw_text):
+    def scan(self, raw_text, line=1):
         """Scans the source code or using the user input and returns
-        a lit of tokens"""
+        a lit of tokens. `line` is the line raw_text starts on in its file."""
 
-        self.__init__scanner(raw_text=raw_text)
+        self.__init__scanner(raw_text=raw_text, line=line)
 
         while not self.__at_end_of_file:
             self.start = self.current
@@ -143,7 +144,7 @@ class Scanner:
             while self.__is_digit(self.__current_char):
                 self.__advance_char()
 
-        literal = float(self.raw_text[self.start : self.current])
+        literal = number_literal(self.raw_text[self.start : self.current])
         self.__add_token(TokenType.NUMBER, literal=literal)
 
     def __process_identifier(self):
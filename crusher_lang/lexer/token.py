@@ -10,6 +10,12 @@ class Token(NamedTuple):
 
     token_type: TokenType
     lexeme: str
-    literal: Optional[Union[int, str]]
+    literal: Optional[Union[int, float, str]]
     line: int
     column: int
+
+
+def number_literal(lexeme):
+    """The value of a number literal: an int without a decimal point, else a float"""
+
+    return float(lexeme) if "." in lexeme else int(lexeme)
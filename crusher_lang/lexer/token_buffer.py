@@ -0,0 +1,74 @@
+import sys
+from array import array
+
+from .token import Token
+from .token import number_literal
+from .token_type import TokenType
+
+# TokenType by value, the buffer stores the values
+TOKEN_TYPES = [None] * (max(token_type.value for token_type in TokenType) + 1)
+
+for token_type in TokenType:
+    TOKEN_TYPES[token_type.value] = token_type
+
+
+class TokenBuffer:
+    """A compact, read-only sequence of tokens.
+    Instead of one Token object per token it keeps the token types, start and
+    end offsets and lines in four typed arrays next to the source text, 13
+    bytes per token. The Token for an index is only built when it's read, with
+    its lexeme sliced from the source then.
+    It supports len() and indexing, all the Parser needs from a list of tokens.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+        # the parser reads the same few tokens over and over, the last ones
+        # built are kept so that doesn't slice and allocate every time.
+        self.recent = {}
+
+    def append(self, token_type, start, end, line):
+        self.types.append(token_type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        token = self.recent.get(index)
+
+        if token is not None:
+            return token
+
+        if index < 0:
+            index += len(self.types)
+
+        if not 0 <= index < len(self.types):
+            raise IndexError("token index out of range")
+
+        token_type = TOKEN_TYPES[self.types[index]]
+        lexeme = self.source[self.starts[index] : self.ends[index]]
+        literal = None
+
+        if token_type == TokenType.NUMBER:
+            literal = number_literal(lexeme)
+        elif token_type == TokenType.STRING:
+            literal = lexeme
+        else:
+            # names and fixed spellings are interned, every occurrence of a name
+            # then shares one string, and its cached hash, with the symbol tables
+            lexeme = sys.intern(lexeme)
+
+        token = Token(token_type, lexeme, literal, self.lines[index], self.ends[index])
+
+        if len(self.recent) >= 4:
+            self.recent.clear()
+
+        self.recent[index] = token
+        return token
@@ -0,0 +1,357 @@
+import json
+import marshal
+import time
+
+# how many of the most expensive lines the text report lists
+REPORT_LINES = 20
+
+# stands for the top-level code of the program in the function statistics
+PROGRAM = "<program>"
+
+
+class FunctionStatistics:
+    """Calls of one function, or of PROGRAM, and the time spent in them.
+    `self_time` leaves out the functions it called, `total_time` doesn't.
+    `callers` has the same numbers for the calls made from every caller.
+    """
+
+    __slots__ = (
+        "name",
+        "line",
+        "column",
+        "calls",
+        "primitive_calls",
+        "self_time",
+        "total_time",
+        "callers",
+    )
+
+    def __init__(self, name, line, column=0):
+        self.name = name
+        self.line = line
+        self.column = column
+        self.calls = 0
+        self.primitive_calls = 0  # the calls made while it wasn't already running
+        self.self_time = 0.0
+        self.total_time = 0.0
+        self.callers = {}  # caller key -> [calls, primitive calls, self, total]
+
+
+class LineStatistics:
+    """Runs of the statements starting on one line and the time they took.
+    `self_time` leaves out the statements nested in them and the calls they made.
+    """
+
+    __slots__ = ("line", "hits", "self_time", "total_time")
+
+    def __init__(self, line):
+        self.line = line
+        self.hits = 0
+        self.self_time = 0.0
+        self.total_time = 0.0
+
+
+class Entry:
+    """A statement or call being profiled, on the profiler's stack"""
+
+    __slots__ = ("key", "start", "nested", "caller", "path")
+
+    def __init__(self, key, start, caller=None, path=()):
+        self.key = key
+        self.start = start
+        # time of the statements and calls run inside it, for a call only the calls
+        self.nested = 0.0
+        self.caller = caller  # the Entry of the calling function, for calls
+        self.path = path  # keys of the functions on the stack, for calls
+
+
+class ProfiledBody:
+    """Stands in for the body of a function while the program is profiled.
+    The interpreter runs function bodies statement by statement, it runs this
+    one instead, which tells the profiler when the function starts and ends.
+    """
+
+    __slots__ = ("function_stmt", "profiler")
+
+    def __init__(self, function_stmt, profiler):
+        self.function_stmt = function_stmt
+        self.profiler = profiler
+
+    def accept(self, visitor):
+        self.profiler.enter_function(self.function_stmt)
+
+        try:
+            for statement in self.function_stmt.body:
+                completion = statement.accept(visitor)
+
+                # a return, handed back to the interpreter's call
+                if completion is not None:
+                    return completion
+        finally:
+            self.profiler.exit_function()
+
+
+class Profiler:
+    """Deterministic profiler of Crusher programs run by the tree interpreter.
+    Records the calls, self and total time of every function, by its
+    FunctionStatement, and of every source line, by the line statements start on.
+    Nested runs of the same function or line, recursion, only add to its
+    total time once, as in cProfile.
+    """
+
+    def __init__(self, file_name, clock=time.perf_counter):
+        self.file_name = file_name
+        self.clock = clock
+        self.functions = {PROGRAM: FunctionStatistics(PROGRAM, 0)}
+        self.lines = {}
+        self.stack_times = {}  # function keys from the program down -> self time
+        self.running = {}  # key -> how many of its runs are on the stack
+        self.stack = []  # Entry of every statement and call being run
+        self.calls = []  # Entry of every call being run, PROGRAM first
+
+    def start(self):
+        entry = Entry(PROGRAM, self.clock(), path=(PROGRAM,))
+        self.stack.append(entry)
+        self.calls.append(entry)
+        self.running[PROGRAM] = 1
+
+    def stop(self):
+        self.__exit_call(self.functions[PROGRAM])
+
+    def profile_statements(self, visit):
+        """Wraps a statement visitor method of the interpreter, the statements
+        it visits then show up in the line statistics."""
+
+        enter_statement = self.enter_statement
+        exit_statement = self.exit_statement
+
+        def profiled_visit(statement):
+            enter_statement(statement)
+
+            try:
+                return visit(statement)
+            finally:
+                exit_statement()
+
+        return profiled_visit
+
+    def enter_statement(self, statement):
+        line = statement.line
+        self.running[line] = self.running.get(line, 0) + 1
+        self.stack.append(Entry(line, self.clock()))
+
+    def exit_statement(self):
+        entry = self.stack.pop()
+        elapsed = self.clock() - entry.start
+
+        statistics = self.lines.get(entry.key)
+
+        if statistics is None:
+            statistics = self.lines[entry.key] = LineStatistics(entry.key)
+
+        statistics.hits += 1
+        statistics.self_time += elapsed - entry.nested
+        self.running[entry.key] -= 1
+
+        if not self.running[entry.key]:
+            statistics.total_time += elapsed
+
+        # the time of a function's statements is the function's own time
+        if self.stack[-1] is not self.calls[-1]:
+            self.stack[-1].nested += elapsed
+
+    def enter_function(self, function_stmt):
+        caller = self.calls[-1]
+        entry = Entry(
+            function_stmt, self.clock(), caller, caller.path + (function_stmt,)
+        )
+
+        if function_stmt not in self.functions:
+            name = function_stmt.name
+            self.functions[function_stmt] = FunctionStatistics(
+                name.lexeme, name.line, name.column
+            )
+
+        self.running[function_stmt] = self.running.get(function_stmt, 0) + 1
+        self.stack.append(entry)
+        self.calls.append(entry)
+
+    def exit_function(self):
+        self.__exit_call(self.functions[self.calls[-1].key])
+
+    def __exit_call(self, statistics):
+        entry = self.stack.pop()
+        self.calls.pop()
+
+        elapsed = self.clock() - entry.start
+        self_time = elapsed - entry.nested
+        primitive = self.running[entry.key] == 1
+
+        statistics.calls += 1
+        statistics.self_time += self_time
+        self.running[entry.key] -= 1
+
+        if primitive:
+            statistics.primitive_calls += 1
+            statistics.total_time += elapsed
+
+        if entry.caller is not None:
+            caller = statistics.callers.setdefault(entry.caller.key, [0, 0, 0.0, 0.0])
+            caller[0] += 1
+            caller[2] += self_time
+
+            if primitive:
+                caller[1] += 1
+                caller[3] += elapsed
+
+        self.stack_times[entry.path] = self.stack_times.get(entry.path, 0.0) + self_time
+
+        if not self.stack:
+            return
+
+        # the call is nested time of the statement making it and of the caller
+        self.stack[-1].nested += elapsed
+
+        if self.calls[-1] is not self.stack[-1]:
+            self.calls[-1].nested += elapsed
+
+    def report(self):
+        """The text report: functions by total time, then the lines taking
+        the most time by themselves."""
+
+        lines = [
+            f"{'calls':>10} {'self s':>10} {'total s':>10}  function",
+        ]
+
+        for statistics in sorted(
+            self.functions.values(), key=lambda s: s.total_time, reverse=True
+        ):
+            calls = str(statistics.calls)
+
+            if statistics.primitive_calls != statistics.calls:
+                calls = f"{statistics.calls}/{statistics.primitive_calls}"
+
+            lines.append(
+                f"{calls:>10} {statistics.self_time:10.6f} "
+                f"{statistics.total_time:10.6f}  {self.__describe(statistics)}"
+            )
+
+        lines.append("")
+        lines.append(f"{'runs':>10} {'self s':>10} {'total s':>10}  line")
+
+        for statistics in sorted(
+            self.lines.values(), key=lambda s: s.self_time, reverse=True
+        )[:REPORT_LINES]:
+            lines.append(
+                f"{statistics.hits:>10} {statistics.self_time:10.6f} "
+                f"{statistics.total_time:10.6f}  {self.file_name}:{statistics.line}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def __describe(self, statistics):
+        if statistics.name == PROGRAM:
+            return f"{PROGRAM} ({self.file_name})"
+
+        return f"{statistics.name} ({self.file_name}:{statistics.line})"
+
+    def write(self, path):
+        """Writes the function statistics to `path`: a speedscope profile when
+        it ends with .json, else a pstats file, for `python -m pstats path`."""
+
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump(self.__speedscope(), file)
+        else:
+            with open(path, "wb") as file:
+                marshal.dump(self.__pstats(), file)
+
+    def __pstats_keys(self):
+        """The (file, line, name) of every function in the pstats file. Functions
+        declared with the same name on the same line get the column of their
+        name token, its offset in the source, in the name, or they would be
+        merged into one entry."""
+
+        declared = {}
+
+        for statistics in self.functions.values():
+            position = (statistics.line, statistics.name)
+            declared[position] = declared.get(position, 0) + 1
+
+        keys = {}
+
+        for key, statistics in self.functions.items():
+            name = statistics.name
+
+            if declared[(statistics.line, name)] > 1:
+                name = f"{name}:{statistics.column}"
+
+            keys[key] = (self.file_name, statistics.line, name)
+
+        return keys
+
+    def __pstats(self):
+        # the layout pstats.Stats loads: for every function (file, line, name)
+        # -> (primitive calls, calls, self, total, callers), where callers maps
+        # every caller to (calls, primitive calls, self, total)
+        keys = self.__pstats_keys()
+
+        return {
+            keys[key]: (
+                statistics.primitive_calls,
+                statistics.calls,
+                statistics.self_time,
+                statistics.total_time,
+                {
+                    keys[caller]: tuple(numbers)
+                    for caller, numbers in statistics.callers.items()
+                },
+            )
+            for key, statistics in self.functions.items()
+        }
+
+    def __speedscope(self):
+        # a "sampled" profile with one sample per distinct stack of functions,
+        # weighted by the time spent in its innermost function
+        frames = []
+        indexes = {}
+        samples = []
+        weights = []
+
+        for path, self_time in self.stack_times.items():
+            sample = []
+
+            for key in path:
+                if key not in indexes:
+                    statistics = self.functions[key]
+                    indexes[key] = len(frames)
+                    frames.append(
+                        {
+                            "name": statistics.name,
+                            "file": self.file_name,
+                            "line": statistics.line,
+                        }
+                    )
+
+                sample.append(indexes[key])
+
+            samples.append(sample)
+            weights.append(self_time)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.file_name,
+            "exporter": "crusher --profile",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.file_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.functions[PROGRAM].total_time,
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
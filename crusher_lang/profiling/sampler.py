@@ -0,0 +1,93 @@
+import signal
+
+from crusher_state.crusher_function import CrusherFunction
+
+# stands for the top-level code of the program in the stacks
+PROGRAM = "<program>"
+
+
+class SamplingProfiler:
+    """Samples where a program run by the tree interpreter spends its time.
+    A SIGPROF timer interrupts the program every `interval` seconds of CPU
+    time. The handler walks the Python stack it interrupted and maps the
+    interpreter's frames back to Crusher: every visit_call frame running a
+    function body is a Crusher function, named by its FunctionStatement, and
+    the innermost statement visitor frame under it gives the line it's on.
+
+    Nothing is recorded between samples, the program runs at full speed.
+    The stacks come out collapsed, one "outer;...;inner count" line per
+    distinct stack, the input of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, file_name, interval, call_code, statement_codes):
+        self.file_name = file_name
+        self.interval = interval
+        # code objects of the interpreter's visit_call and statement visitors
+        self.call_code = call_code
+        self.statement_codes = frozenset(statement_codes)
+        self.stacks = {}  # collapsed stack -> samples
+        self.previous_handler = None
+
+    @staticmethod
+    def is_supported():
+        return hasattr(signal, "setitimer") and hasattr(signal, "SIGPROF")
+
+    def start(self):
+        self.previous_handler = signal.signal(signal.SIGPROF, self.__sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler)
+
+    def __sample(self, signal_number, frame):
+        functions = []  # "name (file:line)" of every function, innermost first
+        line = None
+
+        while frame is not None:
+            code = frame.f_code
+
+            if code in self.statement_codes:
+                # the statement is the visitor's only argument
+                if line is None:
+                    line = frame.f_locals[code.co_varnames[1]].line
+            elif code is self.call_code:
+                local_variables = frame.f_locals
+
+                # until the arguments are evaluated the caller is still running
+                if "arguments" in local_variables and isinstance(
+                    local_variables.get("callee"), CrusherFunction
+                ):
+                    name = local_variables["callee"].function_stmt.name.lexeme
+                    functions.append(self.__frame(name, line))
+                    line = None
+
+            frame = frame.f_back
+
+        functions.append(self.__frame(PROGRAM, line))
+        stack = ";".join(reversed(functions))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def __frame(self, name, line):
+        if line is None:
+            return name
+
+        return f"{name} ({self.file_name}:{line})"
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self):
+        """The samples as collapsed stacks, the most sampled first"""
+
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(
+                self.stacks.items(), key=lambda item: item[1], reverse=True
+            )
+        )
+
+    def write(self, path):
+        with open(path, "w") as file:
+            file.write(self.collapsed())
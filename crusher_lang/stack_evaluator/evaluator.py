@@ -0,0 +1,282 @@
+from ast_generator.expression import ExpressionVisitor
+from ast_generator.statement import StatementVisitor
+from crusher_state.crusher_function import CrusherFunction
+from crusher_state.operations import evaluate_binary
+from crusher_state.operations import evaluate_unary
+from crusher_state.operations import is_truthy
+from crusher_state.operations import stringify_to_crusher_format
+from crusher_state.runtime_exceptions import CrusherRuntimeError
+from crusher_state.symbol_table import SymbolTable
+from lexer.token_type import TokenType
+
+
+class StackEvaluator(ExpressionVisitor, StatementVisitor):
+    """Walks resolved statements like the tree Interpreter, without recursing in Python.
+    What is left to do lives on `work`, a list used as a stack: nodes still to
+    visit and continuations, `(method, data)` tuples run once the values they
+    wait for are on `values`. Visiting a node never visits another one, it
+    pushes its children and a continuation instead, so the Python stack stays
+    flat and the Crusher recursion depth is only limited by memory, or by
+    `max_depth` when one is given.
+
+    Every running call has a `(work height, caller's table)` entry in `frames`,
+    a return drops everything the call pushed on `work` above that height.
+    """
+
+    def __init__(self, globals, output):
+        self.globals = globals
+        self.output = output  # the Output print writes to
+        self.table = globals
+        self.work = []
+        self.values = []
+        self.frames = []
+        self.max_depth = None
+
+    def execute(self, statements, max_depth=None):
+        self.table = self.globals
+        self.work = work = list(reversed(statements))
+        self.values = []
+        self.frames = []
+        self.max_depth = max_depth
+
+        pop = work.pop
+
+        try:
+            while work:
+                item = pop()
+
+                if type(item) is tuple:
+                    item[0](item[1])
+                else:
+                    item.accept(self)
+        finally:
+            # an error leaves the frames of the calls it interrupted behind
+            self.table = self.globals
+            self.work = []
+            self.values = []
+            self.frames = []
+
+    def __push_operands(self, continuation, data, *operands):
+        # the operands are visited in order, then the continuation runs
+        self.work.append((continuation, data))
+        self.work.extend(reversed(operands))
+
+    def visit_literal(self, literal_expr):
+        self.values.append(literal_expr.value)
+
+    def visit_variable(self, variable_expr):
+        if variable_expr.depth is None:
+            self.values.append(self.globals.get(variable_expr.name))
+        elif variable_expr.forward:
+            self.values.append(
+                self.table.get_declared_at(
+                    variable_expr.depth,
+                    variable_expr.slot,
+                    variable_expr.name,
+                    variable_expr.fallback,
+                )
+            )
+        else:
+            self.values.append(
+                self.table.get_at(variable_expr.depth, variable_expr.slot)
+            )
+
+    def visit_unary(self, unary_expr):
+        self.__push_operands(self.__apply_unary, unary_expr, unary_expr.right)
+
+    def __apply_unary(self, unary_expr):
+        values = self.values
+        values.append(evaluate_unary(unary_expr.token, values.pop()))
+
+    def visit_logical(self, logical_expr):
+        self.__push_operands(self.__apply_logical, logical_expr, logical_expr.left)
+
+    def __apply_logical(self, logical_expr):
+        # the left operand stays the result when it decides it
+        if is_truthy(self.values[-1]) == (
+            logical_expr.token.token_type == TokenType.OR
+        ):
+            return
+
+        self.values.pop()
+        self.work.append(logical_expr.right)
+
+    def visit_grouping(self, grouping_expr):
+        self.work.append(grouping_expr.expr)
+
+    def visit_call(self, call_expr):
+        self.__push_operands(
+            self.__call,
+            len(call_expr.arguments),
+            call_expr.callee,
+            *call_expr.arguments,
+        )
+
+    def __pop_call(self, argument_count):
+        """Pops the evaluated callee and arguments of a call and checks them"""
+
+        values = self.values
+        arguments = values[len(values) - argument_count :]
+        del values[len(values) - argument_count :]
+        callee = values.pop()
+
+        if not isinstance(callee, CrusherFunction):
+            raise CrusherRuntimeError("Call can only be done on functions.")
+
+        if argument_count != callee.arity:
+            raise CrusherRuntimeError(
+                f"Expected {callee.arity} arguments, but got {argument_count}."
+            )
+
+        if callee.parameters_error is not None:
+            raise CrusherRuntimeError(callee.parameters_error)
+
+        return callee, arguments
+
+    def __call(self, argument_count):
+        callee, arguments = self.__pop_call(argument_count)
+
+        if self.max_depth is not None and len(self.frames) >= self.max_depth:
+            raise CrusherRuntimeError(
+                f"Maximum recursion depth of {self.max_depth} exceeded."
+            )
+
+        self.__enter(callee, arguments)
+
+    def __enter(self, callee, arguments):
+        work = self.work
+
+        self.frames.append((len(work), self.table))
+        work.append((self.__fall_off, None))
+        work.extend(reversed(callee.body))
+
+        # parameter i lives in slot i, as in the tree Interpreter
+        self.table = SymbolTable(callee.table, slots=arguments + callee.locals_padding)
+
+    def __fall_off(self, _):
+        # the body ran to its end without a return
+        self.values.append(None)
+        self.table = self.frames.pop()[1]
+
+    def __leave(self):
+        """Drops what's left of the running call and goes back to its caller"""
+
+        height, self.table = self.frames.pop()
+        del self.work[height:]
+
+    def visit_binary(self, binary_expr):
+        self.__push_operands(
+            self.__apply_binary, binary_expr, binary_expr.left, binary_expr.right
+        )
+
+    def __apply_binary(self, binary_expr):
+        values = self.values
+        right = values.pop()
+        values[-1] = evaluate_binary(binary_expr.token, values[-1], right)
+
+    def visit_assignment(self, assignment_expr):
+        self.__push_operands(self.__assign, assignment_expr, assignment_expr.value)
+
+    def __assign(self, assignment_expr):
+        # the assigned value stays on the stack as the expression's value
+        value = self.values[-1]
+
+        if assignment_expr.depth is None:
+            self.globals.assign(assignment_expr.identifier, value)
+        elif assignment_expr.forward:
+            self.table.assign_declared_at(
+                assignment_expr.depth,
+                assignment_expr.slot,
+                assignment_expr.identifier,
+                value,
+                assignment_expr.fallback,
+            )
+        else:
+            self.table.assign_at(assignment_expr.depth, assignment_expr.slot, value)
+
+    def visit_while(self, while_stmt):
+        self.__push_operands(self.__loop, while_stmt, while_stmt.condition)
+
+    def __loop(self, while_stmt):
+        if is_truthy(self.values.pop()):
+            # the body, then the condition again, then back here
+            self.__push_operands(
+                self.__loop, while_stmt, while_stmt.body, while_stmt.condition
+            )
+
+    def visit_let(self, let_stmt):
+        if let_stmt.initializer is None:
+            self.__define(let_stmt.name, let_stmt.slot, None)
+        else:
+            self.__push_operands(self.__define_let, let_stmt, let_stmt.initializer)
+
+    def __define_let(self, let_stmt):
+        self.__define(let_stmt.name, let_stmt.slot, self.values.pop())
+
+    def visit_return(self, return_stmt):
+        if return_stmt.tail_call:
+            call_expr = return_stmt.expr
+            self.__push_operands(
+                self.__tail_call,
+                len(call_expr.arguments),
+                call_expr.callee,
+                *call_expr.arguments,
+            )
+        elif return_stmt.expr is None:
+            self.values.append(None)
+            self.__return(None)
+        else:
+            self.__push_operands(self.__return, None, return_stmt.expr)
+
+    def __return(self, _):
+        if not self.frames:
+            raise CrusherRuntimeError("Can't return from top-level code.")
+
+        self.__leave()
+
+    def __tail_call(self, argument_count):
+        # the callee takes the place of the returning function's frame
+        callee, arguments = self.__pop_call(argument_count)
+        self.__leave()
+        self.__enter(callee, arguments)
+
+    def visit_print(self, print_stmt):
+        self.__push_operands(self.__print, None, print_stmt.expr)
+
+    def __print(self, _):
+        self.output.write_line(stringify_to_crusher_format(self.values.pop()))
+
+    def visit_if(self, if_stmt):
+        self.__push_operands(self.__branch, if_stmt, if_stmt.condition)
+
+    def __branch(self, if_stmt):
+        if is_truthy(self.values.pop()):
+            self.work.append(if_stmt.then_branch)
+        elif if_stmt.else_branch is not None:
+            self.work.append(if_stmt.else_branch)
+
+    def visit_function(self, function_stmt):
+        crusher_function = CrusherFunction(function_stmt, self.table)
+        self.__define(function_stmt.name, function_stmt.slot, crusher_function)
+
+    def __define(self, name, slot, value):
+        if slot is None:
+            self.table.define(name, value)
+        else:
+            self.table.define_at(slot, name, value)
+
+    def visit_block(self, block_stmt):
+        work = self.work
+        work.append((self.__restore_table, self.table))
+        work.extend(reversed(block_stmt.statements))
+
+        self.table = SymbolTable(self.table, block_stmt.slot_count)
+
+    def __restore_table(self, table):
+        self.table = table
+
+    def visit_expression(self, expression_stmt):
+        self.__push_operands(self.__discard, None, expression_stmt.expr)
+
+    def __discard(self, _):
+        self.values.pop()
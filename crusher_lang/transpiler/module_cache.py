@@ -0,0 +1,89 @@
+import hashlib
+import os
+
+# bump whenever the generated code changes shape, it's part of the cache key
+TRANSPILER_VERSION = "9"
+
+CACHE_DIRECTORY = "__crushcache__"
+
+
+def cache_file_path(file_name, extension):
+    """Path of the file cached for the source `file_name` in the __crushcache__
+    directory next to it. There is one per source file and extension, a new
+    version of the source overwrites it instead of adding a file.
+    """
+
+    directory = os.path.join(
+        os.path.dirname(os.path.abspath(file_name)), CACHE_DIRECTORY
+    )
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+
+    return os.path.join(directory, f"{stem}{extension}")
+
+
+def cache_key(key):
+    """The digest stored in a cached file. `key` must cover everything the
+    cached content depends on, a file with another digest is stale."""
+
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def can_write_cache(path):
+    """Whether the cache file `path` can be written, creating its directory
+    if need be. Checked before writing, so a read-only checkout is left alone."""
+
+    directory = os.path.dirname(path)
+
+    if os.path.isdir(directory):
+        return os.access(directory, os.W_OK)
+
+    return os.access(os.path.dirname(directory), os.W_OK)
+
+
+def cached_module_path(file_name):
+    return cache_file_path(file_name, ".py")
+
+
+def module_cache_key(raw_text, optimization_level=0):
+    """Editing the source or changing -O makes the cached module stale"""
+
+    return cache_key(f"{TRANSPILER_VERSION}\0{optimization_level}\0{raw_text}")
+
+
+def read_cached_module(path, key):
+    """Returns the cached module source, None when it's missing or stale.
+    The interpreter executes it, the __crushcache__ directory must be trusted.
+    """
+
+    try:
+        with open(path) as file:
+            # the first line is a comment naming the key it was generated for
+            if file.readline() != f"# {key}\n":
+                return None
+
+            return file.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def write_cached_module(path, key, source):
+    if not can_write_cache(path):
+        return
+
+    # written to a temporary file first so a concurrent run never loads half a module
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(temporary_path, "w") as file:
+            file.write(f"# {key}\n")
+            file.write(source)
+
+        os.replace(temporary_path, path)
+    except OSError:
+        # a cache that can't be written (full disk, ...) only costs speed
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
@@ -0,0 +1,809 @@
+from ast_generator.expression import Assignment
+from ast_generator.expression import Binary
+from ast_generator.expression import Call
+from ast_generator.expression import ExpressionVisitor
+from ast_generator.expression import Literal
+from ast_generator.expression import Unary
+from ast_generator.expression import Variable
+from ast_generator.statement import BlockStatement
+from ast_generator.statement import FunctionStatement
+from ast_generator.statement import IfStatement
+from ast_generator.statement import ReturnStatement
+from ast_generator.statement import StatementVisitor
+from ast_generator.statement import WhileStatement
+from crusher_state.operations import NUMBER_TYPES
+from lexer.token_type import TokenType
+
+RUNTIME_IMPORTS = [
+    "UNDEFINED",
+    "Function",
+    "add",
+    "already_defined",
+    "call_failure",
+    "get_shadowed",
+    "number_error",
+    "number_operation",
+    "parameters_error",
+    "print_value",
+    "run",
+    "set_box",
+    "set_declared_box",
+    "set_global",
+    "top_level_return_error",
+    "undefined",
+]
+
+NUMBER_OPERATORS = {
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.SLASH: "/",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+# an operand whose code nests this many parentheses deep is computed by a
+# statement of its own first, CPython can't parse more than 200 levels
+SPILL_HEIGHT = 40
+
+# an int too large for a float raises OverflowError when mixed with a float,
+# and so can `/` on two ints; the generated code leaves those to the runtime
+# helpers, which make it an infinity like every engine does
+def fits_float(value):
+    """Whether the number `value` can be turned into a float"""
+
+    try:
+        float(value)
+    except OverflowError:
+        return False
+
+    return True
+
+
+# expressions of these binary operators always evaluate to a bool
+BOOLEAN_OPERATORS = {
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+}
+
+
+class PythonScope:
+    """A Crusher scope while generating Python.
+    Maps the resolver's slots to the Python names holding the variables.
+    `boxed` variables live in a one element list so nested functions can
+    capture and update them. `in_function` is False for the top-level code.
+
+    A nested function captures the boxes of the variables declared after it
+    too, those boxes are `predeclared`: created holding UNDEFINED when the
+    scope is entered, at line `start`, and filled by the declaration.
+    """
+
+    def __init__(self, boxed, in_function, size=0, start=0):
+        self.names = {}
+        self.boxed = boxed
+        self.in_function = in_function
+        self.size = size  # the resolver's slot count of the scope
+        self.start = start
+        self.predeclared = []
+
+
+class PythonTranspiler(ExpressionVisitor, StatementVisitor):
+    """Generates the source of a Python module equivalent to resolved Crusher statements.
+
+    Crusher locals become Python locals, Crusher globals are entries of the
+    dictionary passed to the generated `main`, and every operation keeps the
+    checks the interpreter does, with the common int and float cases inlined.
+    Locals of a function that declares nested functions are boxed, and nested
+    functions receive the boxes they can see as keyword-only defaults, so each
+    declaration captures the variables of the scope it ran in.
+
+    Every expression becomes a single Python expression, unless it nests too
+    deep for CPython to parse. Its deepest operands are then assigned to
+    temporaries by statements emitted before it, keeping the evaluation order.
+
+    A function that returns a call to itself, outside of a while loop, has its
+    body in a `while True:` loop. When the callee is the function itself, the
+    tail call sets the parameters and starts the loop again instead of calling.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.indent = 0
+        self.scopes = []
+        self.counter = 0
+        self.height = 0  # parentheses nesting of the last expression's code
+        # the parameters of the function whose tail calls to itself loop, if any
+        self.loop_parameters = None
+        self.loops = 0  # while loops around the current statement, in the function
+
+    def transpile(self, statements, source_name="<crusher>"):
+        self.lines = []
+        self.indent = 0
+        self.scopes = []
+        self.counter = 0
+        self.height = 0
+        self.loop_parameters = None
+        self.loops = 0
+
+        self.__emit(f'"""Generated by the Crusher transpiler from {source_name}."""')
+        self.__emit("")
+        self.__emit(f"from transpiler.runtime import {', '.join(RUNTIME_IMPORTS)}")
+        self.__emit("")
+        self.__emit("")
+        self.__emit("def main(G):")
+        self.indent += 1
+
+        # top-level blocks become scopes of `main`
+        self.scopes.append(
+            PythonScope(boxed=self.__contains_function(statements), in_function=False)
+        )
+        self.__emit_body(statements)
+        self.__exit_scope()
+
+        self.indent -= 1
+        self.__emit("")
+        self.__emit("")
+        self.__emit('if __name__ == "__main__":')
+        self.__emit("    run(main)")
+
+        return "\n".join(self.lines) + "\n"
+
+    # helpers
+
+    def __emit(self, line):
+        self.lines.append("    " * self.indent + line if line else "")
+
+    def __emit_body(self, statements):
+        start = len(self.lines)
+
+        for statement in statements:
+            statement.accept(self)
+
+        if len(self.lines) == start:
+            self.__emit("pass")
+
+    def __temporary(self):
+        self.counter += 1
+        return f"_t{self.counter}"
+
+    def __new_name(self, prefix, lexeme):
+        self.counter += 1
+        return f"{prefix}_{lexeme}_{self.counter}"
+
+    def __expression(self, expr):
+        return expr.accept(self)
+
+    def __operands(self, *exprs):
+        """The code of every expression, evaluated in order. Sets self.height
+        to the nesting of the deepest one, the caller adds its own.
+
+        An operand nesting SPILL_HEIGHT deep is assigned to a temporary by a
+        statement. When an operand emits statements, the operands before it
+        are assigned to temporaries ahead of them so they still run first.
+        """
+
+        codes = []
+        ends = []  # where the statements of each operand end
+        unspilled = 0  # the operands before this one are temporaries already
+        height = 0
+
+        for expr in exprs:
+            start = len(self.lines)
+            code = expr.accept(self)
+
+            if self.height >= SPILL_HEIGHT:
+                code = self.__spill(code, len(self.lines))
+                self.height = 0
+
+            if len(self.lines) > start:
+                # from the last one, so the positions of the others don't move
+                for index in reversed(range(unspilled, len(codes))):
+                    if not isinstance(exprs[index], Literal):
+                        codes[index] = self.__spill(codes[index], ends[index])
+
+                unspilled = len(codes)
+
+            codes.append(code)
+            ends.append(len(self.lines))
+            height = max(height, self.height)
+
+        self.height = height
+        return codes
+
+    def __spill(self, code, position):
+        """Inserts a statement assigning `code` to a new temporary at line `position`"""
+
+        temporary = self.__temporary()
+        self.lines.insert(position, f"{'    ' * self.indent}{temporary} = {code}")
+        return temporary
+
+    def __lookup(self, depth, slot):
+        scope = self.scopes[-1 - depth]
+        return scope.names[slot], scope.boxed
+
+    def __shadowed(self, name, fallback):
+        """Arguments of get_shadowed and set_declared_box naming the variables
+        a variable declared after the function using it shadows"""
+
+        # the fallback variables are in scopes around a function, always boxed
+        boxes = [self.__lookup(depth, slot)[0] for depth, slot in fallback]
+        return ", ".join(["G", repr(name.lexeme), *boxes])
+
+    def __exit_scope(self):
+        """Pops the current scope, creating its predeclared boxes at its start"""
+
+        scope = self.scopes.pop()
+        self.lines[scope.start : scope.start] = [
+            f"{'    ' * self.indent}{scope.names[slot]} = [UNDEFINED]"
+            for slot in scope.predeclared
+        ]
+
+    def __predeclare(self):
+        """Gives the boxed variables not declared yet in the enclosing scopes
+        their boxes, so the function defined next can capture them"""
+
+        for scope in self.scopes:
+            if not scope.boxed:
+                continue
+
+            for slot in range(scope.size):
+                if slot not in scope.names:
+                    scope.names[slot] = self.__new_name("v", f"s{slot}")
+                    scope.predeclared.append(slot)
+
+    def __contains_function(self, statements):
+        for statement in statements:
+            if isinstance(statement, FunctionStatement):
+                return True
+
+            if isinstance(statement, BlockStatement) and self.__contains_function(
+                statement.statements
+            ):
+                return True
+
+            if isinstance(statement, WhileStatement) and self.__contains_function(
+                [statement.body]
+            ):
+                return True
+
+            if isinstance(statement, IfStatement) and self.__contains_function(
+                [statement.then_branch]
+                + ([statement.else_branch] if statement.else_branch else [])
+            ):
+                return True
+
+        return False
+
+    def __calls_itself(self, statements, lexeme):
+        """Whether the statements return a call to the function `lexeme`,
+        outside of while loops and nested functions"""
+
+        for statement in statements:
+            if isinstance(statement, ReturnStatement):
+                if (
+                    statement.tail_call
+                    and isinstance(statement.expr.callee, Variable)
+                    and statement.expr.callee.name.lexeme == lexeme
+                ):
+                    return True
+
+            if isinstance(statement, BlockStatement) and self.__calls_itself(
+                statement.statements, lexeme
+            ):
+                return True
+
+            if isinstance(statement, IfStatement) and self.__calls_itself(
+                [statement.then_branch]
+                + ([statement.else_branch] if statement.else_branch else []),
+                lexeme,
+            ):
+                return True
+
+        return False
+
+    def __condition(self, expr):
+        """Python condition testing the Crusher truthiness of `expr`"""
+
+        (code,) = self.__operands(expr)
+
+        if (
+            isinstance(expr, Binary) and expr.token.token_type in BOOLEAN_OPERATORS
+        ) or (isinstance(expr, Unary) and expr.token.token_type == TokenType.BANG):
+            return code
+
+        temporary = self.__temporary()
+        return f"({temporary} := {code}) is not None and {temporary} is not False"
+
+    # expressions
+
+    def visit_literal(self, literal_expr):
+        self.height = 0
+        return repr(literal_expr.value)
+
+    def visit_variable(self, variable_expr):
+        self.height = 1
+
+        if variable_expr.depth is None:
+            return f"G[{variable_expr.name.lexeme!r}]"
+
+        name, boxed = self.__lookup(variable_expr.depth, variable_expr.slot)
+
+        if variable_expr.forward:
+            # the box of a variable declared after the function reading it
+            temporary = self.__temporary()
+            shadowed = self.__shadowed(variable_expr.name, variable_expr.fallback)
+            return (
+                f"({temporary} if ({temporary} := {name}[0]) is not UNDEFINED "
+                f"else get_shadowed({shadowed}))"
+            )
+
+        return f"{name}[0]" if boxed else name
+
+    def visit_unary(self, unary_expr):
+        (right,) = self.__operands(unary_expr.right)
+        self.height += 2
+        temporary = self.__temporary()
+
+        if unary_expr.token.token_type == TokenType.BANG:
+            return f"(({temporary} := {right}) is None or {temporary} is False)"
+
+        return (
+            f"(-{temporary} if type({temporary} := {right}) is int "
+            f"or type({temporary}) is float else number_error('-', {temporary}))"
+        )
+
+    def visit_logical(self, logical_expr):
+        is_or = logical_expr.token.token_type == TokenType.OR
+        (left,) = self.__operands(logical_expr.left)
+        left_height = self.height
+
+        # statements the right operand needs go in an `if`, as it isn't always evaluated
+        start = len(self.lines)
+        self.indent += 1
+        (right,) = self.__operands(logical_expr.right)
+        self.indent -= 1
+        temporary = self.__temporary()
+
+        if len(self.lines) > start:
+            indent = "    " * self.indent
+            test = (
+                f"{temporary} is None or {temporary} is False"
+                if is_or
+                else f"{temporary} is not None and {temporary} is not False"
+            )
+            self.lines[start:start] = [
+                f"{indent}{temporary} = {left}",
+                f"{indent}if {test}:",
+            ]
+            self.__emit(f"    {temporary} = {right}")
+            self.height = 0
+            return temporary
+
+        self.height = max(self.height, left_height) + 2
+        left_is_truthy = (
+            f"({temporary} := {left}) is not None and {temporary} is not False"
+        )
+
+        # Python's conditional expression only evaluates the branch it takes
+        if is_or:
+            return f"({temporary} if {left_is_truthy} else {right})"
+
+        return f"({right} if {left_is_truthy} else {temporary})"
+
+    def visit_grouping(self, grouping_expr):
+        (code,) = self.__operands(grouping_expr.expr)
+        self.height += 1
+        return f"({code})"
+
+    def visit_call(self, call_expr):
+        callee, *arguments = self.__operands(call_expr.callee, *call_expr.arguments)
+        self.height += 2
+        arguments = ", ".join(arguments)
+        count = len(call_expr.arguments)
+        temporary = self.__temporary()
+
+        # the callee expression picks the Python function to call, or a stand-in
+        # raising the right error once the arguments have been evaluated.
+        return (
+            f"({temporary}.function if type({temporary} := {callee}) is Function "
+            f"and {temporary}.arity == {count} else call_failure({temporary}, {count}))"
+            f"({arguments})"
+        )
+
+    def visit_binary(self, binary_expr):
+        token_type = binary_expr.token.token_type
+        left, right = self.__operands(binary_expr.left, binary_expr.right)
+        self.height += 2
+
+        if token_type == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+
+        if token_type == TokenType.BANG_EQUAL:
+            return f"({left} != {right})"
+
+        left_temporary = self.__temporary()
+        right_temporary = self.__temporary()
+
+        if token_type == TokenType.PLUS:
+            # a literal on the right already says which types can be added to it
+            if isinstance(binary_expr.right, Literal) and (
+                type(binary_expr.right.value) is str
+                or type(binary_expr.right.value) in NUMBER_TYPES
+                and fits_float(binary_expr.right.value)
+            ):
+                if type(binary_expr.right.value) is str:
+                    check = f"type({left_temporary} := {left}) is str"
+                elif type(binary_expr.right.value) is float:
+                    check = f"type({left_temporary} := {left}) is float"
+                else:
+                    check = (
+                        f"type({left_temporary} := {left}) is int "
+                        f"or type({left_temporary}) is float"
+                    )
+
+                return (
+                    f"({left_temporary} + {right} if {check} "
+                    f"else add({left_temporary}, {right}))"
+                )
+
+            return (
+                f"({left_temporary} + {right_temporary} "
+                f"if type({left_temporary} := {left}) is type({right_temporary} := {right}) "
+                f"and (type({left_temporary}) is int or type({left_temporary}) is float "
+                f"or type({left_temporary}) is str) "
+                f"else add({left_temporary}, {right_temporary}))"
+            )
+
+        operator = NUMBER_OPERATORS[token_type]
+
+        if (
+            isinstance(binary_expr.right, Literal)
+            and type(binary_expr.right.value) in NUMBER_TYPES
+            and fits_float(binary_expr.right.value)
+        ):
+            if type(binary_expr.right.value) is int and operator != "/":
+                return (
+                    f"({left_temporary} {operator} {right} "
+                    f"if type({left_temporary} := {left}) is int "
+                    f"or type({left_temporary}) is float "
+                    f"else number_error({operator!r}, {left_temporary}, {right}))"
+                )
+
+            return (
+                f"({left_temporary} {operator} {right} "
+                f"if type({left_temporary} := {left}) is float "
+                f"else number_operation({operator!r}, {left_temporary}, {right}))"
+            )
+
+        # an int and a float, or anything that isn't a number, take the slow way
+        if operator == "/":
+            return (
+                f"({left_temporary} / {right_temporary} "
+                f"if type({left_temporary} := {left}) is type({right_temporary} := {right}) is float "
+                f"else number_operation('/', {left_temporary}, {right_temporary}))"
+            )
+
+        return (
+            f"({left_temporary} {operator} {right_temporary} "
+            f"if type({left_temporary} := {left}) is type({right_temporary} := {right}) is int "
+            f"or type({left_temporary}) is type({right_temporary}) is float "
+            f"else number_operation({operator!r}, {left_temporary}, {right_temporary}))"
+        )
+
+    def visit_assignment(self, assignment_expr):
+        (value,) = self.__operands(assignment_expr.value)
+        self.height += 1
+
+        if assignment_expr.depth is None:
+            return f"set_global(G, {assignment_expr.identifier.lexeme!r}, {value})"
+
+        name, boxed = self.__lookup(assignment_expr.depth, assignment_expr.slot)
+
+        if assignment_expr.forward:
+            shadowed = self.__shadowed(
+                assignment_expr.identifier, assignment_expr.fallback
+            )
+            return f"set_declared_box({name}, {value}, {shadowed})"
+
+        if boxed:
+            return f"set_box({name}, {value})"
+
+        return f"({name} := {value})"
+
+    # statements
+
+    def visit_expression(self, expression_stmt):
+        expr = expression_stmt.expr
+
+        if not isinstance(expr, Assignment):
+            self.__emit(self.__expression(expr))
+            return
+
+        # assignments used as statements don't need to produce a value
+        value = self.__expression(expr.value)
+
+        if expr.depth is None:
+            name = expr.identifier.lexeme
+            temporary = self.__temporary()
+            self.__emit(f"{temporary} = {value}")
+            self.__emit(f"if {name!r} not in G:")
+            self.__emit(f"    undefined({name!r})")
+            self.__emit(f"G[{name!r}] = {temporary}")
+            return
+
+        name, boxed = self.__lookup(expr.depth, expr.slot)
+
+        if expr.forward:
+            shadowed = self.__shadowed(expr.identifier, expr.fallback)
+            self.__emit(f"set_declared_box({name}, {value}, {shadowed})")
+            return
+
+        self.__emit(f"{name}[0] = {value}" if boxed else f"{name} = {value}")
+
+    def visit_print(self, print_stmt):
+        self.__emit(f"print_value({self.__expression(print_stmt.expr)})")
+
+    def visit_let(self, let_stmt):
+        value = "None"
+
+        if let_stmt.initializer is not None:
+            value = self.__expression(let_stmt.initializer)
+
+        self.__define(let_stmt.name, let_stmt.slot, value)
+
+    def __define(self, name, slot, value):
+        lexeme = name.lexeme
+
+        if slot is None:
+            temporary = self.__temporary()
+            self.__emit(f"{temporary} = {value}")
+            self.__emit(f"if {lexeme!r} in G:")
+            self.__emit(f"    already_defined({lexeme!r})")
+            self.__emit(f"G[{lexeme!r}] = {temporary}")
+            return
+
+        scope = self.scopes[-1]
+
+        if slot in scope.predeclared:
+            self.__fill_box(scope.names[slot], lexeme, value)
+            return
+
+        if slot in scope.names:
+            # the resolver reuses the slot of a name declared twice in a scope,
+            # the second declaration always fails once its value is computed.
+            self.__emit(value)
+            self.__emit(f"already_defined({lexeme!r})")
+            return
+
+        scope.names[slot] = self.__new_name("v", lexeme)
+        python_name = scope.names[slot]
+
+        if scope.boxed:
+            self.__emit(f"{python_name} = [{value}]")
+        else:
+            self.__emit(f"{python_name} = {value}")
+
+    def __fill_box(self, box, lexeme, value):
+        # a nested function may have assigned the variable before this runs
+        temporary = self.__temporary()
+        self.__emit(f"{temporary} = {value}")
+        self.__emit(f"if {box}[0] is not UNDEFINED:")
+        self.__emit(f"    already_defined({lexeme!r})")
+        self.__emit(f"{box}[0] = {temporary}")
+
+    def visit_block(self, block_stmt):
+        enclosing = self.scopes[-1]
+        self.scopes.append(
+            PythonScope(
+                enclosing.boxed,
+                enclosing.in_function,
+                block_stmt.slot_count,
+                len(self.lines),
+            )
+        )
+
+        for statement in block_stmt.statements:
+            statement.accept(self)
+
+        self.__exit_scope()
+
+    def visit_if(self, if_stmt):
+        self.__emit(f"if {self.__condition(if_stmt.condition)}:")
+        self.__emit_branch(if_stmt.then_branch)
+
+        if if_stmt.else_branch is not None:
+            self.__emit("else:")
+            self.__emit_branch(if_stmt.else_branch)
+
+    def visit_while(self, while_stmt):
+        start = len(self.lines)
+        self.indent += 1
+        condition = self.__condition(while_stmt.condition)
+        self.indent -= 1
+
+        if len(self.lines) == start:
+            self.__emit(f"while {condition}:")
+        else:
+            # the statements computing the condition run before every iteration
+            self.lines.insert(start, f"{'    ' * self.indent}while True:")
+            self.__emit(f"    if not ({condition}):")
+            self.__emit("        break")
+
+        # a `continue` in the body would restart this loop, not the function's
+        self.loops += 1
+        self.__emit_branch(while_stmt.body)
+        self.loops -= 1
+
+    def __emit_branch(self, statement):
+        self.indent += 1
+        start = len(self.lines)
+        statement.accept(self)
+
+        if len(self.lines) == start:
+            self.__emit("pass")
+
+        self.indent -= 1
+
+    def visit_return(self, return_stmt):
+        if (
+            return_stmt.tail_call
+            and self.loop_parameters is not None
+            and self.loops == 0
+            and len(return_stmt.expr.arguments) == len(self.loop_parameters)
+        ):
+            self.__emit_tail_call(return_stmt.expr)
+            return
+
+        value = "None"
+
+        if return_stmt.expr is not None:
+            value = self.__expression(return_stmt.expr)
+
+        if not self.scopes[-1].in_function:
+            self.__emit(value)
+            self.__emit("top_level_return_error()")
+            return
+
+        self.__emit(f"return {value}")
+
+    def __emit_tail_call(self, call_expr):
+        """Loops when the callee is the function running, `_self[0]`, calls it otherwise"""
+
+        callee, *arguments = self.__operands(call_expr.callee, *call_expr.arguments)
+        callee_temporary = self.__temporary()
+        self.__emit(f"{callee_temporary} = {callee}")
+        temporaries = []
+
+        for argument in arguments:
+            temporaries.append(self.__temporary())
+            self.__emit(f"{temporaries[-1]} = {argument}")
+
+        self.__emit(f"if {callee_temporary} is _self[0]:")
+
+        for parameter, temporary in zip(self.loop_parameters, temporaries):
+            self.__emit(f"    {parameter} = {temporary}")
+
+        self.__emit("    continue")
+
+        count = len(arguments)
+        self.__emit(
+            f"return ({callee_temporary}.function if type({callee_temporary}) is Function "
+            f"and {callee_temporary}.arity == {count} "
+            f"else call_failure({callee_temporary}, {count}))({', '.join(temporaries)})"
+        )
+
+    def visit_function(self, function_stmt):
+        lexeme = function_stmt.name.lexeme
+        function_name = self.__new_name("f", lexeme)
+        slot = function_stmt.slot
+        scope = self.scopes[-1]
+        binding = None
+
+        predeclared = slot in scope.predeclared
+
+        if predeclared:
+            binding = scope.names[slot]
+        elif slot is not None and slot not in scope.names:
+            # the binding exists before the `def` so the body can refer to itself
+            binding = self.__new_name("v", lexeme)
+            scope.names[slot] = binding
+
+            if scope.boxed:
+                self.__emit(f"{binding} = [None]")
+
+        self.__predeclare()
+        captured = [
+            name
+            for enclosing in self.scopes
+            if enclosing.boxed
+            for name in enclosing.names.values()
+        ]
+        function_scope = PythonScope(
+            boxed=self.__contains_function(function_stmt.body),
+            in_function=True,
+            size=function_stmt.slot_count,
+        )
+        parameters = []
+
+        for index, parameter in enumerate(function_stmt.parameters):
+            if isinstance(parameter, Variable):
+                function_scope.names[index] = self.__new_name(
+                    "v", parameter.name.lexeme
+                )
+            else:
+                function_scope.names[index] = f"_p{index}"
+
+            parameters.append(function_scope.names[index])
+
+        valid_parameters = function_stmt.parameters_error is None
+        loops = valid_parameters and self.__calls_itself(function_stmt.body, lexeme)
+        keywords = [f"{name}={name}" for name in captured]
+
+        if loops:
+            # the Function created for this `def`, which tail calls compare with
+            self_box = self.__temporary()
+            self.__emit(f"{self_box} = [None]")
+            keywords.append(f"_self={self_box}")
+
+        signature = ", ".join(parameters)
+
+        if keywords:
+            keywords = ", ".join(keywords)
+            signature = f"{signature}, *, {keywords}" if signature else f"*, {keywords}"
+
+        self.__emit(f"def {function_name}({signature}):")
+        self.indent += 1
+        enclosing_loop = self.loop_parameters, self.loops
+        self.loop_parameters = parameters if loops else None
+        self.loops = 0
+
+        if loops:
+            self.__emit("while True:")
+            self.indent += 1
+
+        if not valid_parameters:
+            self.__emit(f"parameters_error({function_stmt.parameters_error!r})")
+
+        if function_scope.boxed:
+            for name in parameters:
+                self.__emit(f"{name} = [{name}]")
+
+        function_scope.start = len(self.lines)
+        self.scopes.append(function_scope)
+        self.__emit_body(function_stmt.body)
+        self.__exit_scope()
+
+        if loops:
+            if not (
+                function_stmt.body
+                and isinstance(function_stmt.body[-1], ReturnStatement)
+            ):
+                self.__emit("return None")
+
+            self.indent -= 1
+
+        self.loop_parameters, self.loops = enclosing_loop
+        self.indent -= 1
+
+        value = f"Function({lexeme!r}, {len(parameters)}, {function_name})"
+
+        if loops:
+            self.__emit(f"{self_box}[0] = {value}")
+            value = f"{self_box}[0]"
+
+        if slot is None:
+            self.__define(function_stmt.name, slot, value)
+        elif binding is None:
+            self.__emit(value)
+            self.__emit(f"already_defined({lexeme!r})")
+        elif predeclared:
+            self.__fill_box(binding, lexeme, value)
+        elif scope.boxed:
+            self.__emit(f"{binding}[0] = {value}")
+        else:
+            self.__emit(f"{binding} = {value}")
@@ -0,0 +1,169 @@
+"""Runtime support for the Python modules generated by the PythonTranspiler.
+The generated code inlines the common cases (number arithmetic, local variables)
+and calls into these helpers for everything that can fail or is rare.
+"""
+
+import operator
+import sys
+
+from crusher_state.operations import add
+from crusher_state.operations import assert_operands_are_number
+from crusher_state.operations import overflowed
+from crusher_state.operations import stringify_to_crusher_format
+from crusher_state.output import Output
+from crusher_state.runtime_exceptions import CrusherRuntimeError
+from crusher_state.symbol_table import UNDEFINED
+
+# the numeric operators of the generated code, by their spelling
+NUMBER_OPERATIONS = {
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class Function:
+    """A Crusher function compiled to the Python function `function`"""
+
+    __slots__ = ("name", "arity", "function")
+
+    def __init__(self, name, arity, function):
+        self.name = name
+        self.arity = arity
+        self.function = function
+
+    def __str__(self):
+        return f"<function {self.name}>"
+
+
+def number_error(operator, *operands):
+    """Called when an operand of a numeric operator isn't a number, always raises"""
+
+    assert_operands_are_number(operator, *operands)
+
+
+def number_operation(operator, left, right):
+    """Called when the operands of a numeric operator aren't two ints or two
+    floats, or may not fit a float: an int and a float are promoted as in
+    Python, the rest raises"""
+
+    assert_operands_are_number(operator, left, right)
+    operation = NUMBER_OPERATIONS[operator]
+
+    try:
+        return operation(left, right)
+    except OverflowError:
+        return overflowed(operation, left, right)
+
+
+def call_failure(callee, argument_count):
+    """Returns a stand-in for a callee that can't be called with `argument_count`
+    arguments. The generated code still evaluates the arguments before calling
+    the stand-in, keeping the interpreter's order of side effects and errors.
+    """
+
+    def fail(*arguments):
+        if not isinstance(callee, Function):
+            raise CrusherRuntimeError("Call can only be done on functions.")
+
+        raise CrusherRuntimeError(
+            f"Expected {callee.arity} arguments, but got {argument_count}."
+        )
+
+    return fail
+
+
+def parameters_error(message):
+    raise CrusherRuntimeError(message)
+
+
+def top_level_return_error():
+    raise CrusherRuntimeError("Can't return from top-level code.")
+
+
+def undefined(name):
+    raise CrusherRuntimeError(f"Undefined variable {name}.")
+
+
+def already_defined(name):
+    raise CrusherRuntimeError(f"Variable {name} already defined.")
+
+
+def set_box(box, value):
+    box[0] = value
+    return value
+
+
+def get_shadowed(crusher_globals, name, *fallback):
+    """The value of the variable a variable shadows before its declaration ran:
+    the first defined of the `fallback` boxes, else the global"""
+
+    for box in fallback:
+        if box[0] is not UNDEFINED:
+            return box[0]
+
+    if name not in crusher_globals:
+        undefined(name)
+
+    return crusher_globals[name]
+
+
+def set_declared_box(box, value, crusher_globals, name, *fallback):
+    """set_box for a variable that may be assigned before its declaration ran,
+    the variable it shadows is assigned until then"""
+
+    for box in (box, *fallback):
+        if box[0] is not UNDEFINED:
+            box[0] = value
+            return value
+
+    return set_global(crusher_globals, name, value)
+
+
+def set_global(crusher_globals, name, value):
+    if name not in crusher_globals:
+        undefined(name)
+
+    crusher_globals[name] = value
+    return value
+
+
+# the Output print_value writes to, set by execute
+output = None
+
+
+def print_value(value):
+    output.write_line(stringify_to_crusher_format(value))
+
+
+def execute(main, crusher_globals, crusher_output):
+    """Runs a generated module's `main` with the given globals dictionary,
+    printing to the given Output"""
+
+    global output
+    output = crusher_output
+
+    try:
+        main(crusher_globals)
+    except KeyError as error:
+        # global reads are plain dictionary lookups in the generated code
+        undefined(error.args[0])
+
+
+def run(main):
+    """Entry point of a generated module executed as a script"""
+
+    crusher_output = Output()
+
+    try:
+        execute(main, {}, crusher_output)
+    except CrusherRuntimeError as e:
+        crusher_output.flush()
+        print("Runtime Error: " + str(e))
+        sys.exit(1)
+    finally:
+        crusher_output.flush()